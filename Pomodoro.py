@@ -2,6 +2,8 @@ import tkinter as tk
 import datetime as dt
 from tkinter import messagebox
 import customtkinter as ctk
+from timer_engine import TimerEngine
+from gradient import GradientBackground
 ctk.set_appearance_mode("dark")
 ctk.set_default_color_theme("themes/console.json")
 
@@ -22,25 +24,19 @@ class Pomodoro(tk.Tk):
         self.attributes("-topmost", True)
         self.after(100, lambda: self.attributes("-topmost", False))  # evita que sea molesto
 
+        self.running = False
+        self.timer = TimerEngine(WORK_MIN * 60)
+        self._tick_job = None
+
         self._create_gradient(DEGRADADO)
         self._create_widgets()
         self._reset()
 
     # --------- Degradado de fondo ----------
     def _create_gradient(self, colors):
-        w, h = 280, 150
-        canvas = tk.Canvas(self, width=w, height=h, highlightthickness=0)
-        canvas.pack(fill="both", expand=True)
-        r1, g1, b1 = self.winfo_rgb(colors[0])
-        r2, g2, b2 = self.winfo_rgb(colors[1])
-        steps = h
-        for i in range(steps):
-            r = int(r1 + (r2 - r1) * i / steps) >> 8
-            g = int(g1 + (g2 - g1) * i / steps) >> 8
-            b = int(b1 + (b2 - b1) * i / steps) >> 8
-            color = f"#{r:02x}{g:02x}{b:02x}"
-            canvas.create_line(0, i, w, i, fill=color)
-        canvas.lower("all")  # fondo
+        # Una sola imagen generada con NumPy en lugar de una línea por fila
+        self.background = GradientBackground(self, colors, width=280, height=150)
+        self.background.canvas.pack(fill="both", expand=True)
 
     # --------- Widgets ----------
     def _create_widgets(self):
@@ -66,34 +62,43 @@ class Pomodoro(tk.Tk):
 
     # --------- Lógica Pomodoro ----------
     def _adjust(self, seconds):
-        self.remaining += seconds
-        self.remaining = max(0, self.remaining)
+        self.timer.adjust(seconds)
         self._update_label()
 
     def _start(self):
+        if self.running:
+            return
         self.running = True
+        self.timer.start()
         self._countdown()
 
     def _reset(self):
         self.running = False
-        self.remaining = WORK_MIN * 60
+        self._cancel_tick()
+        self.timer.reset(WORK_MIN * 60)
         self._update_label()
 
     def _countdown(self):
+        self._tick_job = None
         if not self.running:
             return
-        if self.remaining <= 0:
+        if self.timer.finished:
             self.running = False
             messagebox.showinfo("Pomodoro", "¡Tiempo terminado!")
-            self.remaining = BREAK_MIN * 60
+            self.timer.reset(BREAK_MIN * 60)
             self._update_label()
             return
-        self.remaining -= 1
         self._update_label()
-        self.after(1000, self._countdown)
+        # Próximo tick en el siguiente cambio de segundo, según el reloj monótono
+        self._tick_job = self.after(self.timer.next_tick_ms(), self._countdown)
+
+    def _cancel_tick(self):
+        if self._tick_job is not None:
+            self.after_cancel(self._tick_job)
+            self._tick_job = None
 
     def _update_label(self):
-        mins, secs = divmod(self.remaining, 60)
+        mins, secs = divmod(self.timer.remaining, 60)
         self.timer_var.set(f"{mins:02}:{secs:02}")
 
 if __name__ == "__main__":
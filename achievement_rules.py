@@ -0,0 +1,195 @@
+import bisect
+import json
+import re
+
+
+# Disparadores de achievements.json -> (métrica, umbral)
+TRIGGER_PATTERNS = [
+    (re.compile(r"^complete_first_session$"), lambda m: ("total_sessions", 1)),
+    (re.compile(r"^total_sessions_(\d+)$"), lambda m: ("total_sessions", int(m.group(1)))),
+    (re.compile(r"^streak_count_(\d+)$"), lambda m: ("streak", int(m.group(1)))),
+    (re.compile(r"^daily_sessions_(\d+)$"), lambda m: ("daily_sessions", int(m.group(1)))),
+    (re.compile(r"^focus_time_(\d+)$"), lambda m: ("focus_minutes", int(m.group(1)))),
+    (re.compile(r"^session_after_(\d+)$"), lambda m: ("hour", int(m.group(1)))),
+    (re.compile(r"^session_before_(\d+)$"), lambda m: ("hour_before", int(m.group(1)))),
+    (re.compile(r"^tag_count_(.+)_(\d+)$"), lambda m: (f"tag:{m.group(1)}", int(m.group(2)))),
+]
+
+# Métricas que se cumplen cuando el valor es MENOR que el umbral
+BELOW_METRICS = {"hour_before"}
+
+# Puntos por sesión completada sin pausas
+SESSION_POINTS = {"work": 10, "break": 5}
+
+# Segundos de pausa por cada punto perdido
+PAUSE_PENALTY_INTERVAL = 10
+
+
+def level_for_experience(exp):
+    """Nivel según la experiencia: cada 100 puntos = 1 nivel, máximo 50"""
+    return min(1 + (exp // 100), 50)
+
+
+def pause_penalty(seconds):
+    """Puntos perdidos por 'seconds' segundos en pausa"""
+    return int(max(0.0, seconds) // PAUSE_PENALTY_INTERVAL)
+
+
+def add_experience(user_data, points):
+    user_data["experience"] += points
+    user_data["level"] = level_for_experience(user_data["experience"])
+
+
+def reward_session(user_data, engine, definitions, session_type, duration, now):
+    """Recompensas de una sesión completada sin pausas; devuelve los logros nuevos
+
+    Suma puntos, experiencia, minutos y daily_stats, evalúa con 'engine' las
+    reglas que la sesión cambia y suma los puntos de los logros desbloqueados.
+    La usan la ventana y el servidor sin ventana.
+    """
+    points = SESSION_POINTS[session_type]
+    user_data["total_points"] += points
+    user_data["total_focus_time"] += duration
+    user_data["completed_sessions"] += 1
+    add_experience(user_data, points)
+
+    today = now.strftime("%Y-%m-%d")
+    day_stats = user_data["daily_stats"].get(today, 0)
+    if isinstance(day_stats, dict):
+        day_stats["sessions_completed"] = day_stats.get("sessions_completed", 0) + 1
+    else:
+        user_data["daily_stats"][today] = day_stats + 1
+
+    new_achievements = engine.record_session(user_data, {
+        "type": session_type,
+        "date": today,
+        "hour": now.hour,
+        "paused": False
+    })
+    for achievement in new_achievements:
+        user_data["achievements"].append(achievement)
+        achievement_points = definitions[achievement].get("points", 0)
+        user_data["total_points"] += achievement_points
+        add_experience(user_data, achievement_points)
+    return new_achievements
+
+
+def parse_trigger(trigger):
+    """Traducir un disparador a (métrica, umbral); None si no se reconoce"""
+    for pattern, build in TRIGGER_PATTERNS:
+        match = pattern.match(trigger)
+        if match:
+            return build(match)
+    return None
+
+
+def daily_count(value):
+    """Sesiones de un día en daily_stats (entero o dict con 'sessions_completed')"""
+    if isinstance(value, dict):
+        return value.get("sessions_completed", 0)
+    return value or 0
+
+
+class AchievementRuleEngine:
+    """Motor de logros compilado desde achievements.json
+
+    Cada disparador se indexa por métrica en una lista ordenada por umbral, y
+    al desbloquearse un logro sale del índice: evaluar una sesión solo recorre
+    las reglas de las métricas que la sesión cambia y que efectivamente se
+    cumplen.
+    """
+
+    def __init__(self, definitions, unlocked=()):
+        self.definitions = definitions
+        self.unknown_triggers = []
+        self._pending = {}  # métrica -> [(clave de orden, umbral, logro)]
+        self._metrics_by_key = {}  # logro -> métricas donde está indexado
+        unlocked = set(unlocked)
+        for key, definition in definitions.items():
+            if key in unlocked:
+                continue
+            for trigger in definition.get("unlocked_by", []):
+                parsed = parse_trigger(trigger)
+                if parsed is None:
+                    self.unknown_triggers.append(trigger)
+                    continue
+                metric, threshold = parsed
+                # Orden en que se van cumpliendo: ascendente, o descendente para "menor que"
+                order = -threshold if metric in BELOW_METRICS else threshold
+                bisect.insort(self._pending.setdefault(metric, []), (order, threshold, key))
+                self._metrics_by_key.setdefault(key, set()).add(metric)
+
+    @classmethod
+    def from_file(cls, path, unlocked=()):
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        return cls(data.get("available_achievements", {}), unlocked)
+
+    def _satisfied(self, metric, value):
+        """Logros de una métrica que el valor cumple (y que aún no se tienen)"""
+        rules = self._pending.get(metric)
+        if not rules:
+            return []
+        below = metric in BELOW_METRICS
+        hits = []
+        for order, threshold, key in rules:
+            if (value < threshold) if below else (value >= threshold):
+                hits.append(key)
+            else:
+                break
+        return hits
+
+    def _unlock(self, keys):
+        """Quitar del índice todas las reglas de los logros desbloqueados"""
+        for key in keys:
+            for metric in self._metrics_by_key.pop(key, ()):
+                rules = [rule for rule in self._pending[metric] if rule[2] != key]
+                if rules:
+                    self._pending[metric] = rules
+                else:
+                    del self._pending[metric]
+
+    def evaluate(self, metrics):
+        """Evaluar solo las métricas cambiadas {métrica: valor}; devuelve logros nuevos"""
+        new = []
+        for metric, value in metrics.items():
+            if value is None:
+                continue
+            for key in self._satisfied(metric, value):
+                if key not in new:
+                    new.append(key)
+        if new:
+            self._unlock(new)
+        return new
+
+    def record_session(self, user_data, session):
+        """Actualizar contadores incrementales con una sesión y evaluar sus reglas
+
+        Espera que user_data ya incluya la sesión en 'completed_sessions',
+        'total_focus_time' y 'daily_stats'. 'session' lleva 'type', 'date',
+        'hour', 'paused' y opcionalmente 'tags'.
+        """
+        counters = user_data.setdefault("achievement_counters", {"streak": 0, "tags": {}})
+        metrics = {
+            "total_sessions": user_data["completed_sessions"],
+            "daily_sessions": daily_count(user_data["daily_stats"].get(session["date"])),
+            "hour": session.get("hour"),
+            "hour_before": session.get("hour"),
+        }
+
+        if session["type"] == "work":
+            if session.get("paused"):
+                counters["streak"] = 0
+            else:
+                counters["streak"] += 1
+            metrics["streak"] = counters["streak"]
+            metrics["focus_minutes"] = user_data["total_focus_time"]
+            for tag in session.get("tags", []):
+                counters["tags"][tag] = counters["tags"].get(tag, 0) + 1
+                metrics[f"tag:{tag}"] = counters["tags"][tag]
+
+        return self.evaluate(metrics)
+
+    def break_streak(self, user_data):
+        """Reiniciar la racha (sesión abandonada)"""
+        user_data.setdefault("achievement_counters", {"streak": 0, "tags": {}})["streak"] = 0
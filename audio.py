@@ -0,0 +1,190 @@
+import io
+import os
+import queue
+import threading
+import time
+import wave
+
+from instrumentation import metrics
+
+try:
+    import winsound
+except ImportError:  # Linux / macOS
+    winsound = None
+
+
+SOUND_NAMES = ("start", "pause", "complete", "reset")
+
+
+class SoundBuffer:
+    """Sonido WAV decodificado en memoria"""
+
+    def __init__(self, name, params, frames):
+        self.name = name
+        self.params = params      # wave._wave_params
+        self.frames = frames      # muestras PCM originales
+        self.scaled = frames      # muestras con el volumen aplicado
+        self.wav_bytes = b""      # WAV completo listo para reproducir
+
+    @classmethod
+    def from_file(cls, name, path):
+        with wave.open(path, 'rb') as wav:
+            return cls(name, wav.getparams(), wav.readframes(wav.getnframes()))
+
+    def apply_volume(self, volume):
+        """Escalar todas las muestras de una vez según el volumen (0-100)"""
+        factor = max(0, min(100, volume)) / 100
+        self.scaled = scale_pcm(self.frames, self.params.sampwidth, factor)
+        out = io.BytesIO()
+        with wave.open(out, 'wb') as wav:
+            wav.setparams(self.params)
+            wav.writeframes(self.scaled)
+        self.wav_bytes = out.getvalue()
+
+
+def scale_pcm(frames, sampwidth, factor):
+    """Aplicar un factor de volumen a muestras PCM con una operación vectorizada"""
+    if factor == 1:
+        return frames
+    import numpy as np
+
+    if sampwidth == 1:
+        # PCM de 8 bits sin signo, centrado en 128
+        samples = np.frombuffer(frames, dtype=np.uint8).astype(np.int16) - 128
+        return (np.round(samples * factor) + 128).astype(np.uint8).tobytes()
+    if sampwidth == 2:
+        samples = np.frombuffer(frames, dtype="<i2")
+        return np.round(samples * factor).astype("<i2").tobytes()
+    if sampwidth == 3:
+        raw = np.frombuffer(frames, dtype=np.uint8).reshape(-1, 3).astype(np.int32)
+        samples = raw[:, 0] | (raw[:, 1] << 8) | (raw[:, 2] << 16)
+        samples = np.where(samples & 0x800000, samples - 0x1000000, samples)
+        scaled = np.round(samples * factor).astype("<i4")
+        return scaled.view(np.uint8).reshape(-1, 4)[:, :3].tobytes()
+    if sampwidth == 4:
+        samples = np.frombuffer(frames, dtype="<i4")
+        return np.round(samples * factor).astype("<i4").tobytes()
+    return frames
+
+
+class NullBackend:
+    """Backend silencioso; guarda qué se habría reproducido (pruebas / CI)"""
+
+    def __init__(self):
+        self.played = []
+
+    def play(self, buffer):
+        self.played.append(buffer.name)
+
+
+class FileBackend(NullBackend):
+    """Backend que escribe cada reproducción como WAV en un directorio"""
+
+    def __init__(self, output_dir):
+        super().__init__()
+        self.output_dir = output_dir
+        os.makedirs(output_dir, exist_ok=True)
+
+    def play(self, buffer):
+        super().play(buffer)
+        path = os.path.join(self.output_dir, f"{len(self.played):04}_{buffer.name}.wav")
+        with open(path, 'wb') as f:
+            f.write(buffer.wav_bytes)
+
+
+class WinsoundBackend:
+    """Reproducción desde memoria con winsound (Windows)"""
+
+    def play(self, buffer):
+        # SND_MEMORY no admite SND_ASYNC: bloquea, pero solo al hilo de audio
+        winsound.PlaySound(buffer.wav_bytes, winsound.SND_MEMORY)
+
+
+class BellBackend:
+    """Respaldo sin audio: campana de la terminal"""
+
+    def play(self, buffer):
+        print("\a", end="", flush=True)
+
+
+def default_backend():
+    return WinsoundBackend() if winsound is not None else BellBackend()
+
+
+class AudioEngine:
+    """Reproductor no bloqueante con los WAV de sounds/ precargados
+
+    Los archivos se decodifican una vez en un hilo dedicado, que después
+    reproduce en orden lo que se pide con play().
+    """
+
+    def __init__(self, sounds_dir="sounds", volume=50, backend=None):
+        self.sounds_dir = sounds_dir
+        self.volume = volume
+        self.backend = backend or default_backend()
+        self.buffers = {}
+        self.ready = threading.Event()
+        self._queue = queue.Queue(maxsize=8)
+        self._thread = threading.Thread(target=self._run, name="audio", daemon=True)
+        self._thread.start()
+
+    def _load(self):
+        for name in SOUND_NAMES:
+            path = os.path.join(self.sounds_dir, f"{name}.wav")
+            try:
+                buffer = SoundBuffer.from_file(name, path)
+                buffer.apply_volume(self.volume)
+            except (OSError, wave.Error, EOFError):
+                continue
+            self.buffers[name] = buffer
+        self.ready.set()
+
+    def _run(self):
+        self._load()
+        while True:
+            command = self._queue.get()
+            if command is None:
+                return
+            action, value = command
+            if action == "volume":
+                self.volume = value
+                for buffer in self.buffers.values():
+                    buffer.apply_volume(value)
+                continue
+            buffer = self.buffers.get(value)
+            try:
+                if buffer is not None:
+                    with metrics.span("sound_play"):
+                        self.backend.play(buffer)
+                else:
+                    BellBackend().play(None)
+            except Exception:
+                # Un fallo de audio nunca debe afectar al temporizador
+                pass
+
+    def _send(self, command):
+        try:
+            self._queue.put_nowait(command)
+        except queue.Full:
+            # Si el audio va atrasado se descarta el sonido nuevo
+            metrics.count("sounds_dropped")
+
+    def play(self, name):
+        """Pedir un sonido; devuelve de inmediato"""
+        metrics.count("sounds_requested")
+        self._send(("play", name))
+
+    def set_volume(self, volume):
+        """Cambiar el volumen (se reescalan los buffers en el hilo de audio)"""
+        self._send(("volume", volume))
+
+    def close(self, timeout=2.0):
+        """Terminar lo pendiente y detener el hilo"""
+        deadline = time.monotonic() + timeout
+        while self._thread.is_alive() and time.monotonic() < deadline:
+            try:
+                self._queue.put(None, timeout=0.1)
+                break
+            except queue.Full:
+                continue
+        self._thread.join(max(0, deadline - time.monotonic()))
@@ -0,0 +1,286 @@
+import json
+import os
+
+import numpy as np
+
+from achievement_rules import SESSION_POINTS, level_for_experience, parse_trigger
+from session_store import create_session_store, session_duration, session_hour
+from wal import WriteAheadLog
+
+# Campos de user_data.json que se recalculan desde el historial
+SCALAR_FIELDS = ("total_points", "experience", "level", "completed_sessions",
+                 "total_focus_time", "total_break_time")
+
+
+def load_columns(sessions):
+    """Pasar el historial a columnas de NumPy (una sola pasada por los registros)"""
+    dates, times, hours, is_work, durations, rewarded = [], [], [], [], [], []
+    tags = {}
+    for position, session in enumerate(sessions):
+        work = session.get("type") == "work"
+        # Solo las sesiones completadas sin pausas dan puntos (como complete_session)
+        ok = bool(session.get("completed")) and not session.get("paused", False)
+        hour = session_hour(session)
+        dates.append(session.get("date", ""))
+        times.append(session.get("time") or "")
+        hours.append(-1 if hour is None else hour)
+        is_work.append(work)
+        durations.append(session_duration(session))
+        rewarded.append(ok)
+        if work and ok:
+            for tag in session.get("tags") or ():
+                tags.setdefault(tag, []).append(position)
+
+    day_names, days = np.unique(np.array(dates, dtype=str), return_inverse=True)
+    columns = {
+        "days": days.reshape(-1),
+        "times": np.array(times, dtype=str),
+        "hours": np.array(hours, dtype=np.int16),
+        "work": np.array(is_work, dtype=bool),
+        "durations": np.array(durations, dtype=np.int64),
+        "rewarded": np.array(rewarded, dtype=bool),
+    }
+
+    # Orden cronológico (fecha, hora); los índices de etiquetas siguen al nuevo orden
+    order = np.lexsort((columns["times"], columns["days"]))
+    columns = {name: values[order] for name, values in columns.items()}
+    rank = np.empty(len(order), dtype=np.int64)
+    rank[order] = np.arange(len(order))
+    columns["tags"] = {tag: np.sort(rank[np.array(positions, dtype=np.int64)])
+                       for tag, positions in tags.items()}
+    columns["day_names"] = day_names
+    return columns
+
+
+def _first(positions, hits):
+    """Primera posición (en el historial ordenado) donde se cumple una condición"""
+    found = np.flatnonzero(hits)
+    return int(positions[found[0]]) if len(found) else None
+
+
+def _nth(positions, n):
+    return int(positions[n - 1]) if 0 < n <= len(positions) else None
+
+
+def metric_series(columns):
+    """Valores de cada métrica tras cada sesión, como los ve el motor incremental"""
+    rewarded = np.flatnonzero(columns["rewarded"])
+    days = columns["days"][rewarded]
+    index = np.arange(len(rewarded))
+
+    # Sesiones del mismo día acumuladas (el historial ya está ordenado por fecha)
+    day_start = np.r_[True, days[1:] != days[:-1]] if len(days) else np.zeros(0, dtype=bool)
+    per_day = index - np.maximum.accumulate(np.where(day_start, index, 0)) + 1
+
+    # Racha: sesiones de trabajo seguidas; una con pausas o sin completar la corta
+    work = np.flatnonzero(columns["work"])
+    broken = ~columns["rewarded"][work]
+    work_index = np.arange(len(work))
+    streak = work_index - np.maximum.accumulate(np.where(broken, work_index, -1))
+    streak[broken] = 0
+
+    focus = np.where(columns["work"][rewarded], columns["durations"][rewarded], 0).cumsum()
+    return {
+        "rewarded": rewarded,
+        "daily_sessions": per_day,
+        "hours": columns["hours"][rewarded],
+        "work": work,
+        "streak": streak,
+        "focus_minutes": focus,
+    }
+
+
+def first_unlock(metric, threshold, series, tags):
+    """Posición de la sesión que cumple por primera vez (métrica, umbral)"""
+    rewarded = series["rewarded"]
+    if metric == "total_sessions":
+        return _nth(rewarded, threshold)
+    if metric == "daily_sessions":
+        return _first(rewarded, series["daily_sessions"] >= threshold)
+    if metric == "hour":
+        return _first(rewarded, series["hours"] >= threshold)
+    if metric == "hour_before":
+        hours = series["hours"]
+        return _first(rewarded, (hours >= 0) & (hours < threshold))
+    if metric == "streak":
+        return _first(series["work"], series["streak"] >= threshold)
+    if metric == "focus_minutes":
+        k = int(np.searchsorted(series["focus_minutes"], threshold))
+        return int(rewarded[k]) if k < len(rewarded) else None
+    if metric.startswith("tag:"):
+        return _nth(tags.get(metric[4:], np.zeros(0, dtype=np.int64)), threshold)
+    return None
+
+
+def recompute(columns, definitions):
+    """Reconstruir puntos, experiencia, nivel, daily_stats y logros desde el historial"""
+    series = metric_series(columns)
+    days, work, rewarded = columns["days"], columns["work"], columns["rewarded"]
+
+    # Logros: el primer disparador cumplido de cada uno, en orden cronológico
+    unlocks = []
+    for key, definition in definitions.items():
+        positions = []
+        for trigger in definition.get("unlocked_by", []):
+            parsed = parse_trigger(trigger)
+            if parsed is not None:
+                position = first_unlock(*parsed, series, columns["tags"])
+                if position is not None:
+                    positions.append(position)
+        if positions:
+            unlocks.append((min(positions), key))
+    unlocks.sort()
+
+    unlock_days = np.array([days[position] for position, _ in unlocks], dtype=np.int64)
+    unlock_points = np.array([definitions[key].get("points", 0) for _, key in unlocks],
+                             dtype=np.int64)
+
+    session_points = np.where(rewarded, np.where(work, SESSION_POINTS["work"],
+                                                 SESSION_POINTS["break"]), 0)
+    focus = np.where(rewarded & work, columns["durations"], 0)
+    breaks = np.where(rewarded & ~work, columns["durations"], 0)
+    total_days = len(columns["day_names"])
+
+    def per_day(weights, index=days):
+        return np.bincount(index, weights=weights, minlength=total_days).astype(np.int64)
+
+    daily = {
+        "sessions_completed": per_day(rewarded),
+        "focus_time": per_day(focus),
+        "break_time": per_day(breaks),
+        "points_earned": per_day(session_points) + per_day(unlock_points, unlock_days),
+        "achievements_unlocked": per_day(np.ones(len(unlocks)), unlock_days),
+    }
+    daily_stats = {
+        str(columns["day_names"][day]): {name: int(values[day]) for name, values in daily.items()}
+        for day in np.flatnonzero(daily["sessions_completed"])
+    }
+
+    experience = int(session_points.sum() + unlock_points.sum())
+    streak = series["streak"]
+    return {
+        "total_points": experience,
+        "experience": experience,
+        "level": int(level_for_experience(experience)),
+        "completed_sessions": int(rewarded.sum()),
+        "total_focus_time": int(focus.sum()),
+        "total_break_time": int(breaks.sum()),
+        "achievements": [key for _, key in unlocks],
+        "daily_stats": daily_stats,
+        "achievement_counters": {
+            "streak": int(streak[-1]) if len(streak) else 0,
+            "tags": {tag: len(positions) for tag, positions in columns["tags"].items()},
+        },
+    }
+
+
+def keep_pause_penalty(current, rebuilt):
+    """Conservar los puntos perdidos por pausas, que el historial no registra
+
+    En la app total_points es la experiencia menos las penalizaciones por
+    pausa, así que se mantiene esa diferencia. Devuelve los puntos de
+    penalización conservados.
+    """
+    penalty = max(0, current.get("experience", 0) - current.get("total_points", 0))
+    rebuilt["total_points"] = max(0, rebuilt["experience"] - penalty)
+    return penalty
+
+
+def diff_user_data(current, rebuilt):
+    """Diferencias entre user_data.json y lo recalculado"""
+    changes = {}
+    for field in SCALAR_FIELDS:
+        if current.get(field) != rebuilt[field]:
+            changes[field] = (current.get(field), rebuilt[field])
+
+    old_achievements = set(current.get("achievements", []))
+    new_achievements = set(rebuilt["achievements"])
+    changes["achievements_added"] = sorted(new_achievements - old_achievements)
+    changes["achievements_removed"] = sorted(old_achievements - new_achievements)
+
+    old_days = current.get("daily_stats", {})
+    new_days = rebuilt["daily_stats"]
+    changes["days_added"] = sorted(set(new_days) - set(old_days))
+    changes["days_removed"] = sorted(set(old_days) - set(new_days))
+    changes["days_changed"] = sorted(day for day in set(old_days) & set(new_days)
+                                     if old_days[day] != new_days[day])
+    return changes
+
+
+def backfill(data_dir="pomodoro_data", backend=None, apply=False):
+    """Recalcular user_data.json desde el historial; devuelve (recalculado, diferencias)"""
+    with open(os.path.join(data_dir, "achievements.json"), 'r', encoding='utf-8') as f:
+        definitions = json.load(f)["available_achievements"]
+
+    user_file = os.path.join(data_dir, "user_data.json")
+    try:
+        with open(user_file, 'r', encoding='utf-8') as f:
+            current = json.load(f)
+    except FileNotFoundError:
+        current = {}
+    except ValueError:
+        # Archivo dañado o a medio escribir: se recalcula todo desde el historial
+        current = {}
+        if apply:
+            # Conservar la copia rota en lugar de sobrescribirla, como UserDataStore.load
+            os.replace(user_file, user_file + ".corrupt")
+            print(f"⚠ {user_file} estaba dañado; se guardó como {user_file}.corrupt")
+        else:
+            print(f"⚠ {user_file} está dañado; se compara contra un archivo vacío")
+
+    if backend is None:
+        try:
+            with open(os.path.join(data_dir, "settings.json"), 'r', encoding='utf-8') as f:
+                backend = json.load(f).get("session_backend", "jsonl")
+        except (FileNotFoundError, json.JSONDecodeError):
+            backend = "jsonl"
+
+    store = create_session_store(data_dir, backend)
+    try:
+        columns = load_columns(store.iter_sessions())
+        rebuilt = recompute(columns, definitions)
+        penalty = keep_pause_penalty(current, rebuilt)
+        changes = diff_user_data(current, rebuilt)
+        changes["pause_penalty"] = penalty
+        if apply:
+            # Conservar los campos que no salen del historial (usuario, semanas, ...);
+            # revisión nueva para que la app y el registro previo la tomen como la última
+            updated = dict(current, **rebuilt, revision=current.get("revision", 0) + 1)
+            WriteAheadLog(data_dir, store).commit_user_data(user_file, updated)
+    finally:
+        store.close()
+    return rebuilt, changes
+
+
+def print_report(changes):
+    if changes.get("pause_penalty"):
+        print(f"  Penalización por pausas conservada: {changes['pause_penalty']} puntos "
+              "(total_points = experience - penalización)")
+    for field in SCALAR_FIELDS:
+        if field in changes:
+            old, new = changes[field]
+            print(f"  {field}: {old} -> {new}")
+    for label, key in (("Logros nuevos", "achievements_added"),
+                       ("Logros retirados", "achievements_removed")):
+        if changes[key]:
+            print(f"  {label}: {', '.join(changes[key])}")
+    print(f"  daily_stats: {len(changes['days_added'])} días nuevos, "
+          f"{len(changes['days_removed'])} eliminados, {len(changes['days_changed'])} distintos")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Recalcular puntos, experiencia, nivel, daily_stats y logros desde el historial")
+    parser.add_argument("--data-dir", default="pomodoro_data")
+    parser.add_argument("--backend", choices=["jsonl", "sqlite"], default=None)
+    parser.add_argument("--apply", action="store_true",
+                        help="Escribir el resultado en user_data.json (cerrar la app antes)")
+    args = parser.parse_args()
+
+    rebuilt, changes = backfill(args.data_dir, args.backend, args.apply)
+    print(f"✓ {rebuilt['completed_sessions']} sesiones recompensadas, nivel {rebuilt['level']}")
+    print_report(changes)
+    if args.apply:
+        print("✓ user_data.json actualizado")
@@ -0,0 +1,144 @@
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+class BackgroundTask:
+    """Trabajo en segundo plano que se puede cancelar"""
+
+    def __init__(self):
+        self._cancelled = threading.Event()
+
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+    def cancel(self):
+        """Descartar el resultado (el trabajo puede consultarlo para parar antes)"""
+        self._cancelled.set()
+
+
+class TkWorker:
+    """Ejecuta trabajo pesado fuera del hilo de Tk y entrega los resultados en él
+
+    Los hilos de trabajo nunca tocan widgets: dejan el resultado en una cola
+    que el hilo de Tk vacía con el planificador mientras haya tareas en curso.
+    """
+
+    def __init__(self, scheduler, max_workers=1, poll_interval=0.05):
+        self.scheduler = scheduler
+        self.poll_interval = poll_interval
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="worker")
+        self._results = queue.SimpleQueue()
+        self._outstanding = 0
+        self._poll_job = None
+
+    def submit(self, func, on_done, on_error=None):
+        """Ejecutar func(task) en segundo plano y llamar on_done(resultado) en Tk"""
+        task = BackgroundTask()
+        self._outstanding += 1
+        self._executor.submit(self._run, task, func, on_done, on_error)
+        if self._poll_job is None:
+            self._poll_job = self.scheduler.call_later(self.poll_interval, self._poll)
+        return task
+
+    def _run(self, task, func, on_done, on_error):
+        if task.cancelled:
+            self._results.put((task, None, None))
+            return
+        try:
+            self._results.put((task, on_done, func(task)))
+        except Exception as error:
+            self._results.put((task, on_error, error))
+
+    def _poll(self):
+        self._poll_job = None
+        while True:
+            try:
+                task, callback, value = self._results.get_nowait()
+            except queue.Empty:
+                break
+            self._outstanding -= 1
+            if callback is not None and not task.cancelled:
+                callback(value)
+        if self._outstanding > 0:
+            self._poll_job = self.scheduler.call_later(self.poll_interval, self._poll)
+
+    def shutdown(self):
+        """No aceptar más trabajo; los resultados pendientes se descartan"""
+        self.scheduler.cancel(self._poll_job)
+        self._poll_job = None
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _process_entry(func, args, results):
+    """Punto de entrada del proceso hijo: informa progreso y resultado por la cola"""
+    def progress(fraction, message=""):
+        results.put(("progress", (fraction, message)))
+
+    try:
+        results.put(("done", func(*args, progress=progress)))
+    except Exception as error:
+        results.put(("error", f"{type(error).__name__}: {error}"))
+
+
+class ProcessJob:
+    """Trabajo en un proceso aparte con progreso entregado al hilo de Tk
+
+    'func' debe ser una función de módulo (se importa en el proceso hijo) que
+    acepte un argumento 'progress(fracción, mensaje)'.
+    """
+
+    def __init__(self, scheduler, func, args, on_done, on_progress=None, on_error=None,
+                 poll_interval=0.1):
+        import multiprocessing
+
+        context = multiprocessing.get_context("spawn")
+        self.scheduler = scheduler
+        self.on_done = on_done
+        self.on_progress = on_progress
+        self.on_error = on_error
+        self.poll_interval = poll_interval
+        self.cancelled = False
+        self._results = context.Queue()
+        self._process = context.Process(target=_process_entry, args=(func, args, self._results),
+                                        daemon=True)
+        self._process.start()
+        self._poll_job = scheduler.call_later(poll_interval, self._poll)
+
+    def _poll(self):
+        self._poll_job = None
+        while True:
+            try:
+                kind, value = self._results.get_nowait()
+            except queue.Empty:
+                break
+            if kind == "progress":
+                if self.on_progress is not None and not self.cancelled:
+                    self.on_progress(*value)
+                continue
+            self._finish()
+            callback = self.on_done if kind == "done" else self.on_error
+            if callback is not None and not self.cancelled:
+                callback(value)
+            return
+
+        if not self._process.is_alive() and self._results.empty():
+            # Terminó sin enviar resultado (por ejemplo, se cerró de golpe)
+            self._finish()
+            if self.on_error is not None and not self.cancelled:
+                self.on_error(f"el proceso terminó con código {self._process.exitcode}")
+            return
+        self._poll_job = self.scheduler.call_later(self.poll_interval, self._poll)
+
+    def _finish(self):
+        self._process.join(timeout=1)
+
+    def cancel(self):
+        """Detener el proceso y descartar su resultado"""
+        self.cancelled = True
+        self.scheduler.cancel(self._poll_job)
+        self._poll_job = None
+        if self._process.is_alive():
+            self._process.terminate()
+        self._process.join(timeout=1)
@@ -0,0 +1,738 @@
+import argparse
+import itertools
+import json
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from exporters import export_sessions_csv
+from persistence import WriteBehindWriter, atomic_write_json
+from rollups import SessionRollups
+from session_store import SESSION_BACKENDS, SessionJournal, create_session_store
+from synthetic_history import extend_in_batches, generate_sessions
+from timer_engine import TimerEngine
+from timer_view import TimerFace
+from user_data_store import UserDataStore
+from wal import WriteAheadLog
+
+ACHIEVEMENTS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                 "pomodoro_data", "achievements.json")
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return time.perf_counter() - start, result
+
+
+def bench_backends(sizes, appends=200):
+    """Comparar los almacenes JSONL y SQLite para cada tamaño de historial"""
+    results = []
+    for size in sizes:
+        for name, store_class in SESSION_BACKENDS.items():
+            data_dir = tempfile.mkdtemp(prefix=f"pomodoro_bench_{name}_")
+            try:
+                store = store_class(data_dir)
+                load_s, _ = timed(extend_in_batches, store, generate_sessions(size))
+
+                # Costo de registrar una sesión con el historial ya grande
+                extra = list(generate_sessions(appends, seed=7))
+                start = time.perf_counter()
+                for session in extra:
+                    store.append(session)
+                append_ms = (time.perf_counter() - start) / appends * 1000
+
+                per_day_s, _ = timed(store.sessions_per_day)
+                per_hour_s, _ = timed(store.sessions_per_hour)
+                scan_s, _ = timed(lambda: sum(1 for _ in store.iter_sessions()))
+                store.close()
+            finally:
+                shutil.rmtree(data_dir, ignore_errors=True)
+
+            results.append({
+                "backend": name, "sessions": size,
+                "bulk_load_s": load_s, "append_ms": append_ms,
+                "per_day_s": per_day_s, "per_hour_s": per_hour_s, "full_scan_s": scan_s,
+            })
+    return results
+
+
+STARTUP_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+if {eager}:
+    # Los mismos módulos que importaba pomodoro_pro.py antes de la carga diferida
+    import matplotlib
+    matplotlib.use("TkAgg")
+    import matplotlib.pyplot
+    from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+    import pandas
+    from reportlab.pdfgen import canvas
+    from reportlab.lib.pagesizes import letter
+import pomodoro_pro
+app = pomodoro_pro.Pomodoro()
+app.update_idletasks()
+app.update()
+first_frame = time.perf_counter() - start
+try:
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    peak_mb = peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+except ImportError:
+    peak_mb = None
+app.destroy()
+print(json.dumps({{"first_frame_s": first_frame, "peak_rss_mb": peak_mb}}))
+"""
+
+
+def bench_startup(runs=3):
+    """Tiempo hasta el primer cuadro y memoria pico, con y sin carga diferida"""
+    repo_dir = os.path.dirname(os.path.abspath(__file__))
+    env = dict(os.environ, PYTHONPATH=repo_dir + os.pathsep + os.environ.get("PYTHONPATH", ""))
+    results = []
+    for mode, eager in (("eager", True), ("lazy", False)):
+        for run in range(runs):
+            # Directorio vacío para no tocar los datos reales del usuario
+            data_dir = tempfile.mkdtemp(prefix="pomodoro_bench_startup_")
+            try:
+                output = subprocess.run([sys.executable, "-c", STARTUP_PROBE.format(eager=eager)],
+                                        cwd=data_dir, env=env, capture_output=True,
+                                        text=True, check=True).stdout
+            finally:
+                shutil.rmtree(data_dir, ignore_errors=True)
+            results.append({"mode": mode, "run": run, **json.loads(output.strip().splitlines()[-1])})
+    return results
+
+
+class FakeClock:
+    """Reloj manual para simular el bucle de Tk"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def simulate_drift(duration_s, max_late_ms, suspend_s=0.0, seed=1):
+    """Duración real de una sesión con callbacks tardíos (y una suspensión a la mitad)"""
+    rng = random.Random(seed)
+
+    # Antes: restar 1 en cada after(1000); la suspensión congela la cuenta
+    legacy_elapsed = 0.0
+    for tick in range(duration_s):
+        legacy_elapsed += 1.0 + rng.uniform(0, max_late_ms) / 1000
+        if tick == duration_s // 2:
+            legacy_elapsed += suspend_s
+    legacy_ticks = duration_s
+
+    # Ahora: fecha límite en reloj monótono y despertar en cada cambio de segundo
+    rng = random.Random(seed)
+    clock = FakeClock()
+    engine = TimerEngine(duration_s, clock=clock)
+    engine.start()
+    engine_ticks = 0
+    suspended = False
+    while not engine.finished:
+        clock.now += engine.next_tick_ms() / 1000 + rng.uniform(0, max_late_ms) / 1000
+        engine_ticks += 1
+        if not suspended and clock.now >= duration_s / 2:
+            clock.now += suspend_s
+            suspended = True
+
+    # Con suspensión el tiempo correcto de fin sigue siendo 'duration_s'
+    return {
+        "session_s": duration_s, "max_late_ms": max_late_ms, "suspend_s": suspend_s,
+        "legacy_drift_s": legacy_elapsed - duration_s,
+        "engine_drift_s": clock.now - duration_s,
+        "legacy_ticks": legacy_ticks, "engine_ticks": engine_ticks,
+    }
+
+
+def bench_drift():
+    """Deriva acumulada en sesiones largas simuladas"""
+    results = []
+    for duration_s in (25 * 60, 50 * 60, 4 * 3600):
+        for max_late_ms in (5, 50, 250):
+            results.append(simulate_drift(duration_s, max_late_ms))
+    results.append(simulate_drift(25 * 60, 50, suspend_s=600))
+    return results
+
+
+def simulate_render(duration_s, hidden_share, ring, period_s=120, seed=1):
+    """Despertares y elementos redibujados en una sesión con la ventana oculta a ratos"""
+    rng = random.Random(seed)
+    transitions = []
+    for start in range(0, duration_s, period_s):
+        hidden_s = hidden_share * period_s
+        if hidden_s:
+            begin = start + rng.uniform(0, period_s - hidden_s)
+            transitions += [(begin, False), (begin + hidden_s, True)]
+
+    clock = FakeClock()
+    engine = TimerEngine(duration_s, clock=clock)
+    engine.start()
+    face = TimerFace(120 if ring else 0)
+    visible = True
+    wakeups = glyphs = segments = 0
+    next_tick = 0.0
+    while True:
+        if transitions and transitions[0][0] < next_tick:
+            # Cambio de visibilidad: se vuelve a programar el tick
+            clock.now, visible = transitions.pop(0)
+        else:
+            clock.now = next_tick
+        wakeups += 1
+        if engine.finished:
+            break
+        if visible:
+            changed_glyphs, changed_segments = face.update(engine.remaining,
+                                                           1 - engine.remaining_exact() / duration_s)
+            glyphs += len(changed_glyphs)
+            segments += len(changed_segments)
+            next_tick = clock.now + engine.next_tick_ms() / 1000
+        else:
+            next_tick = clock.now + engine.remaining_exact()
+
+    minutes = duration_s / 60
+    return {
+        "hidden_share": hidden_share, "ring": ring,
+        # Antes: un after() y una etiqueta completa (5 glifos + reacomodo) por segundo
+        "legacy_wakeups_min": 60.0, "legacy_glyphs_min": 5 * 60.0,
+        "wakeups_min": wakeups / minutes, "glyphs_min": glyphs / minutes,
+        "segments_min": segments / minutes,
+    }
+
+
+def bench_render(duration_s=25 * 60):
+    """Costo de dibujar el reloj: siempre vs solo lo visible y lo que cambia"""
+    return [simulate_render(duration_s, hidden_share, ring)
+            for ring in (False, True) for hidden_share in (0.0, 0.5, 0.9)]
+
+
+def bench_checkpoint(saves=10_000):
+    """Costo de guardar el estado de la sesión: ranura en mmap vs JSON atómico"""
+    from checkpoint import SessionCheckpoint
+
+    data_dir = tempfile.mkdtemp(prefix="pomodoro_bench_ckpt_")
+    results = []
+    try:
+        for sync in (False, True):
+            checkpoint = SessionCheckpoint(os.path.join(data_dir, "session.ckpt"), sync=sync)
+            count = saves if not sync else saves // 10
+            start = time.perf_counter()
+            for i in range(count):
+                checkpoint.save("work", 1500 - i * 0.1, 1500, 1.0, True, False)
+            elapsed = time.perf_counter() - start
+            checkpoint.close()
+            results.append({"method": "mmap_sync" if sync else "mmap", "saves": count,
+                            "us_per_save": elapsed / count * 1e6})
+
+        path = os.path.join(data_dir, "session.json")
+        count = saves // 10
+        start = time.perf_counter()
+        for i in range(count):
+            atomic_write_json(path, {"session_type": "work", "remaining": 1500 - i * 0.1,
+                                     "duration": 1500, "session_start_time": 1.0,
+                                     "running": True, "paused": False})
+        elapsed = time.perf_counter() - start
+        results.append({"method": "atomic_json", "saves": count,
+                        "us_per_save": elapsed / count * 1e6})
+    finally:
+        shutil.rmtree(data_dir, ignore_errors=True)
+    return results
+
+
+def measure(func):
+    """Tiempo (sin trazar) y memoria pico (con tracemalloc) de una función"""
+    elapsed, result = timed(func)
+    tracemalloc.start()
+    func()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak / (1024 * 1024), result
+
+
+def bench_csv(sizes):
+    """Exportación CSV en flujo frente a la ruta anterior con pandas"""
+    try:
+        import pandas as pd
+    except ImportError:
+        pd = None
+
+    results = []
+    for size in sizes:
+        data_dir = tempfile.mkdtemp(prefix="pomodoro_bench_csv_")
+        try:
+            store = SessionJournal(data_dir)
+            extend_in_batches(store, generate_sessions(size))
+            out = os.path.join(data_dir, "out.csv")
+
+            paths = {"streaming": lambda: export_sessions_csv(store.iter_sessions(), out),
+                     "streaming_gz": lambda: export_sessions_csv(store.iter_sessions(), out + ".gz",
+                                                                 compress=True)}
+            if pd is not None:
+                paths["pandas"] = lambda: pd.DataFrame(list(store.iter_sessions())).to_csv(out, index=False)
+
+            for name, func in paths.items():
+                elapsed, peak_mb, _ = measure(func)
+                results.append({"path": name, "sessions": size, "seconds": elapsed,
+                                "rows_per_s": size / elapsed, "peak_mb": peak_mb})
+        finally:
+            shutil.rmtree(data_dir, ignore_errors=True)
+    return results
+
+
+def bench_backfill(sizes):
+    """Recalcular user_data.json desde historiales grandes (columnas de NumPy)"""
+    import backfill
+
+    with open(ACHIEVEMENTS_FILE, 'r', encoding='utf-8') as f:
+        definitions = json.load(f)["available_achievements"]
+
+    results = []
+    for size in sizes:
+        data_dir = tempfile.mkdtemp(prefix="pomodoro_bench_backfill_")
+        try:
+            store = SessionJournal(data_dir)
+            extend_in_batches(store, generate_sessions(size))
+            load_s, columns = timed(backfill.load_columns, store.iter_sessions())
+            recompute_s, rebuilt = timed(backfill.recompute, columns, definitions)
+            results.append({"sessions": size, "load_s": load_s, "recompute_s": recompute_s,
+                            "total_s": load_s + recompute_s,
+                            "achievements": len(rebuilt["achievements"])})
+        finally:
+            shutil.rmtree(data_dir, ignore_errors=True)
+    return results
+
+
+def _concurrent_worker(data_dir, backend, sessions, seed):
+    """Un proceso que registra sesiones como lo hace DataManager"""
+    store = create_session_store(data_dir, backend)
+    rollups = SessionRollups(data_dir)
+    rollups.load_or_rebuild(store)
+    wal = WriteAheadLog(data_dir, store, max_bytes=64 * 1024)
+    users = UserDataStore(data_dir, wal=wal)
+    writer = WriteBehindWriter(delay=0.005)
+    user_data = users.load()
+
+    start = time.perf_counter()
+    for session in generate_sessions(sessions, seed):
+        wal.append_sessions([session])
+        rollups.catch_up(store)
+        writer.schedule_render(rollups.path, rollups.to_json)
+        user_data["completed_sessions"] += 1
+        user_data["total_points"] += 10
+        user_data["daily_stats"][session["date"]] = user_data["daily_stats"].get(session["date"], 0) + 1
+        writer.schedule(users.path, user_data, users.commit)
+    writer.close()
+    store.close()
+    return time.perf_counter() - start, users.conflicts
+
+
+def bench_concurrency(processes, sessions, backend):
+    """Varios procesos registrando sesiones a la vez sobre el mismo pomodoro_data"""
+    import multiprocessing
+
+    data_dir = tempfile.mkdtemp(prefix="pomodoro_bench_concurrency_")
+    try:
+        atomic_write_json(os.path.join(data_dir, "user_data.json"),
+                          {"total_points": 0, "completed_sessions": 0, "daily_stats": {}})
+        with multiprocessing.get_context("spawn").Pool(processes) as pool:
+            runs = pool.starmap(_concurrent_worker,
+                                [(data_dir, backend, sessions, seed) for seed in range(processes)])
+
+        expected = processes * sessions
+        store = create_session_store(data_dir, backend)
+        rollups = SessionRollups(data_dir)
+        rollups.load_or_rebuild(store)
+        with open(os.path.join(data_dir, "user_data.json"), 'r', encoding='utf-8') as f:
+            user_data = json.load(f)
+        result = {
+            "backend": backend, "processes": processes, "expected": expected,
+            "stored": store.count(), "rollups": rollups.sessions,
+            "user_sessions": user_data["completed_sessions"],
+            "daily_total": sum(user_data["daily_stats"].values()),
+            "points_ok": user_data["total_points"] == 10 * expected,
+            "conflicts": sum(conflicts for _, conflicts in runs),
+            "sessions_per_s": expected / max(elapsed for elapsed, _ in runs),
+        }
+        store.close()
+        return result
+    finally:
+        shutil.rmtree(data_dir, ignore_errors=True)
+
+
+def bench_wal_recovery(sizes, tail=200):
+    """Tiempo de recuperación al arrancar según el tamaño del historial"""
+    results = []
+    for size in sizes:
+        data_dir = tempfile.mkdtemp(prefix="pomodoro_bench_walrec_")
+        try:
+            store = SessionJournal(data_dir)
+            sessions = generate_sessions(size + tail)
+            extend_in_batches(store, itertools.islice(sessions, size))
+            wal = WriteAheadLog(data_dir, store)
+            wal.checkpoint()
+            for session in sessions:
+                wal.append_sessions([session])
+            seconds, report = timed(WriteAheadLog(data_dir, store).recover)
+            results.append({"sessions": size, "tail": tail, "recover_ms": seconds * 1000,
+                            "restored": report["sessions_restored"]})
+        finally:
+            shutil.rmtree(data_dir, ignore_errors=True)
+    return results
+
+
+def bench_query(sizes, repeat=3):
+    """Consultas por fecha y hora con el índice vs recorrer todo el diario"""
+    from session_index import SessionIndex
+
+    results = []
+    for size in sizes:
+        data_dir = tempfile.mkdtemp(prefix="pomodoro_bench_query_")
+        try:
+            store = SessionJournal(data_dir)
+            extend_in_batches(store, generate_sessions(size))
+            index = SessionIndex(data_dir)
+            build_s, _ = timed(index.rebuild, store)
+            results.append({"sessions": size, "query": "build_index", "results": len(index.keys),
+                            "indexed_ms": build_s * 1000, "scan_ms": 0.0, "us_per_result": 0.0})
+
+            day = index.keys[len(index.keys) // 2][:10]
+            queries = {
+                "one_day": {"start_date": day, "end_date": day},
+                "month_22h": {"start_date": day[:7] + "-01", "end_date": day[:7] + "-31",
+                              "hours": [22]},
+                "month_work_done": {"start_date": day[:7] + "-01", "end_date": day[:7] + "-31",
+                                    "session_types": ["work"], "completed": True},
+                "year": {"start_date": day[:4] + "-01-01", "end_date": day[:4] + "-12-31"},
+                "all_at_9h": {"hours": [9]},
+            }
+            for name, filters in queries.items():
+                indexed_s = min(timed(lambda: list(index.query(store, **filters)))[0]
+                                for _ in range(repeat))
+                found = list(index.query(store, **filters))
+                scan_s, _ = timed(lambda: list(store.query(**filters)))
+                results.append({"sessions": size, "query": name, "results": len(found),
+                                "indexed_ms": indexed_s * 1000, "scan_ms": scan_s * 1000,
+                                "us_per_result": indexed_s * 1e6 / max(1, len(found))})
+        finally:
+            shutil.rmtree(data_dir, ignore_errors=True)
+    return results
+
+
+def bench_headless(timers, seconds, work_s, break_s):
+    """Carga del servidor sin ventana: miles de temporizadores en un bucle de asyncio"""
+    import asyncio
+    from headless import HeadlessTimerServer
+
+    async def run(data_dir):
+        server = HeadlessTimerServer(data_dir, auto_continue=True)
+        rng = random.Random(1)
+
+        tracemalloc.start()
+        before = tracemalloc.get_traced_memory()[0]
+        for index in range(timers):
+            timer = server.add_timer(f"t{index}", work_s / 60, break_s / 60)
+            # Arranques escalonados, como un equipo real
+            timer.engine.adjust(-rng.uniform(0, work_s))
+            server.start(timer.timer_id)
+        bytes_per_timer = (tracemalloc.get_traced_memory()[0] - before) / timers
+        tracemalloc.stop()
+
+        # Medir solo la ventana de carga, no la creación de los temporizadores
+        server.completions, server.lateness_total, server.lateness_max = 0, 0.0, 0.0
+        wakeups = server.after.wakeups
+        cpu_start, wall_start = time.process_time(), time.perf_counter()
+        await asyncio.sleep(seconds)
+        cpu = time.process_time() - cpu_start
+        wall = time.perf_counter() - wall_start
+        result = {
+            "timers": timers, "completions": server.completions,
+            "completions_per_s": server.completions / wall,
+            "cpu_pct": cpu / wall * 100,
+            "wakeups_per_s": (server.after.wakeups - wakeups) / wall,
+            "mean_late_ms": server.lateness_total / max(1, server.completions) * 1000,
+            "max_late_ms": server.lateness_max * 1000,
+            "bytes_per_timer": bytes_per_timer,
+            "logged": server.rollups.sessions,
+        }
+        server.close()
+        return result
+
+    data_dir = tempfile.mkdtemp(prefix="pomodoro_bench_headless_")
+    try:
+        return [asyncio.run(run(data_dir))]
+    finally:
+        shutil.rmtree(data_dir, ignore_errors=True)
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def latencies(func, repeat):
+    """p50/p95 en milisegundos de 'repeat' llamadas seguidas"""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+    return {"p50_ms": percentile(samples, 0.5), "p95_ms": percentile(samples, 0.95)}
+
+
+def bench_suite(sizes, seed=42, repeat=200):
+    """Persistencia, agregación, gráficas y exportación para cada tamaño de historial
+
+    Mide los componentes en los que delegan DataManager.log_session,
+    load_user_data/save_user_data, StatsPanel (gráficas) y ReportExporter,
+    sin abrir ventanas.
+    """
+    from exporters import PRINT_THEME, build_pdf_report, weekly_rows
+    from stats_charts import render_stats_png
+
+    results = []
+
+    def record(group, name, size, func, ops=None, **extra):
+        elapsed, peak_mb, value = measure(func)
+        row = {"group": group, "benchmark": name, "sessions": size,
+               "seconds": elapsed, "peak_mb": peak_mb}
+        if ops:
+            row["ops_per_s"] = ops / elapsed
+        row.update(extra)
+        results.append(row)
+        return value
+
+    def optional(group, name, size, func, **extra):
+        # Gráficas, PDF y backfill dependen de paquetes opcionales
+        try:
+            return record(group, name, size, func, **extra)
+        except ImportError as error:
+            results.append({"group": group, "benchmark": name, "sessions": size,
+                            "skipped": str(error)})
+
+    for size in sizes:
+        root = tempfile.mkdtemp(prefix="pomodoro_bench_suite_")
+        try:
+            record("generate", "synthetic_history", size,
+                   lambda: sum(1 for _ in generate_sessions(size, seed)), ops=size)
+
+            # Persistencia: carga masiva, registro de una sesión y datos del usuario
+            stores = {}
+            for backend in SESSION_BACKENDS:
+                def bulk_load(backend=backend):
+                    data_dir = tempfile.mkdtemp(dir=root)
+                    store = create_session_store(data_dir, backend)
+                    extend_in_batches(store, generate_sessions(size, seed))
+                    store.close()
+                    return data_dir
+                stores[backend] = record("persistence", f"{backend}_bulk_load", size, bulk_load,
+                                         ops=size)
+
+            for backend, data_dir in stores.items():
+                store = create_session_store(data_dir, backend)
+                rollups = SessionRollups(data_dir)
+                rollups.load_or_rebuild(store)
+                extra = iter(generate_sessions(repeat, seed + 1))
+
+                def log_session():
+                    store.append(next(extra))
+                    rollups.catch_up(store)
+                results.append({"group": "persistence", "benchmark": f"{backend}_log_session",
+                                "sessions": size, **latencies(log_session, repeat)})
+                store.close()
+
+            data_dir = stores["jsonl"]
+            journal = SessionJournal(data_dir)
+            rollups = SessionRollups(data_dir)
+            rollups.load_or_rebuild(journal)
+            users = UserDataStore(data_dir)
+            user_data = {"total_points": 0, "completed_sessions": 0, "achievements": [],
+                         "daily_stats": {date: {"sessions_completed": n}
+                                         for date, n in rollups.sessions_per_day().items()}}
+            text = json.dumps(user_data)
+            results.append({"group": "persistence", "benchmark": "save_user_data",
+                            "sessions": size, "days": len(user_data["daily_stats"]),
+                            **latencies(lambda: users.commit(users.path, text), 50)})
+            results.append({"group": "persistence", "benchmark": "load_user_data",
+                            "sessions": size, **latencies(users.load, 50)})
+
+            # Agregación
+            record("aggregation", "rollups_rebuild", size,
+                   lambda: SessionRollups(data_dir).rebuild(journal), ops=size)
+            rollups.save()
+
+            def load_rollups():
+                loaded = SessionRollups(data_dir)
+                loaded.load_or_rebuild(journal)
+                return loaded
+            record("aggregation", "rollups_load", size, load_rollups)
+            record("aggregation", "journal_scan_per_day", size, journal.sessions_per_day, ops=size)
+            sqlite_store = create_session_store(stores["sqlite"], "sqlite")
+            record("aggregation", "sqlite_per_day", size, sqlite_store.sessions_per_day)
+            sqlite_store.close()
+            weekly = record("aggregation", "weekly_rows", size,
+                            lambda: weekly_rows(rollups.sessions_per_day("work"),
+                                                rollups.sessions_per_day("break"),
+                                                rollups.focus_minutes_per_day()))
+
+            # Gráficas y exportación
+            daily, hourly = rollups.sessions_per_day(), rollups.sessions_per_hour()
+            chart_png = optional("charts", "render_stats_png", size,
+                                 lambda: render_stats_png(daily, hourly, PRINT_THEME))
+            out = os.path.join(root, "out.csv")
+            record("export", "csv", size, lambda: export_sessions_csv(journal.iter_sessions(), out),
+                   ops=size)
+            record("export", "csv_gz", size,
+                   lambda: export_sessions_csv(journal.iter_sessions(), out + ".gz", compress=True),
+                   ops=size)
+            report = {"stats": [f"Sesiones: {size}"], "daily": daily, "hourly": hourly,
+                      "weekly": weekly, "achievements": [], "chart_png": chart_png}
+            optional("export", "pdf", size,
+                     lambda: build_pdf_report(os.path.join(root, "out.pdf"), report))
+
+            def run_backfill():
+                import backfill
+                with open(ACHIEVEMENTS_FILE, 'r', encoding='utf-8') as f:
+                    definitions = json.load(f)["available_achievements"]
+                return backfill.recompute(backfill.load_columns(journal.iter_sessions()),
+                                          definitions)
+            optional("analytics", "backfill", size, run_backfill, ops=size)
+        finally:
+            shutil.rmtree(root, ignore_errors=True)
+    return results
+
+
+def write_results(results, path):
+    """Guardar resultados con metadatos para comparar entre versiones"""
+    import platform
+
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                                text=True, cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except OSError:
+        commit = None
+    atomic_write_json(path, {
+        "meta": {"commit": commit or None, "python": platform.python_version(),
+                 "platform": platform.platform(), "timestamp": time.time()},
+        "results": results,
+    })
+
+
+def compare_results(baseline_path, results):
+    """Relación de tiempos frente a un archivo de resultados anterior (>1 = más lento)"""
+    with open(baseline_path, 'r', encoding='utf-8') as f:
+        baseline = json.load(f)["results"]
+
+    def key(row):
+        return row["group"], row["benchmark"], row["sessions"]
+
+    def cost(row):
+        return row.get("seconds", row.get("p50_ms"))
+
+    before = {key(row): cost(row) for row in baseline if cost(row)}
+    rows = []
+    for row in results:
+        if key(row) in before and cost(row):
+            rows.append({"benchmark": row["benchmark"], "sessions": row["sessions"],
+                         "before": before[key(row)], "after": cost(row),
+                         "ratio": cost(row) / before[key(row)]})
+    return rows
+
+
+def print_table(results):
+    columns = list(results[0].keys())
+    print("  ".join(f"{c:>12}" for c in columns))
+    for row in results:
+        print("  ".join(f"{v:>12.4f}" if isinstance(v, float) else f"{v:>12}"
+                        for v in row.values()))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmarks de Pomodoro Pro")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    backends = subparsers.add_parser("backends", help="Comparar almacenes JSONL y SQLite")
+    backends.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+
+    startup = subparsers.add_parser("startup", help="Arranque con carga inmediata vs diferida")
+    startup.add_argument("--runs", type=int, default=3)
+
+    csv_parser = subparsers.add_parser("csv", help="Exportación CSV en flujo vs pandas")
+    csv_parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+
+    subparsers.add_parser("drift", help="Deriva del temporizador en sesiones largas simuladas")
+    subparsers.add_parser("render", help="Despertares y redibujos del reloj con la ventana oculta")
+    subparsers.add_parser("checkpoint", help="Costo de guardar la sesión en curso")
+
+    concurrency = subparsers.add_parser("concurrency",
+                                        help="Rendimiento con varios procesos registrando a la vez")
+    concurrency.add_argument("--processes", type=int, default=4)
+    concurrency.add_argument("--sessions", type=int, default=500)
+    concurrency.add_argument("--backend", choices=list(SESSION_BACKENDS), nargs="+",
+                             default=list(SESSION_BACKENDS))
+
+    headless = subparsers.add_parser("headless", help="Miles de temporizadores sin ventana")
+    headless.add_argument("--timers", type=int, default=10_000)
+    headless.add_argument("--seconds", type=float, default=20)
+    headless.add_argument("--work", type=float, default=60, help="Segundos de trabajo por sesión")
+    headless.add_argument("--break", dest="break_s", type=float, default=20,
+                          help="Segundos de descanso por sesión")
+
+    suite = subparsers.add_parser("suite", help="Persistencia, agregación y exportación por tamaño")
+    suite.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000, 1_000_000])
+    suite.add_argument("--seed", type=int, default=42)
+    suite.add_argument("--output", default="benchmark_results.json")
+    suite.add_argument("--compare", help="Resultados anteriores para detectar regresiones")
+
+    wal_parser = subparsers.add_parser("wal", help="Tiempo de recuperación del registro previo")
+    wal_parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+
+    query_parser = subparsers.add_parser("query", help="Consultas con índice por fecha y hora")
+    query_parser.add_argument("--sizes", type=int, nargs="+", default=[100_000, 1_000_000])
+
+    backfill_parser = subparsers.add_parser("backfill", help="Recalcular logros y XP desde el historial")
+    backfill_parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+
+    args = parser.parse_args()
+    if args.command == "backends":
+        print_table(bench_backends(args.sizes))
+    elif args.command == "startup":
+        print_table(bench_startup(args.runs))
+    elif args.command == "csv":
+        print_table(bench_csv(args.sizes))
+    elif args.command == "concurrency":
+        print_table([bench_concurrency(args.processes, args.sessions, backend)
+                     for backend in args.backend])
+    elif args.command == "headless":
+        print_table(bench_headless(args.timers, args.seconds, args.work, args.break_s))
+    elif args.command == "suite":
+        results = bench_suite(args.sizes, args.seed)
+        for group in dict.fromkeys(r["group"] for r in results):
+            rows = [r for r in results if r["group"] == group]
+            for columns in dict.fromkeys(tuple(r) for r in rows):
+                print_table([r for r in rows if tuple(r) == columns])
+            print()
+        write_results(results, args.output)
+        print(f"✓ resultados en {args.output}")
+        if args.compare:
+            print_table(compare_results(args.compare, results))
+    elif args.command == "wal":
+        print_table(bench_wal_recovery(args.sizes))
+    elif args.command == "query":
+        print_table(bench_query(args.sizes))
+    elif args.command == "backfill":
+        print_table(bench_backfill(args.sizes))
+    elif args.command == "checkpoint":
+        print_table(bench_checkpoint())
+    elif args.command == "render":
+        print_table(bench_render())
+    elif args.command == "drift":
+        print_table(bench_drift())
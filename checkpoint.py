@@ -0,0 +1,101 @@
+import mmap
+import os
+import struct
+import time
+import zlib
+
+
+# magic, versión, en marcha, hubo pausa, tipo, secuencia, restante, duración,
+# inicio de la sesión (hora de pared), guardado (hora de pared)
+RECORD = struct.Struct("<4sBBBBQdddd")
+CRC = struct.Struct("<I")
+MAGIC = b"PCKP"
+VERSION = 1
+SLOT_SIZE = 64
+SESSION_TYPES = ("work", "break")
+
+
+class SessionCheckpoint:
+    """Estado de la sesión en curso en un archivo pequeño de tamaño fijo
+
+    El archivo tiene dos ranuras con CRC que se escriben por turnos sobre un
+    mmap, sin crear archivos ni renombrar: guardar cuesta una copia en
+    memoria. Si una escritura queda a medias, la otra ranura sigue valiendo.
+    Con 'sync' cada guardado se fuerza a disco (msync).
+    """
+
+    def __init__(self, path, sync=False):
+        self.path = path
+        self.sync = sync
+        self.saves = 0
+        size = SLOT_SIZE * 2
+        try:
+            f = open(path, "r+b")
+        except FileNotFoundError:
+            f = open(path, "w+b")
+        with f:
+            if os.fstat(f.fileno()).st_size != size:
+                f.truncate(size)
+            self._map = mmap.mmap(f.fileno(), size)
+        latest = self._latest()
+        self._seq = latest[0] if latest else 0
+
+    def _read_slot(self, index):
+        start = index * SLOT_SIZE
+        raw = self._map[start:start + RECORD.size + CRC.size]
+        (crc,) = CRC.unpack_from(raw, RECORD.size)
+        if crc != zlib.crc32(raw[:RECORD.size]):
+            return None
+        record = RECORD.unpack_from(raw)
+        if record[0] != MAGIC or record[1] != VERSION:
+            return None
+        return record
+
+    def _latest(self):
+        """(secuencia, registro) de la ranura válida más reciente"""
+        records = [r for r in (self._read_slot(0), self._read_slot(1)) if r is not None]
+        if not records:
+            return None
+        record = max(records, key=lambda r: r[5])
+        return record[5], record
+
+    def _write(self, running, paused, session_type, remaining, duration, session_start_time):
+        self._seq += 1
+        body = RECORD.pack(MAGIC, VERSION, running, paused, SESSION_TYPES.index(session_type),
+                           self._seq, remaining, duration, session_start_time or 0.0, time.time())
+        start = (self._seq % 2) * SLOT_SIZE
+        self._map[start:start + RECORD.size + CRC.size] = body + CRC.pack(zlib.crc32(body))
+        if self.sync:
+            self._map.flush()
+        self.saves += 1
+
+    def save(self, session_type, remaining, duration, session_start_time, running, paused):
+        """Guardar la sesión en curso (restante y duración en segundos)"""
+        self._write(1 if running else 0, 1 if paused else 0, session_type, remaining, duration,
+                    session_start_time)
+
+    def clear(self):
+        """Marcar que no hay sesión en curso"""
+        self._write(0, 0, "work", 0.0, 0.0, None)
+
+    def load(self):
+        """Sesión interrumpida, o None si no había ninguna empezada"""
+        latest = self._latest()
+        if latest is None:
+            return None
+        (_, _, running, paused, session_type, _, remaining, duration,
+         session_start_time, saved_at) = latest[1]
+        if duration <= 0 or remaining >= duration:
+            return None
+        return {
+            "session_type": SESSION_TYPES[session_type],
+            "remaining": remaining,
+            "duration": duration,
+            "session_start_time": session_start_time or None,
+            "saved_at": saved_at,
+            "running": bool(running),
+            "paused": bool(paused),
+        }
+
+    def close(self):
+        self._map.close()
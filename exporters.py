@@ -0,0 +1,145 @@
+import csv
+import datetime as dt
+import gzip
+import io
+
+from instrumentation import metrics
+from session_store import session_duration
+
+
+CSV_FIELDS = ["date", "time", "type", "duration", "completed", "tags", "notes"]
+
+
+def session_csv_row(session):
+    """Fila CSV de una sesión (registros nuevos y formato antiguo)"""
+    tags = session.get("tags")
+    return (
+        session.get("date", ""),
+        session.get("time", ""),
+        session.get("type", ""),
+        session_duration(session),
+        bool(session.get("completed")),
+        ";".join(tags) if isinstance(tags, list) else (tags or ""),
+        session.get("notes", ""),
+    )
+
+
+@metrics.timed("export_csv")
+def export_sessions_csv(sessions, path, compress=False, chunk_size=1000):
+    """Escribir sesiones a CSV por bloques de tamaño fijo; devuelve las filas escritas
+
+    'sessions' puede ser cualquier iterable (por ejemplo, el flujo del almacén),
+    así que la memoria usada no depende del tamaño del historial.
+    """
+    opener = gzip.open if compress else open
+    rows = 0
+    with opener(path, 'wt', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(CSV_FIELDS)
+        chunk = []
+        for session in sessions:
+            chunk.append(session_csv_row(session))
+            if len(chunk) >= chunk_size:
+                writer.writerows(chunk)
+                rows += len(chunk)
+                chunk.clear()
+        writer.writerows(chunk)
+        rows += len(chunk)
+    return rows
+
+
+PRINT_THEME = {"bg": "#ffffff", "fg": "#1a1a1a"}
+
+
+def weekly_rows(work_per_day, break_per_day, focus_per_day):
+    """Agrupar los acumulados diarios por semana ISO"""
+    weeks = {}
+    for source, column in ((work_per_day, 0), (break_per_day, 1), (focus_per_day, 2)):
+        for date, value in source.items():
+            try:
+                year, week, _ = dt.date.fromisoformat(date).isocalendar()
+            except ValueError:
+                continue
+            weeks.setdefault(f"{year}-W{week:02}", [0, 0, 0])[column] += value
+    return [(week, work, breaks, f"{focus // 60}h {focus % 60}m")
+            for week, (work, breaks, focus) in sorted(weeks.items())]
+
+
+@metrics.timed("export_pdf")
+def build_pdf_report(path, report, progress=None):
+    """Generar un reporte PDF de varias páginas; devuelve el PNG de gráficas usado
+
+    'report' es un dict simple (se puede enviar a otro proceso) con las claves
+    'stats', 'daily', 'hourly', 'weekly', 'achievements' y opcionalmente
+    'chart_png' si las gráficas ya se dibujaron antes.
+    """
+    from reportlab.lib import colors
+    from reportlab.lib.pagesizes import letter
+    from reportlab.lib.styles import getSampleStyleSheet
+    from reportlab.lib.units import inch
+    from reportlab.platypus import (Image, LongTable, PageBreak, Paragraph,
+                                    SimpleDocTemplate, Spacer, TableStyle)
+
+    def report_progress(fraction, message):
+        if progress is not None:
+            progress(fraction, message)
+
+    styles = getSampleStyleSheet()
+    story = [Paragraph("Reporte de Productividad Pomodoro", styles["Title"])]
+
+    # Resumen
+    for stat in report["stats"]:
+        story.append(Paragraph(stat, styles["Normal"]))
+    story.append(Spacer(1, 0.3 * inch))
+
+    # Gráficas: se dibujan una sola vez y se reutilizan si ya existen
+    chart_png = report.get("chart_png")
+    if chart_png is None and report["daily"]:
+        report_progress(0.1, "Dibujando gráficas")
+        from stats_charts import render_stats_png
+        chart_png = render_stats_png(report["daily"], report["hourly"], PRINT_THEME)
+    if chart_png is not None:
+        story.append(Image(io.BytesIO(chart_png), width=7 * inch, height=4.67 * inch))
+    report_progress(0.3, "Gráficas listas")
+
+    table_style = TableStyle([
+        ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#003200")),
+        ("TEXTCOLOR", (0, 0), (-1, 0), colors.HexColor("#00ff00")),
+        ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
+        ("GRID", (0, 0), (-1, -1), 0.25, colors.grey),
+        ("ROWBACKGROUNDS", (0, 1), (-1, -1), [colors.white, colors.HexColor("#f0f0f0")]),
+    ])
+
+    # Tabla semanal (se parte en varias páginas repitiendo el encabezado)
+    if report["weekly"]:
+        story.append(PageBreak())
+        story.append(Paragraph("Resumen Semanal", styles["Heading1"]))
+        rows = [("Semana", "Sesiones de Trabajo", "Descansos", "Tiempo de Enfoque")]
+        rows.extend(report["weekly"])
+        story.append(LongTable(rows, repeatRows=1, style=table_style))
+
+    # Logros
+    story.append(Spacer(1, 0.3 * inch))
+    story.append(Paragraph("Logros Desbloqueados", styles["Heading1"]))
+    if report["achievements"]:
+        rows = [("Logro", "Descripción")]
+        rows.extend((name, Paragraph(desc, styles["Normal"])) for name, desc in report["achievements"])
+        story.append(LongTable(rows, repeatRows=1, colWidths=[2 * inch, 4.5 * inch], style=table_style))
+    else:
+        story.append(Paragraph("Todavía no hay logros desbloqueados.", styles["Normal"]))
+    report_progress(0.4, "Maquetando páginas")
+
+    doc = SimpleDocTemplate(path, pagesize=letter, title="Reporte de Productividad Pomodoro")
+    total = [len(story)]
+
+    def on_layout(kind, value):
+        # reportlab informa el total estimado y cuántos elementos lleva maquetados
+        if kind == "SIZE_EST":
+            total[0] = max(1, value)
+        elif kind == "PROGRESS":
+            report_progress(0.4 + 0.55 * min(value, total[0]) / total[0], "Maquetando páginas")
+
+    doc.setProgressCallBack(on_layout)
+    doc.build(story)
+    report_progress(1.0, "Reporte guardado")
+    return chart_png
@@ -0,0 +1,61 @@
+import functools
+import tkinter as tk
+
+
+@functools.lru_cache(maxsize=8)
+def gradient_ppm(top, bottom, width, height):
+    """Degradado vertical de 'top' a 'bottom' (RGB de 8 bits) como imagen PPM binaria
+
+    Se calcula un color por fila y se repite a lo ancho con una sola
+    operación de NumPy; el resultado queda en caché por colores y tamaño.
+    """
+    import numpy as np
+
+    top = np.array(top, dtype=np.float64)
+    bottom = np.array(bottom, dtype=np.float64)
+    steps = np.arange(height, dtype=np.float64)[:, None] / height
+    rows = (top + (bottom - top) * steps).astype(np.uint8)
+    pixels = np.broadcast_to(rows[:, None, :], (height, width, 3))
+    return f"P6 {width} {height} 255\n".encode("ascii") + pixels.tobytes()
+
+
+class GradientBackground:
+    """Fondo degradado dibujado como un único elemento de imagen en un Canvas
+
+    Al cambiar el tamaño del Canvas se vuelve a generar la imagen una vez
+    por vuelta del bucle de Tk, aunque lleguen muchos eventos <Configure>.
+    """
+
+    def __init__(self, master, colors, **canvas_options):
+        self.canvas = tk.Canvas(master, highlightthickness=0, bd=0, **canvas_options)
+        self.image = tk.PhotoImage(master=self.canvas)
+        self.canvas.create_image(0, 0, image=self.image, anchor="nw")
+        self._size = None
+        self._job = None
+        self.colors = tuple(self._rgb(color) for color in colors)
+        self.canvas.bind("<Configure>", self._on_configure)
+
+    def _rgb(self, color):
+        # winfo_rgb acepta nombres de Tk y hexadecimales; devuelve 16 bits por canal
+        return tuple(value >> 8 for value in self.canvas.winfo_rgb(color))
+
+    def set_colors(self, colors):
+        """Cambiar los colores del degradado (por ejemplo, al cambiar de tema)"""
+        self.colors = tuple(self._rgb(color) for color in colors)
+        self._size = None
+        self.render()
+
+    def _on_configure(self, event):
+        if self._job is None:
+            self._job = self.canvas.after_idle(self.render)
+
+    def render(self):
+        """Regenerar la imagen si cambió el tamaño del Canvas"""
+        self._job = None
+        size = (max(1, self.canvas.winfo_width()), max(1, self.canvas.winfo_height()))
+        if size == self._size:
+            return
+        self._size = size
+        width, height = size
+        self.image.configure(width=width, height=height,
+                             data=gradient_ppm(*self.colors, width, height))
@@ -0,0 +1,370 @@
+import asyncio
+import datetime as dt
+import json
+import os
+
+from achievement_rules import AchievementRuleEngine, pause_penalty, reward_session
+from persistence import WriteBehindWriter
+from rollups import SessionRollups
+from scheduler import TkScheduler
+from session_store import create_session_store
+from timer_engine import TimerEngine
+from wal import WriteAheadLog
+
+
+class LoopAfter:
+    """after()/after_cancel() de Tk sobre un bucle de asyncio (para TkScheduler)"""
+
+    def __init__(self, loop):
+        self.loop = loop
+        self.wakeups = 0
+
+    def after(self, delay_ms, callback):
+        self.wakeups += 1
+        return self.loop.call_later(delay_ms / 1000, callback)
+
+    def after_cancel(self, handle):
+        handle.cancel()
+
+    def report_callback_exception(self, exc_type, value, traceback):
+        self.loop.call_exception_handler({"message": "Error en una tarea programada",
+                                          "exception": value})
+
+
+def new_user_data(saved=None):
+    """Progreso de un temporizador con los mismos campos que user_data.json"""
+    user_data = {
+        "total_points": 0,
+        "level": 1,
+        "experience": 0,
+        "completed_sessions": 0,
+        "total_focus_time": 0,
+        "achievements": [],
+        "daily_stats": {}
+    }
+    if isinstance(saved, dict):
+        user_data.update(saved)
+    return user_data
+
+
+class HeadlessTimer:
+    """Estado de un temporizador sin ventana (lo mismo que guarda Pomodoro)"""
+
+    __slots__ = ("timer_id", "engine", "session_type", "work_min", "break_min", "paused",
+                 "pause_started", "call", "user_data")
+
+    def __init__(self, timer_id, work_min, break_min, clock, user_data=None):
+        self.timer_id = timer_id
+        self.work_min = work_min
+        self.break_min = break_min
+        self.session_type = "work"
+        self.engine = TimerEngine(work_min * 60, clock=clock)
+        self.paused = False
+        self.pause_started = None
+        self.call = None
+        self.user_data = new_user_data(user_data)
+
+    @property
+    def running(self):
+        return self.engine.running
+
+    def to_dict(self):
+        return {
+            "id": self.timer_id,
+            "session_type": self.session_type,
+            "running": self.running,
+            "remaining": round(self.engine.remaining_exact(), 1),
+            "total_points": self.user_data["total_points"],
+            "level": self.user_data["level"],
+            "completed_sessions": self.user_data["completed_sessions"],
+            "total_focus_time": self.user_data["total_focus_time"],
+            "achievements": list(self.user_data["achievements"]),
+        }
+
+
+class HeadlessTimerServer:
+    """Muchos temporizadores Pomodoro en un solo bucle de asyncio
+
+    Cada temporizador en marcha tiene una sola entrada en el montículo del
+    planificador (su fecha de fin), sin ticks por segundo. Las sesiones que
+    terminan en la misma vuelta del bucle se registran en un solo lote.
+
+    Cada temporizador lleva su propio progreso (puntos, experiencia, nivel,
+    daily_stats y logros, en headless_timers.json) con las mismas reglas
+    que la ventana, incluida la penalización por pausa. Los datos van a un
+    directorio propio para no mezclarse con el historial personal.
+    """
+
+    def __init__(self, data_dir="pomodoro_headless", backend="jsonl", auto_continue=True,
+                 save_interval=5.0,
+                 achievements_file=os.path.join("pomodoro_data", "achievements.json")):
+        self.loop = asyncio.get_running_loop()
+        self.auto_continue = auto_continue
+        self.save_interval = save_interval
+        self.after = LoopAfter(self.loop)
+        self.scheduler = TkScheduler(self.after, clock=self.loop.time)
+        self.timers = {}
+
+        os.makedirs(data_dir, exist_ok=True)
+        self.state_path = os.path.join(data_dir, "headless_timers.json")
+        self.saved_totals = self._load_state()
+        # Las mismas definiciones de logros que la ventana
+        self.achievements = self._load_achievements(achievements_file)
+        self.session_store = create_session_store(data_dir, backend)
+        self.wal = WriteAheadLog(data_dir, self.session_store)
+        recovery = self.wal.recover()
+        self.rollups = SessionRollups(data_dir)
+        if recovery["sessions_restored"]:
+            self.rollups.rebuild(self.session_store)
+        else:
+            self.rollups.load_or_rebuild(self.session_store)
+        self.writer = WriteBehindWriter(delay=1.0)
+        self._pending_sessions = []
+        self._flush_scheduled = False
+        self._dirty = False
+        self._save_job = self.scheduler.call_later(save_interval, self._periodic_save)
+
+        # Métricas de carga
+        self.completions = 0
+        self.lateness_total = 0.0
+        self.lateness_max = 0.0
+
+    # --------- Control de temporizadores ----------
+    def add_timer(self, timer_id, work_min=25, break_min=5):
+        if timer_id in self.timers:
+            raise KeyError(f"el temporizador '{timer_id}' ya existe")
+        # Un temporizador con el mismo id sigue desde su progreso guardado
+        timer = HeadlessTimer(timer_id, work_min, break_min, self.loop.time,
+                              self.saved_totals.get(timer_id))
+        self.timers[timer_id] = timer
+        return timer
+
+    def remove_timer(self, timer_id):
+        timer = self.timers.pop(timer_id)
+        self.scheduler.cancel(timer.call)
+
+    def start(self, timer_id):
+        """Iniciar o reanudar (como el botón START)"""
+        timer = self.timers[timer_id]
+        if not timer.running:
+            self._end_pause(timer)
+            timer.engine.start()
+            timer.call = self.scheduler.call_later(timer.engine.remaining_exact(),
+                                                   lambda: self._complete(timer))
+
+    def pause(self, timer_id):
+        """Pausar; la sesión ya no da recompensas al terminar"""
+        timer = self.timers[timer_id]
+        if timer.running:
+            timer.engine.pause()
+            self.scheduler.cancel(timer.call)
+            timer.call = None
+            timer.paused = True
+            timer.pause_started = self.loop.time()
+
+    def _end_pause(self, timer):
+        """Restar los puntos de la pausa en curso, como Pomodoro.end_pause_penalty"""
+        if timer.pause_started is None:
+            return
+        penalty = pause_penalty(self.loop.time() - timer.pause_started)
+        timer.pause_started = None
+        user_data = timer.user_data
+        user_data["total_points"] = max(0, user_data["total_points"] - penalty)
+        self._dirty = True
+
+    def reset(self, timer_id):
+        """Volver a una sesión de trabajo completa y detenida"""
+        timer = self.timers[timer_id]
+        self.scheduler.cancel(timer.call)
+        timer.call = None
+        self._end_pause(timer)
+        if timer.session_type == "work" and timer.engine.remaining < timer.work_min * 60:
+            # Abandonar una sesión de trabajo empezada corta la racha
+            self._rules(timer).break_streak(timer.user_data)
+            self._dirty = True
+        timer.session_type = "work"
+        timer.paused = False
+        timer.engine.reset(timer.work_min * 60)
+
+    def status(self, timer_id=None):
+        if timer_id is not None:
+            return self.timers[timer_id].to_dict()
+        return [timer.to_dict() for timer in self.timers.values()]
+
+    # --------- Fin de sesión (misma lógica que Pomodoro.complete_session) ----------
+    def _complete(self, timer):
+        lateness = self.loop.time() - timer.call.deadline
+        self.completions += 1
+        self.lateness_total += lateness
+        self.lateness_max = max(self.lateness_max, lateness)
+        timer.call = None
+
+        if not timer.paused:
+            duration = timer.work_min if timer.session_type == "work" else timer.break_min
+            now = dt.datetime.now()
+            self._pending_sessions.append({
+                "date": now.strftime("%Y-%m-%d"),
+                "time": now.strftime("%H:%M:%S"),
+                "type": timer.session_type,
+                "duration": duration,
+                "completed": True,
+                "timer_id": timer.timer_id,
+            })
+            reward_session(timer.user_data, self._rules(timer), self.achievements,
+                           timer.session_type, duration, now)
+            if not self._flush_scheduled:
+                self._flush_scheduled = True
+                self.loop.call_soon(self._flush_sessions)
+        elif timer.session_type == "work":
+            # Una sesión con pausas no suma a la racha
+            self._rules(timer).break_streak(timer.user_data)
+            self._dirty = True
+
+        # Cambiar tipo de sesión
+        timer.session_type = "break" if timer.session_type == "work" else "work"
+        timer.engine.reset((timer.break_min if timer.session_type == "break" else timer.work_min) * 60)
+        timer.paused = False
+        if self.auto_continue:
+            self.start(timer.timer_id)
+
+    def _flush_sessions(self):
+        """Registrar en un solo lote las sesiones terminadas en esta vuelta"""
+        self._flush_scheduled = False
+        sessions, self._pending_sessions = self._pending_sessions, []
+        if sessions:
+            self.wal.append_sessions(sessions)
+            self.rollups.catch_up(self.session_store)
+            self._dirty = True
+
+    def _rules(self, timer):
+        """Motor de logros con solo las reglas que le faltan a este temporizador
+
+        Se compila en cada sesión terminada (son pocas reglas) en lugar de
+        guardar uno por temporizador, para que la memoria no crezca con miles.
+        """
+        return AchievementRuleEngine(self.achievements, timer.user_data["achievements"])
+
+    def _load_achievements(self, path):
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)["available_achievements"]
+        except (FileNotFoundError, ValueError, KeyError):
+            return {}
+
+    def _load_state(self):
+        try:
+            with open(self.state_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return {}
+        except ValueError:
+            # Conservar el archivo dañado en lugar de sobrescribirlo con ceros
+            os.replace(self.state_path, self.state_path + ".corrupt")
+            return {}
+        return data if isinstance(data, dict) else {}
+
+    def save_state(self):
+        """Programar el guardado de los puntos por temporizador y de los acumulados"""
+        self._dirty = False
+        # Los temporizadores guardados que aún no se volvieron a crear se conservan
+        for timer_id, t in self.timers.items():
+            self.saved_totals[timer_id] = t.user_data
+        self.writer.schedule(self.state_path, dict(self.saved_totals))
+        self.writer.schedule_render(self.rollups.path, self.rollups.to_json)
+
+    def _periodic_save(self):
+        # Una foto cada 'save_interval' en lugar de una por sesión terminada
+        if self._dirty:
+            self.save_state()
+        self._save_job = self.scheduler.call_later(self.save_interval, self._periodic_save)
+
+    def close(self):
+        """Detener todos los temporizadores y guardar lo pendiente"""
+        self.scheduler.shutdown()
+        self._flush_sessions()
+        self.save_state()
+        self.writer.close()
+        self.wal.checkpoint()
+        self.session_store.close()
+
+    # --------- Control remoto (una orden JSON por línea) ----------
+    async def handle_client(self, reader, writer):
+        """Órdenes: add, remove, start, pause, reset, status"""
+        commands = {"remove": self.remove_timer, "start": self.start, "pause": self.pause,
+                    "reset": self.reset}
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    request = json.loads(line)
+                    if not isinstance(request, dict):
+                        raise ValueError("se esperaba un objeto JSON")
+                    command = request.get("cmd")
+                    timer_id = request.get("id")
+                    if timer_id is not None and not isinstance(timer_id, str):
+                        raise ValueError("'id' debe ser un texto")
+                    if command == "add":
+                        if not timer_id:
+                            raise ValueError("'add' necesita un 'id'")
+                        reply = self.add_timer(timer_id, _minutes(request, "work_min", 25),
+                                               _minutes(request, "break_min", 5)).to_dict()
+                    elif command == "status":
+                        reply = self.status(timer_id)
+                    elif command in commands:
+                        commands[command](timer_id)
+                        reply = self.status(timer_id) if timer_id in self.timers else None
+                    else:
+                        raise ValueError(f"orden desconocida: {command}")
+                    response = {"ok": True, "result": reply}
+                except (ValueError, KeyError, TypeError) as error:
+                    response = {"ok": False, "error": str(error)}
+                writer.write(json.dumps(response, ensure_ascii=False).encode("utf-8") + b"\n")
+                await writer.drain()
+        finally:
+            writer.close()
+
+
+def _minutes(request, key, default):
+    """Minutos de una orden: número positivo o el valor por defecto"""
+    value = request.get(key, default)
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or not value > 0:
+        raise ValueError(f"'{key}' debe ser un número positivo")
+    return value
+
+
+async def serve(data_dir, backend, host, port, timers, work_min, break_min, achievements_file):
+    server = HeadlessTimerServer(data_dir, backend, achievements_file=achievements_file)
+    for index in range(timers):
+        server.add_timer(f"t{index}", work_min, break_min)
+        server.start(f"t{index}")
+    control = await asyncio.start_server(server.handle_client, host, port)
+    print(f"✓ {timers} temporizadores; control en {host}:{port}")
+    try:
+        async with control:
+            await control.serve_forever()
+    finally:
+        server.close()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Servidor de temporizadores Pomodoro sin ventana")
+    parser.add_argument("--data-dir", default="pomodoro_headless",
+                        help="Aparte de pomodoro_data para no mezclar con el historial personal")
+    parser.add_argument("--achievements", default=os.path.join("pomodoro_data", "achievements.json"))
+    parser.add_argument("--backend", choices=["jsonl", "sqlite"], default="jsonl")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--timers", type=int, default=0, help="Temporizadores a crear e iniciar")
+    parser.add_argument("--work", type=float, default=25, help="Minutos de trabajo")
+    parser.add_argument("--break", dest="break_min", type=float, default=5, help="Minutos de descanso")
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(serve(args.data_dir, args.backend, args.host, args.port,
+                          args.timers, args.work, args.break_min, args.achievements))
+    except KeyboardInterrupt:
+        pass
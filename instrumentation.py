@@ -0,0 +1,213 @@
+import functools
+import json
+import logging
+import logging.handlers
+import os
+import threading
+import time
+from collections import deque
+
+
+# Límites (en segundos) de los histogramas de Prometheus
+BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+
+class _NullSpan:
+    """Span que no hace nada (instrumentación desactivada)"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ("metrics", "name", "start")
+
+    def __init__(self, metrics, name):
+        self.metrics = metrics
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.metrics.record_span(self.name, self.start, time.perf_counter() - self.start)
+        return False
+
+
+class Histogram:
+    """Cuenta, suma, máximo y cubetas acumuladas de una medida"""
+
+    __slots__ = ("count", "total", "max", "buckets")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.buckets = [0] * len(BUCKETS)
+
+    def add(self, value):
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+        for index, bound in enumerate(BUCKETS):
+            if value <= bound:
+                self.buckets[index] += 1
+                break
+
+    def to_dict(self):
+        return {"count": self.count, "total": self.total, "max": self.max}
+
+
+class Metrics:
+    """Spans, contadores y medidas de las rutas críticas
+
+    Desactivada cuesta una comprobación de atributo por llamada. Activada
+    guarda agregados por nombre y los últimos eventos para un trace de Chrome.
+    Se puede llamar desde cualquier hilo.
+    """
+
+    def __init__(self, max_events=20_000):
+        self.enabled = False
+        self._lock = threading.Lock()
+        self._origin = time.perf_counter()
+        self.histograms = {}
+        self.counters = {}
+        self.events = deque(maxlen=max_events)
+        self._export_stop = None
+
+    def enable(self):
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def span(self, name):
+        """Medir un bloque: with metrics.span("nombre"): ..."""
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name)
+
+    def timed(self, name):
+        """Decorador que mide cada llamada a la función"""
+        def decorator(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                start = time.perf_counter()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    self.record_span(name, start, time.perf_counter() - start)
+            return wrapper
+        return decorator
+
+    def record_span(self, name, start, duration):
+        event = (name, start - self._origin, duration, os.getpid(), threading.get_ident())
+        with self._lock:
+            self._histogram(name).add(duration)
+            self.events.append(event)
+
+    def observe(self, name, value):
+        """Registrar una medida suelta en segundos (por ejemplo, retraso de un tick)"""
+        if self.enabled:
+            with self._lock:
+                self._histogram(name).add(value)
+
+    def count(self, name, value=1):
+        if self.enabled:
+            with self._lock:
+                self.counters[name] = self.counters.get(name, 0) + value
+
+    def _histogram(self, name):
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            histogram = self.histograms[name] = Histogram()
+        return histogram
+
+    def reset(self):
+        with self._lock:
+            self.histograms.clear()
+            self.counters.clear()
+            self.events.clear()
+
+    # --------- Exportación ----------
+    def snapshot(self):
+        """Agregados actuales como diccionario serializable"""
+        with self._lock:
+            return {
+                "time": time.time(),
+                "spans": {name: h.to_dict() for name, h in self.histograms.items()},
+                "counters": dict(self.counters),
+            }
+
+    def prometheus_text(self, prefix="pomodoro"):
+        """Formato de texto de Prometheus (histogramas en segundos y contadores)"""
+        lines = []
+        with self._lock:
+            for name, histogram in sorted(self.histograms.items()):
+                metric = f"{prefix}_{name}_seconds"
+                lines.append(f"# TYPE {metric} histogram")
+                cumulative = 0
+                for bound, count in zip(BUCKETS, histogram.buckets):
+                    cumulative += count
+                    lines.append(f'{metric}_bucket{{le="{bound}"}} {cumulative}')
+                lines.append(f'{metric}_bucket{{le="+Inf"}} {histogram.count}')
+                lines.append(f"{metric}_sum {histogram.total}")
+                lines.append(f"{metric}_count {histogram.count}")
+            for name, value in sorted(self.counters.items()):
+                metric = f"{prefix}_{name}_total"
+                lines.append(f"# TYPE {metric} counter")
+                lines.append(f"{metric} {value}")
+        return "\n".join(lines) + "\n"
+
+    def write_chrome_trace(self, path):
+        """Eventos recientes en formato Trace Event (chrome://tracing, Perfetto)"""
+        with self._lock:
+            events = list(self.events)
+        trace = [{"name": name, "ph": "X", "ts": start * 1e6, "dur": duration * 1e6,
+                  "pid": pid, "tid": tid}
+                 for name, start, duration, pid, tid in events]
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({"traceEvents": trace, "displayTimeUnit": "ms"}, f)
+
+    def start_file_export(self, path, interval=60.0, max_bytes=1_000_000, backups=3):
+        """Anexar una foto de los agregados cada 'interval' a un archivo rotativo"""
+        self.stop_file_export()
+        logger = logging.getLogger(f"pomodoro.metrics.{path}")
+        logger.propagate = False
+        logger.setLevel(logging.INFO)
+        handler = logging.handlers.RotatingFileHandler(path, maxBytes=max_bytes,
+                                                       backupCount=backups, encoding="utf-8")
+        logger.addHandler(handler)
+        stop = threading.Event()
+
+        def run():
+            while not stop.wait(interval):
+                logger.info(json.dumps(self.snapshot()))
+            logger.info(json.dumps(self.snapshot()))
+            logger.removeHandler(handler)
+            handler.close()
+
+        thread = threading.Thread(target=run, name="metrics-export", daemon=True)
+        thread.start()
+        self._export_stop = (stop, thread)
+
+    def stop_file_export(self):
+        """Escribir la última foto y detener la exportación periódica"""
+        if self._export_stop is not None:
+            stop, thread = self._export_stop
+            stop.set()
+            thread.join()
+            self._export_stop = None
+
+
+metrics = Metrics()
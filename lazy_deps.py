@@ -0,0 +1,52 @@
+import threading
+from types import SimpleNamespace
+
+
+class LazyLoader:
+    """Carga diferida (y segura entre hilos) de un subsistema pesado"""
+
+    def __init__(self, name, loader):
+        self.name = name
+        self._loader = loader
+        self._lock = threading.Lock()
+        self._value = None
+
+    @property
+    def loaded(self):
+        return self._value is not None
+
+    def get(self):
+        """Importar el subsistema la primera vez que se usa"""
+        if self._value is None:
+            with self._lock:
+                if self._value is None:
+                    self._value = self._loader()
+        return self._value
+
+
+def _load_charts():
+    # Sin pyplot: las figuras se dibujan con Agg y no quedan registradas
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    return SimpleNamespace(Figure=Figure, FigureCanvasAgg=FigureCanvasAgg)
+
+
+charts = LazyLoader("charts", _load_charts)
+
+# Solo las gráficas: pandas ya no se usa y reportlab se importa en el proceso del PDF
+ALL = (charts,)
+
+
+def prewarm(loaders=ALL):
+    """Cargar los subsistemas en un hilo de fondo; devuelve el hilo"""
+    def run():
+        for loader in loaders:
+            try:
+                loader.get()
+            except ImportError:
+                # Se reportará cuando el usuario abra el panel correspondiente
+                pass
+
+    thread = threading.Thread(target=run, name="prewarm", daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,236 @@
+import atexit
+import json
+import os
+import threading
+import time
+
+from instrumentation import metrics
+
+if os.name == "nt":
+    import msvcrt
+
+    def _lock_file(f):
+        f.seek(0)
+        while True:
+            try:
+                # LK_LOCK reintenta durante unos 10 s y luego falla: seguir esperando
+                msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+                return
+            except OSError:
+                continue
+
+    def _unlock_file(f):
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+else:
+    import fcntl
+
+    def _lock_file(f):
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+
+    def _unlock_file(f):
+        fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+def atomic_write_text(path, text, fsync=False):
+    """Escribir un archivo de texto completo de forma atómica (temporal + rename)"""
+    atomic_write_bytes(path, text.encode("utf-8"), fsync=fsync)
+
+
+def atomic_write_bytes(path, data, fsync=False):
+    """Escribir un archivo completo de forma atómica, sin traducir saltos de línea"""
+    # Temporal propio de cada proceso e hilo: dos escritores no se pisan el archivo
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+            f.flush()
+            if fsync:
+                os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+    if fsync and hasattr(os, "O_DIRECTORY"):
+        # Persistir también la entrada del directorio (POSIX)
+        dir_fd = os.open(os.path.dirname(path) or ".", os.O_DIRECTORY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+
+
+def atomic_write_json(path, data, fsync=False):
+    """Guardar JSON legible de forma atómica"""
+    atomic_write_text(path, json.dumps(data, indent=2, ensure_ascii=False), fsync=fsync)
+
+
+class FileLock:
+    """Candado exclusivo entre procesos sobre un archivo .lock
+
+    Es reentrante dentro del proceso, y los hilos del mismo proceso se
+    excluyen entre sí con un candado normal antes de tocar el archivo.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._thread_lock = threading.RLock()
+        self._depth = 0
+        self._file = None
+
+    def acquire(self):
+        self._thread_lock.acquire()
+        if self._depth == 0:
+            try:
+                f = open(self.path, 'a+b')
+                try:
+                    _lock_file(f)
+                except BaseException:
+                    f.close()
+                    raise
+            except BaseException:
+                self._thread_lock.release()
+                raise
+            self._file = f
+        self._depth += 1
+
+    def release(self):
+        self._depth -= 1
+        if self._depth == 0:
+            try:
+                _unlock_file(self._file)
+            finally:
+                self._file.close()
+                self._file = None
+        self._thread_lock.release()
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.release()
+
+
+class WriteBehindWriter:
+    """Escritura diferida que agrupa cambios seguidos y los guarda en segundo plano"""
+
+    def __init__(self, delay=1.0, fsync=False):
+        self.delay = delay
+        self.fsync = fsync
+        self.writes_requested = 0
+        self.writes_performed = 0
+        self._pending = {}  # ruta -> (texto, instante del primer cambio, función de guardado)
+        self._cond = threading.Condition()
+        self._write_lock = threading.Lock()  # mantiene el orden de las escrituras
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="write-behind", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    @property
+    def writes_coalesced(self):
+        """Escrituras a disco ahorradas al agrupar cambios"""
+        return self.writes_requested - self.writes_performed - len(self._pending)
+
+    def schedule(self, path, data, commit=None):
+        """Programar el guardado de un JSON; devuelve de inmediato
+
+        'commit(ruta, texto)' reemplaza la escritura atómica por defecto, por
+        ejemplo para combinar con cambios de otro proceso al momento de guardar.
+        """
+        # Se serializa aquí para guardar una foto fija de los datos
+        self._schedule(path, json.dumps(data, indent=2, ensure_ascii=False), commit)
+
+    def schedule_render(self, path, render, commit=None):
+        """Programar un guardado cuyo texto produce 'render()' al momento de escribir
+
+        Para datos grandes que cambian seguido (los acumulados): la foto se
+        toma en el hilo de escritura y una sola vez por grupo de cambios, no
+        en cada llamada. 'render' debe ser seguro de llamar desde otro hilo.
+        """
+        self._schedule(path, render, commit)
+
+    def _schedule(self, path, text, commit):
+        with self._cond:
+            closed = self._closed
+            if not closed:
+                first_change = self._pending.get(path, (None, time.monotonic()))[1]
+                self._pending[path] = (text, first_change, commit)
+                self._cond.notify()
+            self.writes_requested += 1
+        if closed:
+            # Tras el cierre se escribe de inmediato
+            with self._write_lock:
+                self._write_all({path: (text, commit)})
+
+    def pending_text(self, path):
+        """Contenido aún no guardado de una ruta, o None"""
+        with self._cond:
+            entry = self._pending.get(path)
+        if entry is None:
+            return None
+        return entry[0]() if callable(entry[0]) else entry[0]
+
+    def _take_due(self, force=False):
+        now = time.monotonic()
+        due = {path: (text, commit) for path, (text, since, commit) in self._pending.items()
+               if force or now - since >= self.delay}
+        for path in due:
+            del self._pending[path]
+        return due
+
+    def _write_all(self, due):
+        if due:
+            metrics.count("disk_writes", len(due))
+        for path, (text, commit) in due.items():
+            with metrics.span("disk_write"):
+                if callable(text):
+                    text = text()
+                if commit is None:
+                    atomic_write_text(path, text, fsync=self.fsync)
+                else:
+                    commit(path, text)
+        with self._cond:
+            self.writes_performed += len(due)
+            self._cond.notify_all()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._closed:
+                    if self._pending:
+                        oldest = min(entry[1] for entry in self._pending.values())
+                        wait = oldest + self.delay - time.monotonic()
+                        if wait <= 0:
+                            break
+                        self._cond.wait(wait)
+                    else:
+                        self._cond.wait()
+                if self._closed:
+                    return
+            with self._write_lock:
+                with self._cond:
+                    due = self._take_due()
+                self._write_all(due)
+
+    def flush(self):
+        """Guardar ya todo lo pendiente (en el hilo que llama)"""
+        with self._write_lock:
+            with self._cond:
+                due = self._take_due(force=True)
+            self._write_all(due)
+
+    def close(self):
+        """Detener el hilo y guardar lo pendiente de forma determinista"""
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join()
+        self.flush()
@@ -2,6 +2,7 @@ import datetime as dt
 import customtkinter as ctk
 from PIL import Image
 import tkinter.font as tkFont
+from timer_engine import TimerEngine
 
 ctk.set_appearance_mode("dark")
 # Si no tienes el archivo themes/console.json, usa el tema oscuro por defecto
@@ -128,43 +129,54 @@ class Pomodoro(ctk.CTk):
         
         # Variables de control
         self.running = False
-        self.remaining = self.WORK_MIN * 60
+        self.timer = TimerEngine(self.WORK_MIN * 60)
+        self._tick_job = None
         self._update_label()
         
         # Mantener siempre encima
         self.attributes("-topmost", True)
     
     def _update_label(self):
-        m, s = divmod(self.remaining, 60)
+        m, s = divmod(self.timer.remaining, 60)
         self.timer_var.set(f"{m:02}:{s:02}")
     
     def _countdown(self):
+        self._tick_job = None
         if self.running:
-            if self.remaining <= 0:
+            if self.timer.finished:
                 self.running = False
                 self.points += 1
                 self.points_var.set(f"Puntos: {self.points}")
-                self.remaining = self.BREAK_MIN * 60
+                self.timer.reset(self.BREAK_MIN * 60)
+                self.start_btn.configure(text="▶ START")
                 self._update_label()
                 # Aquí podrías agregar una notificación
                 print("¡Tiempo terminado!")
             else:
-                self.remaining -= 1
                 self._update_label()
-                self.after(1000, self._countdown)
+                self._tick_job = self.after(self.timer.next_tick_ms(), self._countdown)
+    
+    def _cancel_tick(self):
+        if self._tick_job is not None:
+            self.after_cancel(self._tick_job)
+            self._tick_job = None
     
     def _start(self):
         if not self.running:
             self.running = True
+            self.timer.start()
             self.start_btn.configure(text="⏸ PAUSE")
             self._countdown()
         else:
             self.running = False
+            self.timer.pause()
+            self._cancel_tick()
             self.start_btn.configure(text="▶ START")
     
     def _reset(self):
         self.running = False
-        self.remaining = self.WORK_MIN * 60
+        self._cancel_tick()
+        self.timer.reset(self.WORK_MIN * 60)
         self.start_btn.configure(text="▶ START")
         self._update_label()
 
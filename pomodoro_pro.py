@@ -2,17 +2,35 @@ import datetime as dt
 import customtkinter as ctk
 from PIL import Image, ImageTk
 import tkinter.font as tkFont
+import io
 import json
+import multiprocessing
 import os
-import threading
 import time
-import winsound
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTk
-import pandas as pd
-from reportlab.pdfgen import canvas
-from reportlab.lib.pagesizes import letter
 import webbrowser
+from tkinter import messagebox
+import lazy_deps
+from session_store import SessionJournal, create_session_store
+from session_index import SessionIndex
+from rollups import SessionRollups
+from persistence import WriteBehindWriter
+from user_data_store import UserDataStore
+from wal import WriteAheadLog
+from timer_engine import TimerEngine
+from scheduler import TkScheduler
+from status_server import StatusServer
+from checkpoint import SessionCheckpoint
+from gradient import GradientBackground
+from timer_view import TimerDisplay
+from instrumentation import metrics
+from audio import AudioEngine
+from background import ProcessJob, TkWorker
+from stats_charts import ChartCache, render_stats_png
+from achievement_rules import (PAUSE_PENALTY_INTERVAL, AchievementRuleEngine, add_experience,
+                               level_for_experience, reward_session)
+from exporters import build_pdf_report, export_sessions_csv, weekly_rows
+from theme_registry import (BUTTON_ROLES, LABEL_ROLES, PROGRESS_ROLES, TIMER_ROLES,
+                            WINDOW_ROLES, ThemedWidgets, ThemeRegistry)
 
 ctk.set_appearance_mode("dark")
 
@@ -22,6 +40,27 @@ class DataManager:
     def __init__(self):
         self.data_dir = "pomodoro_data"
         self.ensure_data_directory()
+        self.writer = WriteBehindWriter(delay=1.0)
+        settings = self.load_settings()
+        self.writer.fsync = settings.get("fsync_writes", False)
+        backend = settings.get("session_backend", "jsonl")
+        self.session_store = create_session_store(self.data_dir, backend)
+        # Reaplicar lo confirmado que un cierre inesperado dejó sin escribir
+        self.wal = WriteAheadLog(self.data_dir, self.session_store, fsync=self.writer.fsync)
+        self.recovery = self.wal.recover()
+        self.rollups = SessionRollups(self.data_dir)
+        if self.recovery["sessions_restored"]:
+            # El diario pudo quedar más corto que el cursor de los acumulados
+            self.rollups.rebuild(self.session_store)
+            self.rollups.save()
+        else:
+            self.rollups.load_or_rebuild(self.session_store)
+        self.user_store = UserDataStore(self.data_dir, wal=self.wal)
+        # Índice por fecha y hora del diario JSONL (SQLite ya tiene los suyos); se carga al consultar
+        self.session_index = None
+        if isinstance(self.session_store, SessionJournal):
+            self.session_index = SessionIndex(self.data_dir)
+        self._index_loaded = False
     
     def ensure_data_directory(self):
         """Crear directorio de datos si no existe"""
@@ -36,25 +75,58 @@ class DataManager:
             "break_time": 5,
             "theme": "Terminal",
             "sound_enabled": True,
-            "sound_volume": 50
+            "sound_volume": 50,
+            "session_backend": "jsonl",  # "jsonl" o "sqlite"
+            "fsync_writes": False,
+            "http_api": False,  # API local de estado en 127.0.0.1
+            "http_api_port": 8765,
+            "metrics": False,  # spans y contadores en pomodoro_data/metrics.log
+            "gradient_background": False,  # degradado del tema detrás de los widgets
+            "progress_ring": False  # anillo de progreso alrededor del reloj
         }
         
-        try:
-            with open(settings_file, 'r') as f:
-                return json.load(f)
-        except (FileNotFoundError, json.JSONDecodeError):
+        settings = self._read_json(settings_file)
+        if settings is None:
             self.save_settings(default_settings)
             return default_settings
+        return settings
     
     def save_settings(self, settings):
-        """Guardar configuración en JSON"""
+        """Programar el guardado de la configuración"""
         settings_file = os.path.join(self.data_dir, "settings.json")
-        with open(settings_file, 'w') as f:
-            json.dump(settings, f, indent=2)
+        self.writer.schedule(settings_file, settings)
+    
+    def _read_json(self, path):
+        """Leer un JSON (incluyendo cambios aún no guardados); None si no es válido"""
+        text = self.writer.pending_text(path)
+        try:
+            if text is None:
+                with open(path, 'r', encoding='utf-8') as f:
+                    text = f.read()
+            return json.loads(text)
+        except FileNotFoundError:
+            return None
+        except json.JSONDecodeError:
+            # Conservar el archivo dañado en lugar de sobrescribirlo con valores por defecto
+            os.replace(path, path + ".corrupt")
+            return None
+    
+    def flush(self):
+        """Guardar de inmediato los cambios pendientes"""
+        self.writer.flush()
+    
+    def close(self):
+        """Cerrar los almacenes guardando todo lo pendiente"""
+        if self._index_loaded:
+            self.session_index.catch_up(self.session_store)
+            self.session_index.save()
+        self.writer.close()
+        self.wal.checkpoint()
+        self.session_store.close()
     
     def load_user_data(self):
         """Cargar datos del usuario"""
-        user_file = os.path.join(self.data_dir, "user_data.json")
+        user_file = self.user_store.path
         default_data = {
             "total_points": 0,
             "level": 1,
@@ -65,153 +137,200 @@ class DataManager:
             "daily_stats": {}
         }
         
-        try:
-            with open(user_file, 'r') as f:
-                return json.load(f)
-        except (FileNotFoundError, json.JSONDecodeError):
+        # Los cambios aún no guardados de este proceso van primero
+        text = self.writer.pending_text(user_file)
+        user_data = json.loads(text) if text is not None else self.user_store.load()
+        if user_data is None:
             self.save_user_data(default_data)
             return default_data
+        return user_data
     
+    @metrics.timed("save_user_data")
     def save_user_data(self, user_data):
-        """Guardar datos del usuario"""
-        user_file = os.path.join(self.data_dir, "user_data.json")
-        with open(user_file, 'w') as f:
-            json.dump(user_data, f, indent=2)
+        """Programar el guardado de los datos del usuario
+
+        Al escribir se comprueba la revisión en disco y, si otro proceso
+        guardó entretanto, se combinan ambos cambios en vez de perder alguno.
+        """
+        self.writer.schedule(self.user_store.path, user_data, self._commit_user_data)
+    
+    def _commit_user_data(self, path, text):
+        self.user_store.commit(path, text, fsync=self.writer.fsync)
     
-    def log_session(self, session_type, duration, completed):
-        """Registrar sesión completada"""
-        today = dt.datetime.now().strftime("%Y-%m-%d")
-        sessions_file = os.path.join(self.data_dir, "sessions.json")
+    @metrics.timed("log_session")
+    def log_session(self, session_type, duration, completed, when=None):
+        """Registrar sesión completada (o parcial, con la hora en que se cortó)"""
+        when = when or dt.datetime.now()
         
         session_data = {
-            "date": today,
-            "time": dt.datetime.now().strftime("%H:%M:%S"),
+            "date": when.strftime("%Y-%m-%d"),
+            "time": when.strftime("%H:%M:%S"),
             "type": session_type,  # "work" or "break"
             "duration": duration,
             "completed": completed
         }
         
-        try:
-            with open(sessions_file, 'r') as f:
-                sessions = json.load(f)
-        except (FileNotFoundError, json.JSONDecodeError):
-            sessions = []
-        
-        sessions.append(session_data)
-        
-        with open(sessions_file, 'w') as f:
-            json.dump(sessions, f, indent=2)
+        self.wal.append_sessions([session_data])
+        # Suma la sesión nueva y las que otros procesos hayan anexado entretanto
+        self.rollups.catch_up(self.session_store)
+        # La foto se toma al escribir, en el hilo de escritura: registrar sigue siendo O(1)
+        self.writer.schedule_render(self.rollups.path, self.rollups.to_json)
+    
+    def iter_sessions(self):
+        """Leer el historial de sesiones como flujo de registros"""
+        return self.session_store.iter_sessions()
+    
+    def query(self, start_date=None, end_date=None, session_types=None, hours=None,
+              completed=None):
+        """Sesiones filtradas, en orden de fecha y hora
+
+        start_date/end_date: "YYYY-MM-DD" (inclusivo); session_types: p. ej.
+        ["work"]; hours: horas del día (0-23); completed: True o False.
+        Solo se leen las partes del historial dentro del rango pedido.
+        """
+        if self.session_index is None:
+            return self.session_store.query(start_date, end_date, session_types, hours, completed)
+        if not self._index_loaded:
+            if self.recovery["sessions_restored"]:
+                # La recuperación reescribió la cola del diario: el índice guardado no sirve
+                self.session_index.rebuild(self.session_store)
+            else:
+                self.session_index.load_or_rebuild(self.session_store)
+            self._index_loaded = True
+        return self.session_index.query(self.session_store, start_date, end_date, session_types,
+                                        hours, completed)
+    
+    def sessions_per_day(self, session_type=None):
+        """Sesiones por fecha (acumulados precalculados)"""
+        return self.rollups.sessions_per_day(session_type)
+    
+    def sessions_per_hour(self, session_type=None):
+        """Sesiones por hora del día (acumulados precalculados)"""
+        return self.rollups.sessions_per_hour(session_type)
+    
+    def check_rollups(self):
+        """Verificar los acumulados contra el historial y repararlos si difieren"""
+        self.rollups.catch_up(self.session_store)
+        if self.rollups.is_consistent(self.session_store):
+            return True
+        self.rollups.rebuild(self.session_store)
+        self.rollups.save()
+        return False
 
 class SoundManager:
     """Gestor de sonidos y notificaciones"""
     
-    def __init__(self):
-        self.sounds_enabled = True
-        self.volume = 50
+    def __init__(self, settings=None, backend=None):
+        settings = settings or {}
+        self.sounds_enabled = settings.get("sound_enabled", True)
+        self.volume = settings.get("sound_volume", 50)
+        self.engine = AudioEngine("sounds", self.volume, backend)
+    
+    def _play(self, name):
+        if self.sounds_enabled:
+            self.engine.play(name)
+    
+    def set_volume(self, volume):
+        """Cambiar el volumen de todos los sonidos"""
+        self.volume = volume
+        self.engine.set_volume(volume)
     
     def play_completion_sound(self):
         """Reproducir sonido de completación"""
-        if self.sounds_enabled:
-            try:
-                # Sonido de Windows predeterminado
-                winsound.PlaySound("SystemAsterisk", winsound.SND_ALIAS)
-            except:
-                # Sonido alternativo si falla
-                print("\a")  # Bell character
+        self._play("complete")
     
     def play_start_sound(self):
         """Sonido al iniciar sesión"""
-        if self.sounds_enabled:
-            try:
-                winsound.Beep(800, 200)
-            except:
-                print("\a")
+        self._play("start")
     
     def play_pause_sound(self):
         """Sonido al pausar"""
-        if self.sounds_enabled:
-            try:
-                winsound.Beep(400, 300)
-            except:
-                print("\a")
+        self._play("pause")
+    
+    def play_reset_sound(self):
+        """Sonido al reiniciar"""
+        self._play("reset")
+    
+    def close(self):
+        self.engine.close()
 
 class AchievementSystem:
     """Sistema de logros y niveles"""
     
+    # Definiciones de respaldo si falta pomodoro_data/achievements.json
     ACHIEVEMENTS = {
-        "first_session": {"name": "Primer Paso", "desc": "Completa tu primera sesión", "icon": "🎯"},
-        "streak_5": {"name": "Racha Iniciada", "desc": "5 sesiones seguidas", "icon": "🔥"},
-        "streak_10": {"name": "En Llamas", "desc": "10 sesiones seguidas", "icon": "💥"},
-        "total_50": {"name": "Veterano", "desc": "50 sesiones totales", "icon": "⭐"},
-        "total_100": {"name": "Maestro del Tiempo", "desc": "100 sesiones totales", "icon": "👑"},
-        "perfect_day": {"name": "Día Perfecto", "desc": "8 sesiones en un día", "icon": "✨"},
-        "night_owl": {"name": "Búho Nocturno", "desc": "Sesión después de las 10 PM", "icon": "🦉"},
-        "early_bird": {"name": "Madrugador", "desc": "Sesión antes de las 6 AM", "icon": "🐦"}
+        "first_session": {"name": "Primer Paso", "desc": "Completa tu primera sesión", "icon": "🎯",
+                          "unlocked_by": ["complete_first_session"]},
+        "streak_5": {"name": "Racha Iniciada", "desc": "5 sesiones seguidas", "icon": "🔥",
+                     "unlocked_by": ["streak_count_5"]},
+        "streak_10": {"name": "En Llamas", "desc": "10 sesiones seguidas", "icon": "💥",
+                      "unlocked_by": ["streak_count_10"]},
+        "total_50": {"name": "Veterano", "desc": "50 sesiones totales", "icon": "⭐",
+                     "unlocked_by": ["total_sessions_50"]},
+        "total_100": {"name": "Maestro del Tiempo", "desc": "100 sesiones totales", "icon": "👑",
+                      "unlocked_by": ["total_sessions_100"]},
+        "perfect_day": {"name": "Día Perfecto", "desc": "8 sesiones en un día", "icon": "✨",
+                        "unlocked_by": ["daily_sessions_8"]},
+        "night_owl": {"name": "Búho Nocturno", "desc": "Sesión después de las 10 PM", "icon": "🦉",
+                      "unlocked_by": ["session_after_22"]},
+        "early_bird": {"name": "Madrugador", "desc": "Sesión antes de las 6 AM", "icon": "🐦",
+                       "unlocked_by": ["session_before_6"]}
     }
     
     def __init__(self, data_manager):
         self.data_manager = data_manager
         self.user_data = data_manager.load_user_data()
+        self.achievements = self.load_definitions()
+        self.engine = AchievementRuleEngine(self.achievements, self.user_data["achievements"])
     
-    def check_achievements(self, session_data):
-        """Verificar y otorgar logros"""
-        new_achievements = []
-        
-        # Primer sesión
-        if self.user_data["completed_sessions"] == 1 and "first_session" not in self.user_data["achievements"]:
-            new_achievements.append("first_session")
-        
-        # Total de sesiones
-        total = self.user_data["completed_sessions"]
-        if total >= 50 and "total_50" not in self.user_data["achievements"]:
-            new_achievements.append("total_50")
-        if total >= 100 and "total_100" not in self.user_data["achievements"]:
-            new_achievements.append("total_100")
-        
-        # Día perfecto (8 sesiones en un día)
-        today = dt.datetime.now().strftime("%Y-%m-%d")
-        if today in self.user_data["daily_stats"]:
-            if self.user_data["daily_stats"][today] >= 8 and "perfect_day" not in self.user_data["achievements"]:
-                new_achievements.append("perfect_day")
-        
-        # Horarios especiales
-        current_hour = dt.datetime.now().hour
-        if current_hour >= 22 and "night_owl" not in self.user_data["achievements"]:
-            new_achievements.append("night_owl")
-        if current_hour <= 6 and "early_bird" not in self.user_data["achievements"]:
-            new_achievements.append("early_bird")
-        
-        # Agregar nuevos logros
-        for achievement in new_achievements:
-            self.user_data["achievements"].append(achievement)
+    def load_definitions(self):
+        """Cargar los logros desde achievements.json (nombre, icono, puntos, disparadores)"""
+        path = os.path.join(self.data_manager.data_dir, "achievements.json")
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                available = json.load(f)["available_achievements"]
+        except (FileNotFoundError, json.JSONDecodeError, KeyError):
+            return self.ACHIEVEMENTS
         
-        return new_achievements
+        return {key: dict(definition, desc=definition.get("description", ""))
+                for key, definition in available.items()}
+    
+    def reward_session(self, session_type, duration, now):
+        """Puntos, experiencia, daily_stats y logros de una sesión sin pausas"""
+        return reward_session(self.user_data, self.engine, self.achievements, session_type,
+                              duration, now)
+    
+    def break_streak(self):
+        """Una sesión con pausas o reiniciada corta la racha"""
+        self.engine.break_streak(self.user_data)
     
     def calculate_level(self):
         """Calcular nivel basado en experiencia"""
-        exp = self.user_data["experience"]
-        level = 1 + (exp // 100)  # Cada 100 puntos = 1 nivel
-        return min(level, 50)  # Máximo nivel 50
+        return level_for_experience(self.user_data["experience"])
     
     def add_experience(self, points):
         """Agregar experiencia"""
-        self.user_data["experience"] += points
-        self.user_data["level"] = self.calculate_level()
+        add_experience(self.user_data, points)
 
 class StatsPanel(ctk.CTkToplevel):
     """Panel de estadísticas con gráficas"""
     
+    CHART_SIZE = (7.2, 4.8)
+    
     def __init__(self, master, data_manager):
         super().__init__(master)
         self.data_manager = data_manager
         self.title("📊 Estadísticas de Productividad")
         self.geometry("800x600")
         self.configure(fg_color=master.current_theme["bg"])
+        master.themed.register(self, WINDOW_ROLES)
+        self.stats_task = None
         
         self.create_stats_widgets()
+        self.load_stats()
     
     def create_stats_widgets(self):
-        """Crear widgets de estadísticas"""
+        """Crear widgets de estadísticas (con marcadores mientras se calculan)"""
         theme = self.master.current_theme
         
         # Título
@@ -219,27 +338,85 @@ class StatsPanel(ctk.CTkToplevel):
                            font=ctk.CTkFont(family="Consolas", size=18, weight="bold"),
                            text_color=theme["fg"])
         title.pack(pady=10)
+        self.master.themed.register(title, LABEL_ROLES)
         
         # Notebook para pestañas
         notebook = ctk.CTkTabview(self)
         notebook.pack(fill="both", expand=True, padx=20, pady=10)
         
-        # Pestaña resumen
-        summary_tab = notebook.add("Resumen")
-        self.create_summary_tab(summary_tab, theme)
-        
-        # Pestaña gráficas
-        charts_tab = notebook.add("Gráficas")
-        self.create_charts_tab(charts_tab, theme)
+        self.summary_tab = notebook.add("Resumen")
+        self.charts_tab = notebook.add("Gráficas")
+        self.achievements_tab = notebook.add("Logros")
         
-        # Pestaña logros
-        achievements_tab = notebook.add("Logros")
-        self.create_achievements_tab(achievements_tab, theme)
+        for tab in (self.summary_tab, self.charts_tab, self.achievements_tab):
+            ctk.CTkLabel(tab, text="Cargando...", text_color=theme["fg"]).pack(pady=50)
     
-    def create_summary_tab(self, tab, theme):
-        """Crear pestaña de resumen"""
+    def load_stats(self):
+        """Calcular datos y gráficas en segundo plano (o usar la gráfica en caché)"""
+        theme = dict(self.master.current_theme)
+        # Los colores (no el nombre) entran en la clave: recargar un tema invalida su gráfica
+        chart_key = (self.data_manager.rollups.version, tuple(sorted(theme.items())), self.CHART_SIZE)
+        chart_png = self.master.chart_cache.get(chart_key)
+        # En el hilo de Tk: cargar puede apartar un archivo dañado y toca el estado del almacén
         user_data = self.data_manager.load_user_data()
+        if chart_png is not None:
+            self.show_stats({
+                "user_data": user_data,
+                "chart_png": chart_png,
+                "chart_error": None,
+            })
+            return
+        
+        self.stats_task = self.master.worker.submit(
+            lambda task: self.compute_stats(task, theme, chart_key, user_data),
+            self.show_stats, self.show_stats_error)
+    
+    def compute_stats(self, task, theme, chart_key, user_data):
+        """Leer los acumulados y dibujar las gráficas (hilo de trabajo, sin widgets)"""
+        stats = {
+            "user_data": user_data,
+            "daily": self.data_manager.sessions_per_day(),
+            "hourly": self.data_manager.sessions_per_hour(),
+            "chart_png": None,
+            "chart_error": None,
+        }
+        if task.cancelled or not stats["daily"]:
+            return stats
         
+        try:
+            stats["chart_png"] = render_stats_png(stats["daily"], stats["hourly"], theme,
+                                                  size=self.CHART_SIZE)
+            self.master.chart_cache.put(chart_key, stats["chart_png"])
+        except Exception as e:
+            stats["chart_error"] = str(e)
+        return stats
+    
+    def show_stats(self, stats):
+        """Reemplazar los marcadores con los resultados (hilo de Tk)"""
+        theme = self.master.current_theme
+        for tab in (self.summary_tab, self.charts_tab, self.achievements_tab):
+            for child in tab.winfo_children():
+                child.destroy()
+        
+        self.create_summary_tab(self.summary_tab, theme, stats["user_data"])
+        self.create_charts_tab(self.charts_tab, theme, stats)
+        self.create_achievements_tab(self.achievements_tab, theme, stats["user_data"])
+    
+    def show_stats_error(self, error):
+        theme = self.master.current_theme
+        for child in self.charts_tab.winfo_children():
+            child.destroy()
+        ctk.CTkLabel(self.charts_tab, text=f"Error al generar gráficas: {str(error)}",
+                   text_color=theme["fg"]).pack(pady=50)
+    
+    def destroy(self):
+        """Cancelar el cálculo pendiente si se cierra la ventana antes"""
+        if self.stats_task is not None:
+            self.stats_task.cancel()
+        super().destroy()
+    
+    def create_summary_tab(self, tab, theme, user_data):
+        """Crear pestaña de resumen"""
         # Estadísticas principales
         stats_frame = ctk.CTkFrame(tab, fg_color="transparent")
         stats_frame.pack(fill="x", padx=20, pady=10)
@@ -260,61 +437,31 @@ class StatsPanel(ctk.CTkToplevel):
             ctk.CTkLabel(row, text=value, text_color=theme["fg"], 
                         font=ctk.CTkFont(weight="bold")).pack(side="right", padx=10)
     
-    def create_charts_tab(self, tab, theme):
+    @metrics.timed("create_charts_tab")
+    def create_charts_tab(self, tab, theme, stats):
         """Crear pestaña de gráficas"""
-        try:
-            # Cargar datos de sesiones
-            sessions_file = os.path.join(self.data_manager.data_dir, "sessions.json")
-            with open(sessions_file, 'r') as f:
-                sessions = json.load(f)
-            
-            if not sessions:
-                ctk.CTkLabel(tab, text="No hay datos suficientes para mostrar gráficas",
-                           text_color=theme["fg"]).pack(pady=50)
-                return
-            
-            # Crear gráfica de productividad diaria
-            df = pd.DataFrame(sessions)
-            daily_stats = df.groupby('date').size()
-            
-            # Configurar matplotlib para el tema oscuro
-            plt.style.use('dark_background')
-            fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(10, 8))
-            fig.patch.set_facecolor(theme["bg"])
-            
-            # Gráfica de sesiones por día
-            daily_stats.plot(kind='bar', ax=ax1, color=theme["fg"])
-            ax1.set_title('Sesiones por Día', color=theme["fg"])
-            ax1.set_xlabel('Fecha', color=theme["fg"])
-            ax1.set_ylabel('Sesiones', color=theme["fg"])
-            
-            # Gráfica de distribución por horas
-            df['hour'] = pd.to_datetime(df['time']).dt.hour
-            hourly_stats = df.groupby('hour').size()
-            hourly_stats.plot(kind='line', ax=ax2, color=theme["fg"], marker='o')
-            ax2.set_title('Distribución por Horas del Día', color=theme["fg"])
-            ax2.set_xlabel('Hora', color=theme["fg"])
-            ax2.set_ylabel('Sesiones', color=theme["fg"])
-            
-            plt.tight_layout()
-            
-            # Integrar en la ventana
-            canvas = FigureCanvasTk(fig, tab)
-            canvas.get_tk_widget().pack(fill="both", expand=True)
-            
-        except Exception as e:
-            ctk.CTkLabel(tab, text=f"Error al generar gráficas: {str(e)}",
+        if stats["chart_error"]:
+            ctk.CTkLabel(tab, text=f"Error al generar gráficas: {stats['chart_error']}",
+                       text_color=theme["fg"]).pack(pady=50)
+            return
+        
+        if not stats["chart_png"]:
+            ctk.CTkLabel(tab, text="No hay datos suficientes para mostrar gráficas",
                        text_color=theme["fg"]).pack(pady=50)
+            return
+        
+        # La figura llega ya dibujada como PNG
+        image = Image.open(io.BytesIO(stats["chart_png"]))
+        chart = ctk.CTkImage(light_image=image, dark_image=image, size=image.size)
+        ctk.CTkLabel(tab, image=chart, text="").pack(fill="both", expand=True)
     
-    def create_achievements_tab(self, tab, theme):
+    def create_achievements_tab(self, tab, theme, user_data):
         """Crear pestaña de logros"""
-        user_data = self.data_manager.load_user_data()
-        
         # Scrollable frame para logros
         scrollable = ctk.CTkScrollableFrame(tab)
         scrollable.pack(fill="both", expand=True, padx=20, pady=10)
         
-        for key, achievement in AchievementSystem.ACHIEVEMENTS.items():
+        for key, achievement in self.master.achievement_system.achievements.items():
             unlocked = key in user_data["achievements"]
             
             # Frame para cada logro
@@ -345,66 +492,87 @@ class StatsPanel(ctk.CTkToplevel):
 class ReportExporter:
     """Exportador de reportes"""
     
-    def __init__(self, data_manager):
+    def __init__(self, data_manager, chart_cache=None, achievements=None):
         self.data_manager = data_manager
+        self.chart_cache = chart_cache
+        self.achievements = achievements or AchievementSystem.ACHIEVEMENTS
     
-    def export_pdf_report(self):
-        """Exportar reporte en PDF"""
+    PDF_CHART_SIZE = (7.2, 4.8)
+    
+    def prepare_pdf_report(self):
+        """Reunir los datos del reporte desde los acumulados (rápido, hilo de Tk)"""
+        user_data = self.data_manager.load_user_data()
+        rollups = self.data_manager.rollups
+        work_per_day = rollups.sessions_per_day("work")
+        best_day = rollups.busiest(work_per_day)
+        best_hour = rollups.busiest(rollups.sessions_per_hour("work"))
+        
+        stats = [
+            f"Nivel: {user_data['level']}",
+            f"Puntos Totales: {user_data['total_points']}",
+            f"Sesiones Completadas: {user_data['completed_sessions']}",
+            f"Tiempo Total de Enfoque: {user_data['total_focus_time']//60}h {user_data['total_focus_time']%60}m",
+            f"Logros Desbloqueados: {len(user_data['achievements'])}",
+            f"Día Más Productivo: {best_day or '-'}",
+            f"Hora Más Productiva: {f'{best_hour:02}:00' if best_hour is not None else '-'}",
+            f"Fecha del Reporte: {dt.datetime.now().strftime('%d/%m/%Y')}"
+        ]
+        
+        achievements = []
+        for achievement_key in user_data['achievements']:
+            if achievement_key in self.achievements:
+                achievement = self.achievements[achievement_key]
+                achievements.append((achievement['name'], achievement['desc']))
+        
+        chart_key = (rollups.version, "print", self.PDF_CHART_SIZE)
+        return chart_key, {
+            "stats": stats,
+            "daily": rollups.sessions_per_day(),
+            "hourly": rollups.sessions_per_hour(),
+            "weekly": weekly_rows(work_per_day, rollups.sessions_per_day("break"),
+                                  rollups.focus_minutes_per_day()),
+            "achievements": achievements,
+            "chart_png": self.chart_cache.get(chart_key) if self.chart_cache else None,
+        }
+    
+    def _pdf_filename(self):
+        return f"reporte_pomodoro_{dt.datetime.now().strftime('%Y%m%d')}.pdf"
+    
+    def export_pdf_report(self, filename=None):
+        """Exportar reporte en PDF (en el hilo actual)"""
         try:
-            user_data = self.data_manager.load_user_data()
-            
-            # Crear PDF
-            filename = f"reporte_pomodoro_{dt.datetime.now().strftime('%Y%m%d')}.pdf"
-            c = canvas.Canvas(filename, pagesize=letter)
-            
-            # Título
-            c.setFont("Helvetica-Bold", 24)
-            c.drawString(50, 750, "Reporte de Productividad Pomodoro")
-            
-            # Estadísticas
-            c.setFont("Helvetica", 14)
-            y = 700
-            stats = [
-                f"Nivel: {user_data['level']}",
-                f"Puntos Totales: {user_data['total_points']}",
-                f"Sesiones Completadas: {user_data['completed_sessions']}",
-                f"Tiempo Total de Enfoque: {user_data['total_focus_time']//60}h {user_data['total_focus_time']%60}m",
-                f"Logros Desbloqueados: {len(user_data['achievements'])}",
-                f"Fecha del Reporte: {dt.datetime.now().strftime('%d/%m/%Y')}"
-            ]
-            
-            for stat in stats:
-                c.drawString(50, y, stat)
-                y -= 30
-            
-            # Logros
-            y -= 20
-            c.setFont("Helvetica-Bold", 16)
-            c.drawString(50, y, "Logros Desbloqueados:")
-            y -= 20
-            
-            c.setFont("Helvetica", 12)
-            for achievement_key in user_data['achievements']:
-                if achievement_key in AchievementSystem.ACHIEVEMENTS:
-                    achievement = AchievementSystem.ACHIEVEMENTS[achievement_key]
-                    c.drawString(70, y, f"• {achievement['name']}: {achievement['desc']}")
-                    y -= 20
-            
-            c.save()
+            filename = filename or self._pdf_filename()
+            chart_key, report = self.prepare_pdf_report()
+            chart_png = build_pdf_report(filename, report)
+            if self.chart_cache and chart_png:
+                self.chart_cache.put(chart_key, chart_png)
             return filename
         except Exception as e:
             return None
     
-    def export_csv_data(self):
-        """Exportar datos en CSV"""
+    def start_pdf_report(self, scheduler, on_done, on_progress=None, on_error=None, filename=None):
+        """Generar el PDF en otro proceso; on_done(filename) se llama en el hilo de Tk"""
+        filename = filename or self._pdf_filename()
+        chart_key, report = self.prepare_pdf_report()
+        
+        def finished(chart_png):
+            if self.chart_cache and chart_png:
+                self.chart_cache.put(chart_key, chart_png)
+            on_done(filename)
+        
+        return ProcessJob(scheduler, build_pdf_report, (filename, report), finished,
+                          on_progress=on_progress, on_error=on_error)
+    
+    def export_csv_data(self, start_date=None, end_date=None, session_types=None,
+                        filename=None, compress=False):
+        """Exportar datos en CSV (rango de fechas "YYYY-MM-DD" y tipos opcionales)"""
         try:
-            sessions_file = os.path.join(self.data_manager.data_dir, "sessions.json")
-            with open(sessions_file, 'r') as f:
-                sessions = json.load(f)
-            
-            df = pd.DataFrame(sessions)
-            filename = f"datos_pomodoro_{dt.datetime.now().strftime('%Y%m%d')}.csv"
-            df.to_csv(filename, index=False)
+            if filename is None:
+                filename = f"datos_pomodoro_{dt.datetime.now().strftime('%Y%m%d')}.csv"
+                if compress:
+                    filename += ".gz"
+            sessions = self.data_manager.query(start_date, end_date, session_types)
+            export_sessions_csv(sessions, filename, compress=compress)
             return filename
         except Exception as e:
             return None
@@ -432,53 +600,108 @@ class ThemeManager:
         }
     }
     
+    THEMES_DIR = "themes"
+    _registry = None
+    
+    @classmethod
+    def registry(cls):
+        """Temas integrados más los de themes/*.json (se compilan una sola vez)"""
+        if cls._registry is None:
+            cls._registry = ThemeRegistry(cls.THEMES_DIR, cls.THEMES)
+        return cls._registry
+    
     @classmethod
     def get_theme(cls, name):
-        return cls.THEMES.get(name, cls.THEMES["Terminal"])
+        return cls.registry().get(name)
 
 class Pomodoro(ctk.CTk):
     """Aplicación principal completa"""
     
+    PAUSE_PENALTY_INTERVAL = PAUSE_PENALTY_INTERVAL  # segundos de pausa por cada punto perdido
+    THEME_POLL_INTERVAL = 2  # segundos entre revisiones de themes/*.json
+    CHECKPOINT_INTERVAL = 5  # segundos entre copias del estado de la sesión en curso
+    
     def __init__(self):
         super().__init__()
         
         # Inicializar managers
         self.data_manager = DataManager()
-        self.sound_manager = SoundManager()
         self.achievement_system = AchievementSystem(self.data_manager)
-        self.report_exporter = ReportExporter(self.data_manager)
+        self.chart_cache = ChartCache()
+        self.report_exporter = ReportExporter(self.data_manager, self.chart_cache,
+                                              self.achievement_system.achievements)
         
         # Cargar configuración
         self.settings = self.data_manager.load_settings()
-        self.user_data = self.data_manager.load_user_data()
+        # Mismo diccionario que el sistema de logros para no pisar sus cambios
+        self.user_data = self.achievement_system.user_data
+        self.sound_manager = SoundManager(self.settings)
         
         # Configuración inicial
         self.WORK_MIN = self.settings["work_time"]
         self.BREAK_MIN = self.settings["break_time"]
         self.current_theme_name = self.settings["theme"]
         self.current_theme = ThemeManager.get_theme(self.current_theme_name)
+        self.themed = ThemedWidgets()
         
         # Variables de control
         self.running = False
-        self.remaining = self.WORK_MIN * 60
+        self.timer = TimerEngine(self.WORK_MIN * 60)
+        # Mismo reloj que el temporizador: las pausas cuentan también la suspensión
+        self.scheduler = TkScheduler(self, clock=self.timer.clock)
+        self.worker = TkWorker(self.scheduler)
+        self.pdf_job = None
+        self._tick_job = None
         self.current_session_type = "work"
         self.session_start_time = None
-        self.pause_thread = None
         self.pause_start_time = None
+        self._pause_started = None
+        self._penalty_job = None
+        self.status_server = None
+        self.checkpoint = SessionCheckpoint(os.path.join(self.data_manager.data_dir, "session.ckpt"),
+                                            sync=self.settings.get("fsync_writes", False))
+        self._checkpoint_job = None
+        interrupted = self.checkpoint.load()
         
         # Configurar ventana
         self.setup_window()
         self.create_widgets()
         self._update_label()
         self.attributes("-topmost", True)
+        self.bind("<Control-t>", lambda event: self.cycle_theme())
+        self._theme_job = self.scheduler.call_later(self.THEME_POLL_INTERVAL, self._watch_themes)
+        
+        if self.settings.get("metrics", False) or os.environ.get("POMODORO_METRICS"):
+            metrics.enable()
+            metrics.start_file_export(os.path.join(self.data_manager.data_dir, "metrics.log"))
+        
+        if self.settings.get("http_api", False):
+            self.start_status_server()
+        
+        # Sesión cortada por un cierre inesperado o un reinicio del equipo
+        if interrupted is not None:
+            self.after_idle(lambda: self.offer_resume(interrupted))
+        
+        # Precargar matplotlib para las gráficas cuando la ventana ya está visible
+        # (reportlab no: se importa en el proceso aparte que genera cada PDF)
+        if self.settings.get("prewarm_modules", True):
+            self.after_idle(lambda: self.scheduler.call_later(2, lazy_deps.prewarm))
     
     def setup_window(self):
         """Configurar ventana principal"""
         self.geometry("450x350")
         self.configure(fg_color=self.current_theme["bg"])
+        self.themed.register(self, WINDOW_ROLES)
         self.title("Pomodoro Pro")
         self.overrideredirect(True)
         
+        self.background = None
+        if self.settings.get("gradient_background", False):
+            # Una imagen que se regenera (desde caché) al redimensionar la ventana
+            self.background = GradientBackground(self, self._gradient_colors())
+            self.background.canvas.place(x=0, y=0, relwidth=1, relheight=1)
+            self.background.canvas.lower()
+        
         # Crear barra de título
         TitleBar(self)
     
@@ -494,17 +717,20 @@ class Pomodoro(ctk.CTk):
             pixel_font = ctk.CTkFont(family="Consolas", size=20, weight="bold")
             small_font = ctk.CTkFont(family="Consolas", size=12)
         
-        # Timer display
-        self.timer_var = ctk.StringVar(value="25:00")
-        self.timer_label = ctk.CTkLabel(self, textvariable=self.timer_var,
-                                       font=pixel_font, text_color=theme["fg"])
-        self.timer_label.pack(pady=30)
+        # Timer display (solo se redibujan los glifos que cambian)
+        self.timer_display = TimerDisplay(self, pixel_font, theme["fg"], theme["bg"],
+                                          track_color=theme["btn_bg"],
+                                          ring=self.settings.get("progress_ring", False),
+                                          on_visibility=self._on_timer_visibility)
+        self.timer_display.canvas.pack(pady=30)
+        self.themed.register(self.timer_display, TIMER_ROLES)
         
         # Indicador de sesión
         self.session_var = ctk.StringVar(value="Trabajo")
         session_label = ctk.CTkLabel(self, textvariable=self.session_var,
                                    font=small_font, text_color=theme["fg"])
         session_label.pack()
+        self.themed.register(session_label, LABEL_ROLES)
         
         # Botones principales
         button_frame = ctk.CTkFrame(self, fg_color="transparent")
@@ -519,6 +745,7 @@ class Pomodoro(ctk.CTk):
                                       corner_radius=4,
                                       command=self._start)
         self.start_btn.pack(side="left", padx=10)
+        self.themed.register(self.start_btn, BUTTON_ROLES)
         
         self.reset_btn = ctk.CTkButton(button_frame, text="⟲ RESET",
                                       width=100, height=40,
@@ -529,6 +756,7 @@ class Pomodoro(ctk.CTk):
                                       corner_radius=4,
                                       command=self._reset)
         self.reset_btn.pack(side="left", padx=10)
+        self.themed.register(self.reset_btn, BUTTON_ROLES)
         
         # Botones de herramientas
         tools_frame = ctk.CTkFrame(self, fg_color="transparent")
@@ -541,6 +769,7 @@ class Pomodoro(ctk.CTk):
                                   text_color=theme["fg"],
                                   command=lambda: SettingsPanel(self))
         config_btn.pack(side="left", padx=5)
+        self.themed.register(config_btn, BUTTON_ROLES)
         
         # Estadísticas
         stats_btn = ctk.CTkButton(tools_frame, text="📊", width=50,
@@ -549,6 +778,7 @@ class Pomodoro(ctk.CTk):
                                  text_color=theme["fg"],
                                  command=lambda: StatsPanel(self, self.data_manager))
         stats_btn.pack(side="left", padx=5)
+        self.themed.register(stats_btn, BUTTON_ROLES)
         
         # Exportar
         export_btn = ctk.CTkButton(tools_frame, text="📄", width=50,
@@ -557,6 +787,7 @@ class Pomodoro(ctk.CTk):
                                   text_color=theme["fg"],
                                   command=self.show_export_menu)
         export_btn.pack(side="left", padx=5)
+        self.themed.register(export_btn, BUTTON_ROLES)
         
         # Información del usuario
         user_frame = ctk.CTkFrame(self, fg_color="transparent")
@@ -567,22 +798,27 @@ class Pomodoro(ctk.CTk):
         level_label = ctk.CTkLabel(user_frame, textvariable=self.level_var,
                                   font=small_font, text_color=theme["fg"])
         level_label.pack(side="left")
+        self.themed.register(level_label, LABEL_ROLES)
         
         self.points_var = ctk.StringVar(value=f"Puntos: {self.user_data['total_points']}")
         points_label = ctk.CTkLabel(user_frame, textvariable=self.points_var,
                                    font=small_font, text_color=theme["fg"])
         points_label.pack(side="right")
+        self.themed.register(points_label, LABEL_ROLES)
     
     def show_export_menu(self):
         """Mostrar menú de exportación"""
         export_window = ctk.CTkToplevel(self)
         export_window.title("Exportar Reportes")
-        export_window.geometry("300x200")
+        export_window.geometry("300x260")
         export_window.configure(fg_color=self.current_theme["bg"])
+        self.themed.register(export_window, WINDOW_ROLES)
         
-        ctk.CTkLabel(export_window, text="Exportar Reportes",
-                    font=ctk.CTkFont(size=16, weight="bold"),
-                    text_color=self.current_theme["fg"]).pack(pady=20)
+        title = ctk.CTkLabel(export_window, text="Exportar Reportes",
+                            font=ctk.CTkFont(size=16, weight="bold"),
+                            text_color=self.current_theme["fg"])
+        title.pack(pady=20)
+        self.themed.register(title, LABEL_ROLES)
         
         pdf_btn = ctk.CTkButton(export_window, text="📄 Exportar PDF",
                                fg_color=self.current_theme["btn_bg"],
@@ -590,6 +826,7 @@ class Pomodoro(ctk.CTk):
                                text_color=self.current_theme["fg"],
                                command=self.export_pdf)
         pdf_btn.pack(pady=10)
+        self.themed.register(pdf_btn, BUTTON_ROLES)
         
         csv_btn = ctk.CTkButton(export_window, text="📊 Exportar CSV",
                                fg_color=self.current_theme["btn_bg"],
@@ -597,12 +834,45 @@ class Pomodoro(ctk.CTk):
                                text_color=self.current_theme["fg"],
                                command=self.export_csv)
         csv_btn.pack(pady=10)
+        self.themed.register(csv_btn, BUTTON_ROLES)
+        
+        # Progreso del PDF (se genera en otro proceso)
+        self.export_status_var = ctk.StringVar(value="")
+        status_label = ctk.CTkLabel(export_window, textvariable=self.export_status_var,
+                                   text_color=self.current_theme["fg"])
+        status_label.pack()
+        self.themed.register(status_label, LABEL_ROLES)
+        self.export_progress = ctk.CTkProgressBar(export_window,
+                                                  progress_color=self.current_theme["progress_fg"],
+                                                  fg_color=self.current_theme["progress_bg"])
+        self.export_progress.set(0)
+        self.export_progress.pack(pady=5)
+        self.themed.register(self.export_progress, PROGRESS_ROLES)
     
     def export_pdf(self):
-        """Exportar reporte PDF"""
-        filename = self.report_exporter.export_pdf_report()
-        if filename:
-            webbrowser.open(filename)
+        """Exportar reporte PDF sin bloquear el temporizador"""
+        if self.pdf_job is not None:
+            return
+        self._pdf_progress(0, "Preparando reporte")
+        self.pdf_job = self.report_exporter.start_pdf_report(
+            self.scheduler, self._pdf_ready,
+            on_progress=self._pdf_progress, on_error=self._pdf_failed)
+    
+    def _pdf_progress(self, fraction, message):
+        """Mostrar el progreso del PDF si la ventana de exportación sigue abierta"""
+        progress = getattr(self, "export_progress", None)
+        if progress is not None and progress.winfo_exists():
+            progress.set(fraction)
+            self.export_status_var.set(message)
+    
+    def _pdf_ready(self, filename):
+        self.pdf_job = None
+        self._pdf_progress(1, "Reporte listo")
+        webbrowser.open(filename)
+    
+    def _pdf_failed(self, error):
+        self.pdf_job = None
+        self._pdf_progress(0, f"Error al generar PDF: {error}")
     
     def export_csv(self):
         """Exportar datos CSV"""
@@ -614,42 +884,195 @@ class Pomodoro(ctk.CTk):
         """Iniciar/pausar timer"""
         if not self.running:
             self.running = True
+            self.end_pause_penalty()
+            self.timer.start()
             self.start_btn.configure(text="⏸ PAUSE")
             self.session_start_time = time.time()
             self.sound_manager.play_start_sound()
             self._countdown()
+            self._checkpoint_tick()
+            self.publish_status()
         else:
             self.running = False
+            self.timer.pause()
+            self._cancel_tick()
             self.start_btn.configure(text="▶ START")
             self.sound_manager.play_pause_sound()
             self.pause_start_time = time.time()
             self.start_pause_penalty()
+            self.scheduler.cancel(self._checkpoint_job)
+            self.save_checkpoint()
+            self.publish_status()
+    
+    def save_checkpoint(self):
+        """Copiar el estado de la sesión en curso al archivo de recuperación"""
+        self.checkpoint.save(self.current_session_type, self.timer.remaining_exact(),
+                             self.timer.duration, self.session_start_time, self.running,
+                             self.pause_start_time is not None)
+    
+    def _checkpoint_tick(self):
+        self.save_checkpoint()
+        self._checkpoint_job = self.scheduler.call_later(self.CHECKPOINT_INTERVAL,
+                                                         self._checkpoint_tick)
+    
+    def _clear_checkpoint(self):
+        self.scheduler.cancel(self._checkpoint_job)
+        self._checkpoint_job = None
+        self.checkpoint.clear()
+    
+    def offer_resume(self, interrupted):
+        """Ofrecer reanudar la sesión interrumpida o registrarla como parcial"""
+        kind = "trabajo" if interrupted["session_type"] == "work" else "descanso"
+        m, s = divmod(round(interrupted["remaining"]), 60)
+        message = (f"Quedó una sesión de {kind} sin terminar ({m:02}:{s:02} restantes).\n\n"
+                   "¿Reanudarla? (No: registrarla como parcial)")
+        if messagebox.askyesno("Sesión interrumpida", message, parent=self):
+            self.resume_session(interrupted)
+        else:
+            self.log_partial_session(interrupted)
+    
+    def resume_session(self, interrupted):
+        """Restaurar tipo, tiempo restante y pausas de la sesión interrumpida"""
+        self.current_session_type = interrupted["session_type"]
+        self.session_var.set("Trabajo" if self.current_session_type == "work" else "Descanso")
+        self.timer.reset(interrupted["duration"])
+        self.timer.adjust(interrupted["remaining"] - interrupted["duration"])
+        self.session_start_time = interrupted["session_start_time"]
+        if interrupted["paused"]:
+            # Una sesión con pausas sigue sin dar recompensas
+            self.pause_start_time = interrupted["saved_at"]
+        self._update_label()
+        if interrupted["running"]:
+            self._start()
+        else:
+            if interrupted["paused"]:
+                self.start_pause_penalty()
+            self.save_checkpoint()
+            self.publish_status()
+    
+    def log_partial_session(self, interrupted):
+        """Registrar como no completada la parte ya transcurrida de la sesión"""
+        minutes = round((interrupted["duration"] - interrupted["remaining"]) / 60)
+        self.data_manager.log_session(interrupted["session_type"], minutes, False,
+                                      when=dt.datetime.fromtimestamp(interrupted["saved_at"]))
+        if interrupted["session_type"] == "work":
+            self.achievement_system.break_streak()
+            self.data_manager.save_user_data(self.user_data)
+        self.checkpoint.clear()
+    
+    def start_status_server(self):
+        """Levantar la API HTTP local de estado (opcional)"""
+        try:
+            self.status_server = StatusServer(port=self.settings.get("http_api_port", 8765))
+        except OSError:
+            # Puerto ocupado (por ejemplo, otra instancia abierta)
+            return
+        self.status_server.start()
+        self.publish_status()
+        self.publish_stats()
+    
+    def publish_status(self):
+        """Publicar el estado del temporizador (solo en cambios, no en cada tick)"""
+        if self.status_server is None:
+            return
+        remaining = self.timer.remaining_exact()
+        self.status_server.publish("status", {
+            "running": self.running,
+            "session_type": self.current_session_type,
+            # En marcha la foto no cambia cada segundo: solo vale 'ends_at', y los
+            # clientes calculan el restante con él sin volver a consultar
+            "remaining": None if self.running else round(remaining, 1),
+            "ends_at": round(time.time() + remaining, 1) if self.running else None,
+            "duration": (self.WORK_MIN if self.current_session_type == "work" else self.BREAK_MIN) * 60,
+            "paused": self.pause_start_time is not None
+        })
+    
+    def publish_stats(self):
+        """Publicar las estadísticas agregadas (tras cada sesión completada)"""
+        if self.status_server is None:
+            return
+        rollups = self.data_manager.rollups
+        self.status_server.publish("stats", {
+            "level": self.user_data["level"],
+            "total_points": self.user_data["total_points"],
+            "experience": self.user_data["experience"],
+            "completed_sessions": self.user_data["completed_sessions"],
+            "total_focus_time": self.user_data["total_focus_time"],
+            "achievements": list(self.user_data["achievements"]),
+            "sessions_per_type": rollups.sessions_per_type(),
+            "sessions_per_day": rollups.sessions_per_day(),
+            "sessions_per_hour": rollups.sessions_per_hour(),
+            "focus_minutes_per_day": rollups.focus_minutes_per_day()
+        })
     
     def start_pause_penalty(self):
-        """Penalización por pausa"""
-        def penalty_thread():
-            while not self.running and self.pause_start_time:
-                time.sleep(10)
-                if not self.running and self.pause_start_time:
-                    self.user_data["total_points"] = max(0, self.user_data["total_points"] - 1)
-                    self.after(0, self.update_display)
-        
-        self.pause_thread = threading.Thread(target=penalty_thread, daemon=True)
-        self.pause_thread.start()
+        """Penalización por pausa: 1 punto por cada intervalo completo en pausa"""
+        self._pause_started = self.timer.clock()
+        self._schedule_penalty_update()
+    
+    def pause_penalty(self):
+        """Puntos perdidos en la pausa actual, calculados del tiempo transcurrido"""
+        if self._pause_started is None:
+            return 0
+        elapsed = self.timer.clock() - self._pause_started
+        return int(elapsed // self.PAUSE_PENALTY_INTERVAL)
+    
+    def _schedule_penalty_update(self):
+        """Refrescar los puntos cuando se cumpla el próximo intervalo de pausa"""
+        next_penalty = self._pause_started + (self.pause_penalty() + 1) * self.PAUSE_PENALTY_INTERVAL
+        self._penalty_job = self.scheduler.call_at(next_penalty, self._on_penalty_interval)
     
+    def _on_penalty_interval(self):
+        self.update_display()
+        self._schedule_penalty_update()
+    
+    def end_pause_penalty(self):
+        """Aplicar la penalización acumulada y cancelar el refresco pendiente"""
+        if self._pause_started is None:
+            return
+        penalty = self.pause_penalty()
+        self.scheduler.cancel(self._penalty_job)
+        self._penalty_job = None
+        self._pause_started = None
+        self.user_data["total_points"] = max(0, self.user_data["total_points"] - penalty)
+        self.update_display()
+    
+    @metrics.timed("countdown_tick")
     def _countdown(self):
         """Cuenta regresiva principal"""
+        if metrics.enabled and self._tick_job is not None:
+            # Retraso real del tick respecto de su fecha límite
+            metrics.observe("tick_lateness", self.scheduler.clock() - self._tick_job.deadline)
+        self._tick_job = None
         if self.running:
-            if self.remaining <= 0:
+            if self.timer.finished:
                 self.complete_session()
             else:
-                self.remaining -= 1
                 self._update_label()
-                self.after(1000, self._countdown)
+                if self.timer_display.visible:
+                    # Despertar en el próximo cambio de segundo, sin acumular retrasos
+                    delay = self.timer.next_tick_ms() / 1000
+                else:
+                    # Sin ventana visible no hay nada que pintar: despertar solo al terminar
+                    delay = self.timer.remaining_exact()
+                self._tick_job = self.scheduler.call_later(delay, self._countdown)
     
+    def _on_timer_visibility(self, visible):
+        """Al mostrarse u ocultarse la ventana, volver a programar el tick"""
+        if self.running and self._tick_job is not None:
+            self._cancel_tick()
+            self._countdown()
+    
+    def _cancel_tick(self):
+        """Cancelar el próximo tick programado"""
+        self.scheduler.cancel(self._tick_job)
+        self._tick_job = None
+    
+    @metrics.timed("complete_session")
     def complete_session(self):
         """Completar sesión y dar recompensas"""
         self.running = False
+        self._cancel_tick()
         self.start_btn.configure(text="▶ START")
         
         # Reproducir sonido
@@ -663,40 +1086,62 @@ class Pomodoro(ctk.CTk):
             # Registrar sesión
             self.data_manager.log_session(self.current_session_type, session_duration, True)
             
-            # Dar puntos y experiencia
-            points = 10 if self.current_session_type == "work" else 5
-            self.user_data["total_points"] += points
-            self.user_data["total_focus_time"] += session_duration
-            self.user_data["completed_sessions"] += 1
-            self.achievement_system.add_experience(points)
-            
-            # Actualizar estadísticas diarias
-            today = dt.datetime.now().strftime("%Y-%m-%d")
-            if today not in self.user_data["daily_stats"]:
-                self.user_data["daily_stats"][today] = 0
-            self.user_data["daily_stats"][today] += 1
-            
-            # Verificar logros
-            new_achievements = self.achievement_system.check_achievements(None)
+            # Puntos, experiencia, estadísticas diarias y logros (solo las reglas que cambian)
+            new_achievements = self.achievement_system.reward_session(
+                self.current_session_type, session_duration, dt.datetime.now())
             if new_achievements:
                 self.show_achievement_notification(new_achievements)
             
             # Guardar datos
             self.data_manager.save_user_data(self.user_data)
+            self.publish_stats()
+        elif self.current_session_type == "work":
+            # Una sesión con pausas no suma a la racha
+            self.achievement_system.break_streak()
+            self.data_manager.save_user_data(self.user_data)
         
         # Cambiar tipo de sesión
         if self.current_session_type == "work":
             self.current_session_type = "break"
-            self.remaining = self.BREAK_MIN * 60
+            self.timer.reset(self.BREAK_MIN * 60)
             self.session_var.set("Descanso")
         else:
             self.current_session_type = "work"
-            self.remaining = self.WORK_MIN * 60
+            self.timer.reset(self.WORK_MIN * 60)
             self.session_var.set("Trabajo")
         
         self.pause_start_time = None
+        self._clear_checkpoint()
         self._update_label()
         self.update_display()
+        self.publish_status()
+    
+    def apply_theme(self, name):
+        """Cambiar de tema reestilando los widgets existentes (sin reconstruir la ventana)"""
+        self.current_theme_name = name
+        self.current_theme = ThemeManager.get_theme(name)
+        self.themed.apply(self.current_theme)
+        if self.background is not None:
+            self.background.set_colors(self._gradient_colors())
+        if self.settings.get("theme") != name:
+            self.settings["theme"] = name
+            self.data_manager.save_settings(self.settings)
+    
+    def _gradient_colors(self):
+        return (self.current_theme["bg"], self.current_theme["btn_bg"])
+    
+    def cycle_theme(self):
+        """Pasar al siguiente tema disponible (Ctrl+T)"""
+        names = ThemeManager.registry().names()
+        index = names.index(self.current_theme_name) if self.current_theme_name in names else -1
+        self.apply_theme(names[(index + 1) % len(names)])
+    
+    def _watch_themes(self):
+        """Recargar en vivo los JSON de themes/ que cambiaron en disco"""
+        changed = ThemeManager.registry().refresh()
+        if self.current_theme_name in changed:
+            self.apply_theme(self.current_theme_name)
+        self._theme_job = self.scheduler.call_later(self.THEME_POLL_INTERVAL, self._watch_themes)
     
     def show_achievement_notification(self, achievements):
         """Mostrar notificación de logros"""
@@ -707,7 +1152,7 @@ class Pomodoro(ctk.CTk):
         notification.attributes("-topmost", True)
         
         for achievement_key in achievements:
-            achievement = AchievementSystem.ACHIEVEMENTS[achievement_key]
+            achievement = self.achievement_system.achievements[achievement_key]
             
             ctk.CTkLabel(notification, text=achievement["icon"],
                         font=ctk.CTkFont(size=48)).pack(pady=10)
@@ -724,24 +1169,60 @@ class Pomodoro(ctk.CTk):
     
     def update_display(self):
         """Actualizar display de puntos y nivel"""
-        self.points_var.set(f"Puntos: {self.user_data['total_points']}")
+        points = max(0, self.user_data['total_points'] - self.pause_penalty())
+        self.points_var.set(f"Puntos: {points}")
         self.level_var.set(f"Nivel {self.user_data['level']}")
     
     def _reset(self):
         """Resetear timer"""
         self.running = False
+        self._cancel_tick()
+        self.end_pause_penalty()
+        self.sound_manager.play_reset_sound()
+        if self.current_session_type == "work" and self.timer.remaining < self.WORK_MIN * 60:
+            # Abandonar una sesión de trabajo empezada corta la racha
+            self.achievement_system.break_streak()
+            self.data_manager.save_user_data(self.user_data)
         self.current_session_type = "work"
-        self.remaining = self.WORK_MIN * 60
+        self.timer.reset(self.WORK_MIN * 60)
         self.start_btn.configure(text="▶ START")
         self.session_var.set("Trabajo")
         self.pause_start_time = None
+        self._clear_checkpoint()
         self._update_label()
+        self.publish_status()
     
     def _update_label(self):
         """Actualizar display del timer"""
-        m, s = divmod(self.remaining, 60)
-        self.timer_var.set(f"{m:02}:{s:02}")
+        duration = self.timer.duration
+        fraction = 1 - self.timer.remaining_exact() / duration if duration else 0.0
+        self.timer_display.render(self.timer.remaining, fraction)
+    
+    def destroy(self):
+        """Guardar los datos pendientes antes de cerrar la ventana"""
+        if self._pause_started is not None:
+            # Cerrar en pausa también cuesta los puntos acumulados hasta ahora
+            self.end_pause_penalty()
+            self.data_manager.save_user_data(self.user_data)
+        self.worker.shutdown()
+        if self.pdf_job is not None:
+            self.pdf_job.cancel()
+        self.scheduler.shutdown()
+        if self.status_server is not None:
+            self.status_server.close()
+        if metrics.enabled:
+            # Foto final y trace para chrome://tracing o Perfetto
+            metrics.stop_file_export()
+            metrics.write_chrome_trace(os.path.join(self.data_manager.data_dir, "trace.json"))
+        # Una sesión empezada se ofrecerá para reanudar en el próximo arranque
+        self.save_checkpoint()
+        self.checkpoint.close()
+        self.sound_manager.close()
+        self.data_manager.close()
+        super().destroy()
 
 if __name__ == "__main__":
+    # Necesario para los procesos de reportes en el ejecutable de PyInstaller
+    multiprocessing.freeze_support()
     app = Pomodoro()
     app.mainloop()
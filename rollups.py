@@ -0,0 +1,196 @@
+import datetime as dt
+import json
+import os
+import threading
+from collections import Counter
+
+from persistence import atomic_write_text
+from session_store import session_duration, session_hour
+
+
+class SessionRollups:
+    """Acumulados de sesiones por día, hora, día de la semana y tipo
+
+    Se actualizan en el hilo de Tk y se consultan también desde hilos de
+    trabajo, por eso todo acceso pasa por un candado. Guardan un cursor del
+    almacén de sesiones: al ponerse al día solo leen lo anexado después, sea
+    de este proceso o de otro.
+    """
+
+    VERSION = 2
+
+    def __init__(self, data_dir, filename="rollups.json"):
+        self.path = os.path.join(data_dir, filename)
+        self._lock = threading.RLock()
+        self.version = 0  # cambia con cada modificación (para cachés)
+        self.reset()
+
+    def reset(self):
+        """Vaciar todos los contadores"""
+        with self._lock:
+            self._reset()
+
+    def _reset(self):
+        self.version += 1
+        self.sessions = 0
+        self.focus_minutes = 0
+        self.per_day = {}      # fecha -> {tipo: sesiones, "focus_minutes": minutos}
+        self.per_hour = {}     # "HH" -> {tipo: sesiones}
+        self.per_weekday = {}  # "0".."6" (lunes=0) -> {tipo: sesiones}
+        self.per_type = {}     # tipo -> sesiones
+        self.source = None     # ruta del almacén de sesiones
+        self.cursor = None     # posición en ese almacén hasta donde se sumó
+
+    def record(self, session):
+        """Sumar una sesión a los acumulados (costo constante)"""
+        with self._lock:
+            self._record(session)
+
+    def _record(self, session):
+        self.version += 1
+        session_type = session.get("type") or "unknown"
+        date = session.get("date")
+        self.sessions += 1
+        self.per_type[session_type] = self.per_type.get(session_type, 0) + 1
+
+        if date:
+            day = self.per_day.setdefault(date, {})
+            day[session_type] = day.get(session_type, 0) + 1
+            try:
+                weekday = str(dt.date.fromisoformat(date).weekday())
+            except ValueError:
+                weekday = None
+            if weekday is not None:
+                bucket = self.per_weekday.setdefault(weekday, {})
+                bucket[session_type] = bucket.get(session_type, 0) + 1
+
+        hour = session_hour(session)
+        if hour is not None:
+            bucket = self.per_hour.setdefault(f"{hour:02}", {})
+            bucket[session_type] = bucket.get(session_type, 0) + 1
+
+        if session_type == "work" and session.get("completed"):
+            minutes = session_duration(session)
+            self.focus_minutes += minutes
+            if date:
+                day["focus_minutes"] = day.get("focus_minutes", 0) + minutes
+
+    def catch_up(self, store):
+        """Sumar las sesiones anexadas al almacén desde el cursor"""
+        with self._lock:
+            self.source = store.path
+            for session, cursor in store.iter_from(self.cursor):
+                self._record(session)
+                self.cursor = cursor
+
+    def rebuild(self, store):
+        """Recalcular todo desde el historial completo"""
+        with self._lock:
+            self._reset()
+            self.catch_up(store)
+
+    # --------- Persistencia ----------
+    def to_dict(self):
+        """Copia de los acumulados, segura para usar en otro hilo"""
+        return json.loads(self.to_json())
+
+    def to_json(self):
+        """JSON compacto de los acumulados (el formato de save())"""
+        with self._lock:
+            return json.dumps({
+                "version": self.VERSION,
+                "sessions": self.sessions,
+                "focus_minutes": self.focus_minutes,
+                "per_day": self.per_day,
+                "per_hour": self.per_hour,
+                "per_weekday": self.per_weekday,
+                "per_type": self.per_type,
+                "source": self.source,
+                "cursor": self.cursor,
+            }, separators=(",", ":"))
+
+    def load(self):
+        """Cargar los acumulados guardados; False si hay que reconstruirlos"""
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return False
+        if data.get("version") != self.VERSION:
+            return False
+        with self._lock:
+            self.version += 1
+            self.sessions = data["sessions"]
+            self.focus_minutes = data["focus_minutes"]
+            self.per_day = data["per_day"]
+            self.per_hour = data["per_hour"]
+            self.per_weekday = data["per_weekday"]
+            self.per_type = data["per_type"]
+            self.source = data["source"]
+            self.cursor = data["cursor"]
+        return True
+
+    def save(self):
+        """Guardar los acumulados con escritura atómica"""
+        atomic_write_text(self.path, self.to_json())
+
+    def load_or_rebuild(self, store):
+        """Cargar los acumulados y ponerlos al día, o reconstruirlos desde el historial"""
+        if self.load() and self.source == store.path:
+            try:
+                self.catch_up(store)
+                return
+            except ValueError:
+                # El almacén cambió por debajo del cursor (p. ej. se reemplazó)
+                pass
+        self.rebuild(store)
+        self.save()
+
+    def is_consistent(self, store):
+        """Comparar con una reconstrucción completa desde el historial"""
+        fresh = SessionRollups(os.path.dirname(self.path))
+        fresh.rebuild(store)
+        return fresh.to_dict() == self.to_dict()
+
+    # --------- Consultas ----------
+    @staticmethod
+    def _count(bucket, session_type):
+        if session_type is None:
+            return sum(v for k, v in bucket.items() if k != "focus_minutes")
+        return bucket.get(session_type, 0)
+
+    def sessions_per_day(self, session_type=None):
+        """Sesiones por fecha, en orden cronológico"""
+        with self._lock:
+            counts = {date: self._count(b, session_type) for date, b in sorted(self.per_day.items())}
+        return {date: n for date, n in counts.items() if n}
+
+    def sessions_per_hour(self, session_type=None):
+        """Sesiones por hora del día"""
+        with self._lock:
+            counts = {int(h): self._count(b, session_type) for h, b in sorted(self.per_hour.items())}
+        return {hour: n for hour, n in counts.items() if n}
+
+    def sessions_per_weekday(self, session_type=None):
+        """Sesiones por día de la semana (lunes=0)"""
+        with self._lock:
+            counts = {int(d): self._count(b, session_type) for d, b in sorted(self.per_weekday.items())}
+        return {day: n for day, n in counts.items() if n}
+
+    def sessions_per_type(self):
+        """Sesiones por tipo"""
+        with self._lock:
+            return dict(self.per_type)
+
+    def focus_minutes_per_day(self):
+        """Minutos de trabajo completados por fecha"""
+        with self._lock:
+            return {date: b["focus_minutes"] for date, b in sorted(self.per_day.items())
+                    if b.get("focus_minutes")}
+
+    @staticmethod
+    def busiest(counts):
+        """Clave con más sesiones de un acumulado, o None"""
+        if not counts:
+            return None
+        return Counter(counts).most_common(1)[0][0]
@@ -0,0 +1,102 @@
+import heapq
+import itertools
+import math
+import sys
+import time
+
+
+class ScheduledCall:
+    """Tarea programada; cancel() la anula en O(1)"""
+
+    __slots__ = ("deadline", "seq", "callback", "cancelled")
+
+    def __init__(self, deadline, seq, callback):
+        self.deadline = deadline
+        self.seq = seq
+        self.callback = callback
+        self.cancelled = False
+
+    def __lt__(self, other):
+        return (self.deadline, self.seq) < (other.deadline, other.seq)
+
+    def cancel(self):
+        self.cancelled = True
+
+
+class TkScheduler:
+    """Planificador único de tareas diferidas integrado con el bucle de Tk
+
+    Mantiene un montículo de fechas límite y un solo after() armado para la
+    más próxima, en lugar de un after() o un hilo por cada tarea.
+    """
+
+    def __init__(self, widget, clock=time.monotonic):
+        self.widget = widget
+        self.clock = clock
+        self._heap = []
+        self._seq = itertools.count()
+        self._armed_job = None
+        self._armed_deadline = None
+
+    def call_at(self, deadline, callback):
+        """Ejecutar callback cuando el reloj llegue a 'deadline'"""
+        call = ScheduledCall(deadline, next(self._seq), callback)
+        heapq.heappush(self._heap, call)
+        if self._armed_deadline is None or deadline < self._armed_deadline:
+            self._arm()
+        return call
+
+    def call_later(self, delay, callback):
+        """Ejecutar callback dentro de 'delay' segundos"""
+        return self.call_at(self.clock() + delay, callback)
+
+    def cancel(self, call):
+        """Anular una tarea (se descarta cuando llega al tope del montículo)"""
+        if call is not None:
+            call.cancel()
+
+    def __len__(self):
+        return sum(1 for call in self._heap if not call.cancelled)
+
+    def _arm(self):
+        if self._armed_job is not None:
+            self.widget.after_cancel(self._armed_job)
+            self._armed_job = None
+            self._armed_deadline = None
+
+        while self._heap and self._heap[0].cancelled:
+            heapq.heappop(self._heap)
+        if not self._heap:
+            return
+
+        deadline = self._heap[0].deadline
+        delay_ms = max(0, math.ceil((deadline - self.clock()) * 1000))
+        self._armed_deadline = deadline
+        self._armed_job = self.widget.after(delay_ms, self._run_due)
+
+    def _run_due(self):
+        self._armed_job = None
+        self._armed_deadline = None
+        now = self.clock()
+        try:
+            while self._heap and self._heap[0].deadline <= now:
+                call = heapq.heappop(self._heap)
+                if call.cancelled:
+                    continue
+                try:
+                    call.callback()
+                except Exception:
+                    # Un error en una tarea no debe dejar sin armar a las demás
+                    self.widget.report_callback_exception(*sys.exc_info())
+        finally:
+            self._arm()
+
+    def shutdown(self):
+        """Anular todas las tareas pendientes"""
+        for call in self._heap:
+            call.cancel()
+        self._heap.clear()
+        if self._armed_job is not None:
+            self.widget.after_cancel(self._armed_job)
+        self._armed_job = None
+        self._armed_deadline = None
@@ -0,0 +1,130 @@
+import bisect
+import json
+import os
+import threading
+
+from persistence import atomic_write_text
+from session_store import session_hour
+
+
+def index_key(session):
+    """Clave ordenable "YYYY-MM-DD|HH" (o "|--" si falta la fecha o la hora)"""
+    hour = session_hour(session)
+    return f"{session.get('date') or ''}|{'--' if hour is None else f'{hour:02}'}"
+
+
+def matches(session, session_types=None, completed=None):
+    """Filtros que no están en la clave del índice"""
+    if session_types is not None and session.get("type") not in session_types:
+        return False
+    if completed is not None and bool(session.get("completed")) != completed:
+        return False
+    return True
+
+
+class SessionIndex:
+    """Índice del diario de sesiones por fecha y hora
+
+    Guarda, para cada clave "fecha|hora" en una lista ordenada, los tramos
+    de bytes del diario donde están sus sesiones (normalmente uno, porque el
+    diario crece en orden cronológico). Una consulta busca con bisect el
+    rango de fechas y lee solo esos tramos, así que su costo depende de las
+    sesiones que devuelve y no del tamaño del historial. Como los acumulados,
+    guarda un cursor del diario y se pone al día leyendo solo lo anexado.
+    """
+
+    VERSION = 1
+
+    def __init__(self, data_dir, filename="session_index.json"):
+        self.path = os.path.join(data_dir, filename)
+        self._lock = threading.RLock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.keys = []   # claves ordenadas
+            self.runs = {}   # clave -> [[inicio, fin], ...] en bytes del diario
+            self.source = None
+            self.cursor = None
+
+    def _record(self, key, start, end):
+        runs = self.runs.get(key)
+        if runs is None:
+            runs = self.runs[key] = []
+            if not self.keys or key > self.keys[-1]:
+                self.keys.append(key)
+            else:
+                bisect.insort(self.keys, key)
+        if runs and runs[-1][1] == start:
+            runs[-1][1] = end
+        else:
+            runs.append([start, end])
+
+    def catch_up(self, journal):
+        """Indexar las sesiones anexadas al diario desde el cursor"""
+        with self._lock:
+            self.source = journal.path
+            start = self.cursor or 0
+            for session, end in journal.iter_from(self.cursor):
+                self._record(index_key(session), start, end)
+                self.cursor = start = end
+
+    def rebuild(self, journal):
+        with self._lock:
+            self.reset()
+            self.catch_up(journal)
+
+    def ranges(self, start_date=None, end_date=None, hours=None):
+        """Tramos de bytes de las claves dentro del rango, en orden de fecha y hora"""
+        with self._lock:
+            lo = bisect.bisect_left(self.keys, start_date or "")
+            hi = bisect.bisect_right(self.keys, (end_date or "\uffff") + "|\uffff")
+            selected = []
+            for key in self.keys[lo:hi]:
+                if hours is not None and (key[-2:] == "--" or int(key[-2:]) not in hours):
+                    continue
+                selected.extend(tuple(run) for run in self.runs[key])
+            return selected
+
+    def query(self, journal, start_date=None, end_date=None, session_types=None, hours=None,
+              completed=None):
+        """Sesiones del diario que cumplen los filtros, leyendo solo sus tramos"""
+        self.catch_up(journal)
+        if session_types is not None:
+            session_types = set(session_types)
+        if hours is not None:
+            hours = set(hours)
+        for session in journal.read_ranges(self.ranges(start_date, end_date, hours)):
+            if matches(session, session_types, completed):
+                yield session
+
+    # --------- Persistencia ----------
+    def to_dict(self):
+        with self._lock:
+            return {"version": self.VERSION, "source": self.source, "cursor": self.cursor,
+                    "runs": {key: [list(run) for run in self.runs[key]] for key in self.keys}}
+
+    def save(self):
+        atomic_write_text(self.path, json.dumps(self.to_dict(), separators=(",", ":")))
+
+    def load_or_rebuild(self, journal):
+        """Cargar el índice guardado y ponerlo al día, o reconstruirlo desde el diario"""
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (FileNotFoundError, ValueError):
+            data = None
+        if data and data.get("version") == self.VERSION and data.get("source") == journal.path:
+            with self._lock:
+                self.runs = data["runs"]
+                self.keys = sorted(self.runs)
+                self.source = data["source"]
+                self.cursor = data["cursor"]
+            try:
+                self.catch_up(journal)
+                return
+            except ValueError:
+                # El diario es más corto que el cursor (se reemplazó o se reparó)
+                pass
+        self.rebuild(journal)
+        self.save()
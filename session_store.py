@@ -0,0 +1,438 @@
+import abc
+import json
+import os
+import pathlib
+import sqlite3
+import threading
+from collections import Counter
+
+from persistence import FileLock
+
+
+def session_hour(session):
+    """Hora del día (0-23) de una sesión a partir de su campo 'time'"""
+    try:
+        return int(str(session.get("time", ""))[:2])
+    except ValueError:
+        return None
+
+
+def session_duration(session):
+    """Duración en minutos (registros nuevos y formato antiguo)"""
+    duration = session.get("duration", session.get("actual_duration", 0))
+    return duration or 0
+
+
+class SessionStore(abc.ABC):
+    """Interfaz común de los almacenes de sesiones"""
+
+    @abc.abstractmethod
+    def append(self, session):
+        """Anexar una sesión"""
+
+    def extend(self, sessions):
+        """Anexar varias sesiones"""
+        for session in sessions:
+            self.append(session)
+
+    @abc.abstractmethod
+    def iter_sessions(self):
+        """Recorrer todas las sesiones en orden de llegada"""
+
+    def count(self):
+        """Número total de sesiones"""
+        return sum(1 for _ in self.iter_sessions())
+
+    def iter_from(self, cursor=None):
+        """Sesiones anexadas después de 'cursor', como pares (sesión, cursor siguiente)"""
+        position = cursor or 0
+        for index, session in enumerate(self.iter_sessions(), 1):
+            if index > position:
+                yield session, index
+
+    def end_cursor(self):
+        """Cursor que deja atrás todas las sesiones guardadas hasta ahora"""
+        return self.count()
+
+    def select(self, start_date=None, end_date=None, session_types=None):
+        """Recorrer las sesiones de un rango de fechas (inclusivo) y tipos"""
+        return self.query(start_date, end_date, session_types)
+
+    def query(self, start_date=None, end_date=None, session_types=None, hours=None,
+              completed=None):
+        """Sesiones por rango de fechas (inclusivo), tipos, horas del día y si se completaron
+
+        Recorre todo el historial; los almacenes con índices lo reemplazan.
+        """
+        for session in self.iter_sessions():
+            date = session.get("date", "")
+            if start_date is not None and date < start_date:
+                continue
+            if end_date is not None and date > end_date:
+                continue
+            if session_types is not None and session.get("type") not in session_types:
+                continue
+            if hours is not None and session_hour(session) not in hours:
+                continue
+            if completed is not None and bool(session.get("completed")) != completed:
+                continue
+            yield session
+
+    def sessions_per_day(self, session_type=None):
+        """Sesiones por fecha, en orden cronológico"""
+        counts = Counter(s.get("date") for s in self.iter_sessions()
+                         if session_type is None or s.get("type") == session_type)
+        return dict(sorted(counts.items()))
+
+    def sessions_per_hour(self, session_type=None):
+        """Sesiones por hora del día"""
+        counts = Counter(session_hour(s) for s in self.iter_sessions()
+                         if session_type is None or s.get("type") == session_type)
+        counts.pop(None, None)
+        return dict(sorted(counts.items()))
+
+    def sessions_per_type(self):
+        """Sesiones por tipo ("work" / "break")"""
+        return dict(Counter(s.get("type") for s in self.iter_sessions()))
+
+    def focus_minutes_per_day(self):
+        """Minutos de trabajo completados por fecha"""
+        minutes = Counter()
+        for s in self.iter_sessions():
+            if s.get("type") == "work" and s.get("completed"):
+                minutes[s.get("date")] += session_duration(s)
+        return dict(sorted(minutes.items()))
+
+    def close(self):
+        pass
+
+
+class SessionJournal(SessionStore):
+    """Diario de sesiones de solo-anexado (una sesión JSON por línea)
+
+    Varios procesos pueden anexar a la vez: cada escritura toma un candado
+    de archivo, y los lectores solo consideran las líneas ya terminadas.
+    """
+
+    def __init__(self, data_dir, filename="sessions.jsonl", legacy_filename="sessions.json"):
+        self.data_dir = data_dir
+        self.path = os.path.join(data_dir, filename)
+        self.legacy_path = os.path.join(data_dir, legacy_filename)
+        self.lock = FileLock(self.path + ".lock")
+        self.migrate_legacy()
+
+    def migrate_legacy(self):
+        """Migrar una sola vez el arreglo de sessions.json al diario"""
+        with self.lock:
+            if os.path.exists(self.path) or not os.path.exists(self.legacy_path):
+                return 0
+
+            sessions = load_legacy_sessions(self.legacy_path)
+
+            # Escribir a un temporal y renombrar: el diario solo aparece completo
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                for session in sessions:
+                    f.write(self._encode(session))
+            os.replace(tmp_path, self.path)
+            return len(sessions)
+
+    @staticmethod
+    def _ends_without_newline(f):
+        """Detectar una última línea cortada por una escritura interrumpida"""
+        f.seek(0, os.SEEK_END)
+        if f.tell() == 0:
+            return False
+        f.seek(-1, os.SEEK_END)
+        return f.read(1) != b"\n"
+
+    @staticmethod
+    def _encode(session):
+        return json.dumps(session, ensure_ascii=False, separators=(",", ":")) + "\n"
+
+    def append(self, session):
+        """Anexar una sesión al final del diario (costo constante)"""
+        self.extend([session])
+
+    def extend(self, sessions):
+        """Anexar varias sesiones con una sola escritura bajo el candado"""
+        data = "".join(self._encode(s) for s in sessions).encode("utf-8")
+        if not data:
+            return
+        with self.lock, open(self.path, 'a+b') as f:
+            if self._ends_without_newline(f):
+                # Aislar la línea rota para no corromper el registro nuevo
+                data = b"\n" + data
+            f.write(data)
+
+    def iter_sessions(self):
+        """Recorrer las sesiones del diario sin cargarlas todas en memoria"""
+        try:
+            f = open(self.path, 'rb')
+        except FileNotFoundError:
+            return
+        with f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    # Línea incompleta por un cierre inesperado (o bytes dañados)
+                    continue
+
+    def iter_from(self, cursor=None):
+        """Leer solo lo anexado desde un desplazamiento en bytes (sin candado)"""
+        offset = cursor or 0
+        try:
+            f = open(self.path, 'rb')
+        except FileNotFoundError:
+            if offset:
+                raise ValueError("el diario ya no existe")
+            return
+        with f:
+            if offset > os.fstat(f.fileno()).st_size:
+                raise ValueError("el diario es más corto que el cursor")
+            f.seek(offset)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    # Otro proceso aún la está escribiendo (o quedó cortada)
+                    break
+                offset += len(line)
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield json.loads(line), offset
+                except ValueError:
+                    continue
+
+    def read_ranges(self, ranges):
+        """Sesiones de los tramos de bytes indicados (por un SessionIndex), en ese orden"""
+        try:
+            f = open(self.path, 'rb')
+        except FileNotFoundError:
+            return
+        with f:
+            for start, end in ranges:
+                f.seek(start)
+                for line in f.read(end - start).splitlines():
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        yield json.loads(line)
+                    except ValueError:
+                        continue
+
+    def end_cursor(self):
+        """Tamaño del diario en bytes (sin leerlo)"""
+        try:
+            return os.path.getsize(self.path)
+        except FileNotFoundError:
+            return 0
+
+
+class SqliteSessionStore(SessionStore):
+    """Almacén de sesiones en SQLite con índices por fecha, hora y tipo"""
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS sessions (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            date TEXT NOT NULL,
+            time TEXT,
+            hour INTEGER,
+            type TEXT,
+            duration INTEGER NOT NULL DEFAULT 0,
+            completed INTEGER NOT NULL DEFAULT 0,
+            data TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_sessions_date ON sessions(date);
+        CREATE INDEX IF NOT EXISTS idx_sessions_hour ON sessions(hour);
+        CREATE INDEX IF NOT EXISTS idx_sessions_type ON sessions(type, date);
+    """
+
+    def __init__(self, data_dir, filename="sessions.db"):
+        self.data_dir = data_dir
+        self.path = os.path.join(data_dir, filename)
+        self._lock = threading.Lock()
+        # Otros procesos pueden estar escribiendo: esperar en lugar de fallar
+        self.conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(self.SCHEMA)
+        self.conn.commit()
+        self.import_legacy()
+
+    @staticmethod
+    def _row(session):
+        return (
+            session.get("date", ""),
+            session.get("time"),
+            session_hour(session),
+            session.get("type"),
+            session_duration(session),
+            1 if session.get("completed") else 0,
+            json.dumps(session, ensure_ascii=False, separators=(",", ":")),
+        )
+
+    def import_legacy(self):
+        """Importar una sola vez el historial JSON existente si la base está vacía"""
+        # El candado evita que dos procesos que arrancan a la vez importen dos veces
+        with FileLock(self.path + ".lock"):
+            if self.count():
+                return 0
+            jsonl_path = os.path.join(self.data_dir, "sessions.jsonl")
+            if os.path.exists(jsonl_path):
+                sessions = SessionJournal(self.data_dir).iter_sessions()
+            else:
+                sessions = load_legacy_sessions(os.path.join(self.data_dir, "sessions.json"))
+            return self.extend(sessions)
+
+    def append(self, session):
+        """Insertar una sesión"""
+        self.extend([session])
+
+    def extend(self, sessions):
+        """Insertar varias sesiones en una sola transacción"""
+        with self._lock, self.conn:
+            cursor = self.conn.executemany(
+                "INSERT INTO sessions (date, time, hour, type, duration, completed, data) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (self._row(s) for s in sessions))
+        return cursor.rowcount
+
+    def _query(self, sql, params=()):
+        with self._lock:
+            return self.conn.execute(sql, params).fetchall()
+
+    def iter_sessions(self, batch_size=1000):
+        """Recorrer las sesiones en orden de inserción por lotes"""
+        last_id = 0
+        while True:
+            rows = self._query("SELECT id, data FROM sessions WHERE id > ? ORDER BY id LIMIT ?",
+                               (last_id, batch_size))
+            if not rows:
+                return
+            for row_id, data in rows:
+                yield json.loads(data)
+            last_id = rows[-1][0]
+
+    def count(self):
+        return self._query("SELECT COUNT(*) FROM sessions")[0][0]
+
+    def end_cursor(self):
+        return self._query("SELECT COALESCE(MAX(id), 0) FROM sessions")[0][0]
+
+    def iter_from(self, cursor=None, batch_size=1000):
+        """Sesiones con id mayor que el cursor (incluye las de otros procesos)"""
+        last_id = cursor or 0
+        while True:
+            rows = self._query("SELECT id, data FROM sessions WHERE id > ? ORDER BY id LIMIT ?",
+                               (last_id, batch_size))
+            if not rows:
+                return
+            for row_id, data in rows:
+                yield json.loads(data), row_id
+            last_id = rows[-1][0]
+
+    def query(self, start_date=None, end_date=None, session_types=None, hours=None,
+              completed=None, batch_size=1000):
+        """Filtrar en la base (usa los índices por fecha, hora y tipo), en orden de fecha y hora"""
+        conditions, params = [], []
+        if start_date is not None:
+            conditions.append("date >= ?")
+            params.append(start_date)
+        if end_date is not None:
+            conditions.append("date <= ?")
+            params.append(end_date)
+        if session_types is not None:
+            session_types = list(session_types)
+            conditions.append(f"type IN ({','.join('?' * len(session_types))})")
+            params.extend(session_types)
+        if hours is not None:
+            hours = list(hours)
+            conditions.append(f"hour IN ({','.join('?' * len(hours))})")
+            params.extend(hours)
+        if completed is not None:
+            conditions.append("completed = ?")
+            params.append(1 if completed else 0)
+        where = " WHERE " + " AND ".join(conditions) if conditions else ""
+
+        # Conexión de solo lectura propia: el cursor puede vivir mientras se consume
+        conn = sqlite3.connect(pathlib.Path(self.path).resolve().as_uri() + "?mode=ro", uri=True)
+        try:
+            cursor = conn.execute(f"SELECT data FROM sessions{where} ORDER BY date, hour, id",
+                                  params)
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    return
+                for (data,) in rows:
+                    yield json.loads(data)
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _type_filter(session_type):
+        if session_type is None:
+            return "", ()
+        return " WHERE type = ?", (session_type,)
+
+    def sessions_per_day(self, session_type=None):
+        where, params = self._type_filter(session_type)
+        return dict(self._query(
+            f"SELECT date, COUNT(*) FROM sessions{where} GROUP BY date ORDER BY date", params))
+
+    def sessions_per_hour(self, session_type=None):
+        where, params = self._type_filter(session_type)
+        where = (where + " AND" if where else " WHERE") + " hour IS NOT NULL"
+        return dict(self._query(
+            f"SELECT hour, COUNT(*) FROM sessions{where} GROUP BY hour ORDER BY hour", params))
+
+    def sessions_per_type(self):
+        return dict(self._query("SELECT type, COUNT(*) FROM sessions GROUP BY type"))
+
+    def focus_minutes_per_day(self):
+        return dict(self._query(
+            "SELECT date, SUM(duration) FROM sessions WHERE type = 'work' AND completed = 1 "
+            "GROUP BY date ORDER BY date"))
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
+
+
+SESSION_BACKENDS = {
+    "jsonl": SessionJournal,
+    "sqlite": SqliteSessionStore,
+}
+
+
+def create_session_store(data_dir, backend="jsonl"):
+    """Crear el almacén de sesiones configurado"""
+    store_class = SESSION_BACKENDS.get(backend, SessionJournal)
+    return store_class(data_dir)
+
+
+def load_legacy_sessions(path):
+    """Leer el arreglo completo de un sessions.json antiguo"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            sessions = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return []
+    return sessions if isinstance(sessions, list) else []
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Importar el historial JSON de sesiones a SQLite")
+    parser.add_argument("--data-dir", default="pomodoro_data")
+    args = parser.parse_args()
+
+    store = SqliteSessionStore(args.data_dir)
+    print(f"✓ {store.count()} sesiones en {store.path}")
+    store.close()
@@ -0,0 +1,90 @@
+import io
+import threading
+from collections import OrderedDict
+
+import lazy_deps
+from instrumentation import metrics
+
+
+@metrics.timed("render_stats_png")
+def render_stats_png(daily_stats, hourly_stats, theme, size=(7.2, 4.8), dpi=100):
+    """Dibujar las gráficas de productividad y devolverlas como PNG
+
+    Usa la API orientada a objetos de matplotlib (sin pyplot), así que se
+    puede llamar desde un hilo de trabajo y no deja figuras registradas.
+    """
+    charts = lazy_deps.charts.get()
+    fig = charts.Figure(figsize=size, dpi=dpi, facecolor=theme["bg"])
+    charts.FigureCanvasAgg(fig)
+    ax1, ax2 = fig.subplots(2, 1)
+
+    # Gráfica de sesiones por día
+    dates = list(daily_stats.keys())
+    ax1.bar(range(len(dates)), list(daily_stats.values()), color=theme["fg"])
+    step = max(1, len(dates) // 10)
+    ax1.set_xticks(range(0, len(dates), step))
+    ax1.set_xticklabels(dates[::step], rotation=30, ha="right")
+    ax1.set_title('Sesiones por Día', color=theme["fg"])
+    ax1.set_xlabel('Fecha', color=theme["fg"])
+    ax1.set_ylabel('Sesiones', color=theme["fg"])
+
+    # Gráfica de distribución por horas
+    ax2.plot(list(hourly_stats.keys()), list(hourly_stats.values()), color=theme["fg"], marker='o')
+    ax2.set_title('Distribución por Horas del Día', color=theme["fg"])
+    ax2.set_xlabel('Hora', color=theme["fg"])
+    ax2.set_ylabel('Sesiones', color=theme["fg"])
+
+    # Tema oscuro sin tocar el estado global de matplotlib
+    for ax in (ax1, ax2):
+        ax.set_facecolor(theme["bg"])
+        ax.tick_params(colors=theme["fg"])
+        for spine in ax.spines.values():
+            spine.set_color(theme["fg"])
+
+    fig.tight_layout()
+    out = io.BytesIO()
+    try:
+        fig.savefig(out, format="png", facecolor=fig.get_facecolor())
+    finally:
+        # Liberar artistas y buffers de la figura de inmediato
+        fig.clear()
+    return out.getvalue()
+
+
+class ChartCache:
+    """Caché LRU de gráficas ya dibujadas (PNG)
+
+    La clave es (versión de los datos, colores del tema, tamaño), así que abrir
+    de nuevo el panel sin sesiones nuevas reutiliza la imagen anterior.
+    """
+
+    def __init__(self, max_entries=8):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            png = self._entries.get(key)
+            if png is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return png
+
+    def put(self, key, png):
+        with self._lock:
+            self._entries[key] = png
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
@@ -0,0 +1,197 @@
+import email.utils
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from instrumentation import metrics
+
+
+# Espera máxima de una consulta larga (?wait=segundos)
+MAX_WAIT = 60
+
+
+class Resource:
+    """Documento JSON ya serializado, con sus validadores ETag y Last-Modified"""
+
+    def __init__(self, name, token):
+        self.name = name
+        self.token = token
+        self.version = 0
+        self.body = b"null"
+        self.modified = time.time()
+
+    @property
+    def etag(self):
+        # El token de arranque evita confundir versiones de otra ejecución
+        return f'"{self.name}-{self.token}-{self.version}"'
+
+    @property
+    def last_modified(self):
+        return email.utils.formatdate(self.modified, usegmt=True)
+
+
+class StatusServer:
+    """API HTTP local de solo lectura: estado del temporizador y estadísticas
+
+    El hilo de Tk publica una foto nueva solo cuando algo cambia. Cada foto se
+    serializa una vez y se comparte con todos los clientes; las consultas
+    condicionales responden 304 sin tocar los archivos de datos.
+
+    Con el temporizador en marcha, /status trae 'ends_at' (hora de pared de
+    fin) y 'remaining' en null; en pausa o detenido, 'remaining' y no 'ends_at'.
+
+    Rutas: /status y /stats (admiten If-None-Match, If-Modified-Since y
+    ?wait=segundos para consulta larga), /events (Server-Sent Events) y
+    /metrics (formato de Prometheus, si la instrumentación está activa).
+    """
+
+    RESOURCES = ("status", "stats")
+
+    def __init__(self, host="127.0.0.1", port=8765, heartbeat=15):
+        self.heartbeat = heartbeat
+        token = format(int(time.time() * 1000) & 0xFFFFFFFF, "x")
+        self._resources = {name: Resource(name, token) for name in self.RESOURCES}
+        self._cond = threading.Condition()
+        self._closed = False
+        self.httpd = ThreadingHTTPServer((host, port), _StatusHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.status = self
+        self._thread = None
+
+    @property
+    def port(self):
+        return self.httpd.server_address[1]
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name="status-api",
+                                        daemon=True)
+        self._thread.start()
+
+    def publish(self, name, data):
+        """Reemplazar un recurso (hilo de Tk); sin cambios no altera los validadores"""
+        body = json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        with self._cond:
+            resource = self._resources[name]
+            if body == resource.body:
+                return
+            resource.version += 1
+            resource.body = body
+            resource.modified = time.time()
+            self._cond.notify_all()
+
+    def snapshot(self, name, etag=None, wait=0):
+        """(etag, last_modified, modified, cuerpo) de un recurso
+
+        Con 'wait', espera hasta ese tiempo a que el ETag deje de ser 'etag'.
+        """
+        with self._cond:
+            resource = self._resources[name]
+            if wait and etag is not None:
+                self._cond.wait_for(lambda: self._closed or resource.etag != etag, wait)
+            return resource.etag, resource.last_modified, resource.modified, resource.body
+
+    def changes_since(self, versions, wait):
+        """Recursos con versión distinta de 'versions' (espera hasta 'wait')"""
+        def changed():
+            # La versión 0 es "aún sin publicar": no se envía
+            return [r for r in self._resources.values() if versions.get(r.name, 0) != r.version]
+
+        with self._cond:
+            self._cond.wait_for(lambda: self._closed or changed(), wait)
+            return self._closed, [(r.name, r.version, r.body) for r in changed()]
+
+    def close(self):
+        """Despertar a los clientes en espera y detener el servidor"""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        if self._thread is not None:
+            self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+class _StatusHandler(BaseHTTPRequestHandler):
+    server_version = "PomodoroPro"
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        name = url.path.strip("/")
+        status = self.server.status
+        if name == "events":
+            self._events(status)
+            return
+        if name == "metrics" and metrics.enabled:
+            body = metrics.prometheus_text().encode("utf-8")
+            self._send(200, body, content_type="text/plain; version=0.0.4")
+            return
+        if name not in status.RESOURCES:
+            self._send(404, b'{"error":"not found"}')
+            return
+
+        try:
+            wait = min(float(parse_qs(url.query).get("wait", ["0"])[0]), MAX_WAIT)
+        except ValueError:
+            wait = 0
+        if_none_match = self.headers.get("If-None-Match")
+        etag, last_modified, modified, body = status.snapshot(name, if_none_match, max(wait, 0))
+
+        headers = {"ETag": etag, "Last-Modified": last_modified, "Cache-Control": "no-cache"}
+        if if_none_match is not None:
+            not_modified = etag in [tag.strip() for tag in if_none_match.split(",")]
+        else:
+            not_modified = self._not_modified_since(modified)
+        if not_modified:
+            self._send(304, b"", headers)
+        else:
+            self._send(200, body, headers)
+
+    def _not_modified_since(self, modified):
+        since = self.headers.get("If-Modified-Since")
+        if since is None:
+            return False
+        try:
+            return int(modified) <= email.utils.parsedate_to_datetime(since).timestamp()
+        except (TypeError, ValueError):
+            return False
+
+    def _send(self, code, body, headers=None, content_type="application/json; charset=utf-8"):
+        self.send_response(code)
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        if code != 304:
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if body:
+            self.wfile.write(body)
+
+    def _events(self, status):
+        """Enviar cada recurso al conectarse y luego en cada cambio"""
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+
+        versions = {}
+        try:
+            while True:
+                closed, changed = status.changes_since(versions, status.heartbeat)
+                if closed:
+                    return
+                if not changed:
+                    self.wfile.write(b": ping\n\n")
+                for name, version, body in changed:
+                    versions[name] = version
+                    self.wfile.write(b"event: " + name.encode() + b"\nid: " + str(version).encode()
+                                     + b"\ndata: " + body + b"\n\n")
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            return
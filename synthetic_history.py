@@ -0,0 +1,127 @@
+import datetime as dt
+import itertools
+import random
+
+
+TAGS = ("investigacion", "escritura", "lectura", "codigo", "reuniones", "arte_inmersivo",
+        "cambio_climatico")
+
+# Peso de cada hora del día para empezar un bloque de pomodoros
+HOUR_WEIGHTS = {
+    5: 1, 6: 2, 7: 4, 8: 7, 9: 10, 10: 10, 11: 8, 12: 4, 13: 3, 14: 7,
+    15: 8, 16: 7, 17: 5, 18: 3, 19: 2, 20: 2, 21: 2, 22: 2, 23: 1,
+}
+
+
+class HistoryGenerator:
+    """Historiales de sesiones realistas y reproducibles (misma semilla, mismo historial)
+
+    Los días laborables tienen más bloques que los fines de semana, cada
+    bloque alterna trabajo y descanso empezando en horas más probables por
+    la mañana y la tarde, y una fracción de sesiones queda pausada o sin
+    completar, con etiquetas como en el historial real.
+    """
+
+    def __init__(self, seed=42, start=dt.date(2020, 1, 1), work_min=25, break_min=5,
+                 pause_rate=0.06, abandon_rate=0.04):
+        self.rng = random.Random(seed)
+        self.day = start
+        self.work_min = work_min
+        self.break_min = break_min
+        self.pause_rate = pause_rate
+        self.abandon_rate = abandon_rate
+        self._hours = list(HOUR_WEIGHTS)
+        self._cum_weights = list(itertools.accumulate(HOUR_WEIGHTS.values()))
+
+    def day_sessions(self):
+        """Sesiones de un día, en orden; avanza al día siguiente"""
+        rng = self.rng
+        date = self.day.isoformat()
+        weekend = self.day.weekday() >= 5
+        self.day += dt.timedelta(days=1)
+
+        blocks = rng.randint(0, 2) if weekend else rng.randint(1, 4)
+        starts = sorted(rng.choices(self._hours, cum_weights=self._cum_weights, k=blocks))
+        sessions = []
+        minute = 0
+        for hour in starts:
+            minute = max(minute, hour * 60 + rng.randrange(60))
+            for _ in range(rng.randint(1, 6)):
+                for session_type in ("work", "break"):
+                    if minute >= 24 * 60:
+                        return sessions
+                    planned = self.work_min if session_type == "work" else self.break_min
+                    completed = rng.random() >= self.abandon_rate
+                    duration = planned if completed else rng.randint(1, max(1, planned - 1))
+                    session = {
+                        "date": date,
+                        "time": f"{minute // 60:02}:{minute % 60:02}:{rng.randrange(60):02}",
+                        "type": session_type,
+                        "duration": duration,
+                        "completed": completed,
+                    }
+                    if rng.random() < self.pause_rate:
+                        session["paused"] = True
+                        minute += rng.randint(1, 10)
+                    if session_type == "work" and rng.random() < 0.5:
+                        session["tags"] = rng.sample(TAGS, rng.randint(1, 2))
+                    sessions.append(session)
+                    minute += duration
+            # Pausa larga entre bloques
+            minute += rng.randint(15, 90)
+        return sessions
+
+    def sessions(self, count):
+        """Exactamente 'count' sesiones, generadas día a día (memoria constante)"""
+        produced = 0
+        while produced < count:
+            for session in self.day_sessions()[:count - produced]:
+                yield session
+                produced += 1
+
+
+def generate_sessions(count, seed=42, **options):
+    """Historial sintético reproducible de 'count' sesiones"""
+    return HistoryGenerator(seed, **options).sessions(count)
+
+
+def extend_in_batches(store, sessions, batch_size=100_000):
+    """Cargar un historial grande en el almacén sin materializarlo entero"""
+    sessions = iter(sessions)
+    total = 0
+    while True:
+        batch = list(itertools.islice(sessions, batch_size))
+        if not batch:
+            return total
+        store.extend(batch)
+        total += len(batch)
+
+
+if __name__ == "__main__":
+    import argparse
+    import os
+
+    from persistence import atomic_write_text
+    from session_store import create_session_store
+
+    parser = argparse.ArgumentParser(description="Generar un historial sintético de sesiones")
+    parser.add_argument("--sessions", type=int, default=100_000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--data-dir", default="pomodoro_bench_data")
+    parser.add_argument("--backend", choices=["jsonl", "sqlite", "json"], default="jsonl",
+                        help="'json' escribe el arreglo antiguo sessions.json")
+    args = parser.parse_args()
+
+    os.makedirs(args.data_dir, exist_ok=True)
+    sessions = generate_sessions(args.sessions, args.seed)
+    if args.backend == "json":
+        import json
+
+        path = os.path.join(args.data_dir, "sessions.json")
+        atomic_write_text(path, json.dumps(list(sessions), ensure_ascii=False))
+    else:
+        store = create_session_store(args.data_dir, args.backend)
+        extend_in_batches(store, sessions)
+        path = store.path
+        store.close()
+    print(f"✓ {args.sessions} sesiones en {path}")
@@ -0,0 +1,61 @@
+import json
+import multiprocessing
+import os
+
+import pytest
+
+from persistence import WriteBehindWriter, atomic_write_json
+from rollups import SessionRollups
+from session_store import SESSION_BACKENDS, create_session_store
+from synthetic_history import generate_sessions
+from user_data_store import UserDataStore
+from wal import WriteAheadLog
+
+PROCESSES = 3
+SESSIONS = 60
+
+
+def log_sessions(data_dir, backend, sessions, seed):
+    """Un proceso que registra sesiones como lo hace DataManager"""
+    store = create_session_store(data_dir, backend)
+    rollups = SessionRollups(data_dir)
+    rollups.load_or_rebuild(store)
+    wal = WriteAheadLog(data_dir, store, max_bytes=8 * 1024)
+    users = UserDataStore(data_dir, wal=wal)
+    writer = WriteBehindWriter(delay=0.005)
+    user_data = users.load()
+    for session in generate_sessions(sessions, seed):
+        wal.append_sessions([session])
+        rollups.catch_up(store)
+        writer.schedule_render(rollups.path, rollups.to_json)
+        user_data["completed_sessions"] += 1
+        user_data["total_points"] += 10
+        user_data["daily_stats"][session["date"]] = user_data["daily_stats"].get(session["date"], 0) + 1
+        writer.schedule(users.path, user_data, users.commit)
+    writer.close()
+    store.close()
+
+
+@pytest.mark.parametrize("backend", list(SESSION_BACKENDS))
+def test_concurrent_processes_lose_nothing(tmp_path, backend):
+    data_dir = str(tmp_path)
+    atomic_write_json(os.path.join(data_dir, "user_data.json"),
+                      {"total_points": 0, "completed_sessions": 0, "daily_stats": {}})
+    with multiprocessing.get_context("spawn").Pool(PROCESSES) as pool:
+        pool.starmap(log_sessions, [(data_dir, backend, SESSIONS, seed) for seed in range(PROCESSES)])
+
+    expected = PROCESSES * SESSIONS
+    store = create_session_store(data_dir, backend)
+    try:
+        rollups = SessionRollups(data_dir)
+        rollups.load_or_rebuild(store)
+        assert store.count() == expected
+        assert rollups.sessions == expected
+        assert rollups.is_consistent(store)
+    finally:
+        store.close()
+    with open(os.path.join(data_dir, "user_data.json"), 'r', encoding='utf-8') as f:
+        user_data = json.load(f)
+    assert user_data["completed_sessions"] == expected
+    assert user_data["total_points"] == 10 * expected
+    assert sum(user_data["daily_stats"].values()) == expected
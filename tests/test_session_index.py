@@ -0,0 +1,43 @@
+import pytest
+
+from session_index import SessionIndex
+from session_store import SessionJournal
+from synthetic_history import generate_sessions
+from wal import session_key
+
+
+@pytest.fixture
+def journal(tmp_path):
+    store = SessionJournal(str(tmp_path))
+    store.extend(generate_sessions(3_000, seed=7))
+    yield store
+    store.close()
+
+
+def keys(sessions):
+    return sorted(map(session_key, sessions))
+
+
+@pytest.mark.parametrize("filters", [
+    {},
+    {"start_date": "2020-02-10", "end_date": "2020-02-10"},
+    {"start_date": "2020-03-01", "end_date": "2020-03-31", "hours": [9, 22]},
+    {"start_date": "2020-01-01", "end_date": "2020-06-30", "session_types": ["work"],
+     "completed": True},
+    {"hours": [9]},
+    {"end_date": "2020-01-15", "session_types": ["break"]},
+])
+def test_indexed_query_matches_full_scan(tmp_path, journal, filters):
+    index = SessionIndex(str(tmp_path))
+    assert keys(index.query(journal, **filters)) == keys(journal.query(**filters))
+
+
+def test_saved_index_catches_up_with_new_sessions(tmp_path, journal):
+    index = SessionIndex(str(tmp_path))
+    index.load_or_rebuild(journal)
+    journal.extend([{"date": "2030-01-01", "time": "08:00:00", "type": "work",
+                     "duration": 25, "completed": True}])
+    reloaded = SessionIndex(str(tmp_path))
+    reloaded.load_or_rebuild(journal)
+    found = list(reloaded.query(journal, start_date="2030-01-01"))
+    assert [s["date"] for s in found] == ["2030-01-01"]
@@ -0,0 +1,73 @@
+import random
+
+import pytest
+
+from timer_engine import TimerEngine
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def run_session(duration_s, max_late_ms, suspend_s=0.0, seed=1):
+    """Instante de fin de una sesión con ticks tardíos (y una suspensión a la mitad)"""
+    rng = random.Random(seed)
+    clock = FakeClock()
+    engine = TimerEngine(duration_s, clock=clock)
+    engine.start()
+    suspended = False
+    while not engine.finished:
+        clock.now += engine.next_tick_ms() / 1000 + rng.uniform(0, max_late_ms) / 1000
+        if not suspended and clock.now >= duration_s / 2:
+            clock.now += suspend_s
+            suspended = True
+    return clock.now
+
+
+@pytest.mark.parametrize("duration_s", [25 * 60, 4 * 3600])
+@pytest.mark.parametrize("max_late_ms", [5, 50, 250])
+def test_late_ticks_do_not_accumulate(duration_s, max_late_ms):
+    # Termina como mucho un tick tarde, sin importar cuántos ticks llegaron tarde
+    assert run_session(duration_s, max_late_ms) - duration_s < 0.5
+
+
+def test_suspend_counts_towards_the_session():
+    assert run_session(25 * 60, 50, suspend_s=600) - 25 * 60 < 0.5
+
+
+def test_pause_keeps_exact_remaining():
+    clock = FakeClock()
+    engine = TimerEngine(60, clock=clock)
+    engine.start()
+    clock.now = 10.25
+    engine.pause()
+    clock.now = 500
+    assert engine.remaining_exact() == pytest.approx(49.75)
+    engine.start()
+    clock.now = 500 + 49.75
+    assert engine.finished
+
+
+def test_display_rounds_up_and_ticks_on_second_changes():
+    clock = FakeClock()
+    engine = TimerEngine(60, clock=clock)
+    engine.start()
+    assert engine.remaining == 60
+    clock.now = 0.3
+    assert engine.remaining == 60
+    assert engine.next_tick_ms() == 701
+
+
+def test_adjust_never_goes_below_zero():
+    clock = FakeClock()
+    engine = TimerEngine(60, clock=clock)
+    engine.adjust(-120)
+    assert engine.remaining_exact() == 0
+    engine.reset(30)
+    engine.start()
+    engine.adjust(-45)
+    assert engine.finished
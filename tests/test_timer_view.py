@@ -0,0 +1,45 @@
+from timer_view import TimerFace, format_remaining
+
+
+def test_format_remaining():
+    assert format_remaining(25 * 60) == "25:00"
+    assert format_remaining(61) == "01:01"
+    assert format_remaining(100 * 60) == "100:00"
+
+
+def test_only_changed_glyphs_are_reported():
+    face = TimerFace()
+    glyphs, _ = face.update(25 * 60, 0.0)
+    assert glyphs == [0, 1, 2, 3, 4]
+    glyphs, _ = face.update(25 * 60 - 1, 0.0)
+    # 25:00 -> 24:59: cambian el segundo dígito de los minutos y los dos de los segundos
+    assert glyphs == [1, 3, 4]
+    glyphs, _ = face.update(25 * 60 - 2, 0.0)
+    assert glyphs == [4]
+
+
+def test_text_length_change_redraws_everything():
+    face = TimerFace()
+    face.update(100 * 60, 0.0)
+    glyphs, _ = face.update(99 * 60 + 59, 0.0)
+    assert glyphs == [0, 1, 2, 3, 4]
+
+
+def test_ring_reports_only_new_segments():
+    face = TimerFace(segments=120)
+    _, segments = face.update(1500, 0.0)
+    assert len(segments) == 0
+    _, segments = face.update(1490, 0.5)
+    assert list(segments) == list(range(0, 60))
+    _, segments = face.update(1480, 0.5)
+    assert len(segments) == 0
+    # Al reiniciar se apagan los que estaban encendidos
+    _, segments = face.update(1500, 0.0)
+    assert list(segments) == list(range(0, 60))
+
+
+def test_a_full_session_touches_far_fewer_glyphs_than_relabelling():
+    face = TimerFace()
+    changed = sum(len(face.update(remaining, 0.0)[0]) for remaining in range(25 * 60, -1, -1))
+    # Antes: la etiqueta completa (5 glifos) en cada segundo
+    assert changed < 5 * 25 * 60 / 3
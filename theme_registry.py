@@ -0,0 +1,189 @@
+import json
+import os
+import re
+
+
+HEX_COLOR = re.compile(r"^#(?:[0-9a-fA-F]{3}){1,2}$")
+
+# Claves que usa la interfaz; las demás se derivan si el tema no las trae
+REQUIRED_KEYS = ("bg", "fg", "btn_bg", "btn_hover", "entry_bg")
+
+# Opción de CustomTkinter -> clave del tema, por tipo de widget
+WINDOW_ROLES = {"fg_color": "bg"}
+LABEL_ROLES = {"text_color": "fg"}
+BUTTON_ROLES = {"fg_color": "btn_bg", "hover_color": "btn_hover", "text_color": "fg"}
+PROGRESS_ROLES = {"progress_color": "progress_fg", "fg_color": "progress_bg"}
+TIMER_ROLES = {"foreground": "fg", "background": "bg", "track_color": "btn_bg"}
+
+
+def _dark(value):
+    """Los temas de CustomTkinter usan pares [claro, oscuro]; la app va en oscuro"""
+    if isinstance(value, (list, tuple)):
+        return value[-1]
+    return value
+
+
+def compile_theme(data):
+    """Traducir un JSON de themes/ al formato plano de la interfaz
+
+    Acepta el formato propio (colors/fonts/effects) y el de CustomTkinter
+    (CTk/button/label/entry, como console.json). Lanza ValueError si falta
+    un color o alguno no es hexadecimal.
+    """
+    if "colors" in data:
+        colors = data["colors"]
+        theme = {
+            "bg": colors.get("background"),
+            "fg": colors.get("text", colors.get("foreground")),
+            "btn_bg": colors.get("button_bg", colors.get("primary")),
+            "btn_hover": colors.get("button_hover", colors.get("secondary")),
+            "entry_bg": colors.get("entry_bg"),
+            "text_secondary": colors.get("text_secondary"),
+            "border": colors.get("border"),
+            "accent": colors.get("accent"),
+            "progress_bg": colors.get("progress_bg"),
+            "progress_fg": colors.get("progress_fg"),
+            "font": data.get("fonts", {}).get("primary"),
+            "corner_radius": data.get("effects", {}).get("border_radius"),
+        }
+    else:
+        button = data.get("button", {})
+        entry = data.get("entry", {})
+        theme = {
+            "bg": _dark(data.get("CTk", {}).get("fg_color")),
+            "fg": _dark(data.get("label", {}).get("text_color", button.get("text_color"))),
+            "btn_bg": _dark(button.get("fg_color")),
+            "btn_hover": _dark(button.get("hover_color")),
+            "entry_bg": _dark(entry.get("fg_color")),
+            "border": _dark(entry.get("border_color")),
+            "corner_radius": button.get("corner_radius"),
+        }
+    return finish_theme(theme)
+
+
+def finish_theme(theme):
+    """Validar los colores obligatorios y completar los opcionales"""
+    theme = {key: value for key, value in theme.items() if value is not None}
+    for key in REQUIRED_KEYS:
+        if key not in theme:
+            raise ValueError(f"falta el color '{key}'")
+    theme.setdefault("text_secondary", theme["fg"])
+    theme.setdefault("border", theme["btn_hover"])
+    theme.setdefault("accent", theme["fg"])
+    theme.setdefault("progress_bg", theme["btn_bg"])
+    theme.setdefault("progress_fg", theme["fg"])
+    theme.setdefault("font", "Consolas")
+    theme.setdefault("corner_radius", 4)
+    for key, value in theme.items():
+        if key not in ("font", "corner_radius") and not HEX_COLOR.match(str(value)):
+            raise ValueError(f"color no válido en '{key}': {value!r}")
+    return theme
+
+
+class ThemeRegistry:
+    """Temas integrados más los de themes/*.json, compilados una vez
+
+    Cada archivo se vuelve a leer solo si cambia su fecha de modificación o
+    su tamaño, así que refresh() se puede llamar seguido para recargar en vivo.
+    """
+
+    def __init__(self, themes_dir="themes", builtin=None, default="Terminal"):
+        self.themes_dir = themes_dir
+        self.default = default
+        self._builtin = {name: finish_theme(dict(theme)) for name, theme in (builtin or {}).items()}
+        self._files = {}  # ruta -> (mtime_ns, tamaño, nombre o None)
+        self._loaded = {}  # nombre -> tema compilado de un archivo
+        self.errors = {}   # ruta -> mensaje del último error
+        self.refresh()
+
+    def refresh(self):
+        """Recompilar los archivos nuevos o modificados; devuelve los nombres afectados"""
+        changed = set()
+        seen = set()
+        try:
+            entries = [e for e in os.scandir(self.themes_dir)
+                       if e.is_file() and e.name.endswith(".json")]
+        except FileNotFoundError:
+            entries = []
+
+        for entry in entries:
+            seen.add(entry.path)
+            stat = entry.stat()
+            cached = self._files.get(entry.path)
+            if cached is not None and cached[:2] == (stat.st_mtime_ns, stat.st_size):
+                continue
+            previous = cached[2] if cached is not None else None
+            name = self._load(entry.path)
+            if name is None:
+                # Se conserva la última versión válida (p. ej. archivo a medio guardar)
+                name = previous
+            else:
+                changed.add(name)
+                if previous is not None and previous != name:
+                    self._loaded.pop(previous, None)
+                    changed.add(previous)
+            self._files[entry.path] = (stat.st_mtime_ns, stat.st_size, name)
+
+        for path in set(self._files) - seen:
+            name = self._files.pop(path)[2]
+            if name is not None:
+                self._loaded.pop(name, None)
+                changed.add(name)
+        return changed
+
+    def _load(self, path):
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            theme = compile_theme(data)
+        except (OSError, json.JSONDecodeError, ValueError, AttributeError) as error:
+            self.errors[path] = str(error)
+            return None
+        self.errors.pop(path, None)
+        stem = os.path.splitext(os.path.basename(path))[0]
+        name = data.get("name") or stem.replace("_", " ").title()
+        self._loaded[name] = theme
+        return name
+
+    def names(self):
+        return list(dict.fromkeys([*self._builtin, *sorted(self._loaded)]))
+
+    def get(self, name):
+        """Tema compilado (los archivos tienen prioridad sobre los integrados)"""
+        theme = self._loaded.get(name) or self._builtin.get(name)
+        if theme is None:
+            theme = self._loaded.get(self.default) or self._builtin[self.default]
+        return theme
+
+
+class ThemedWidgets:
+    """Widgets que se reestilan en su lugar al cambiar de tema
+
+    Cada widget se registra con sus roles (opción -> clave del tema). Los
+    widgets destruidos se descartan al aplicar un tema y también al
+    registrar, cada vez que la lista dobla lo que quedó vivo la última vez,
+    para que abrir y cerrar ventanas no la haga crecer sin límite.
+    """
+
+    def __init__(self):
+        self._entries = []
+        self._alive = 0  # widgets vivos en la última limpieza
+
+    def register(self, widget, roles):
+        if len(self._entries) >= max(16, 2 * self._alive):
+            self._prune()
+        self._entries.append((widget, roles))
+        return widget
+
+    def _prune(self):
+        self._entries = [(widget, roles) for widget, roles in self._entries
+                         if widget.winfo_exists()]
+        self._alive = len(self._entries)
+
+    def apply(self, theme):
+        self._prune()
+        for widget, roles in self._entries:
+            widget.configure(**{option: theme[key] for option, key in roles.items()})
+
+    def __len__(self):
+        return len(self._entries)
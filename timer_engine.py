@@ -0,0 +1,79 @@
+import math
+import time
+
+
+def _default_clock():
+    """Reloj monótono que sigue contando mientras el equipo está suspendido"""
+    if hasattr(time, "CLOCK_BOOTTIME"):
+        # Linux: CLOCK_MONOTONIC se detiene durante la suspensión, BOOTTIME no
+        return lambda: time.clock_gettime(time.CLOCK_BOOTTIME)
+    return time.monotonic
+
+
+class TimerEngine:
+    """Cuenta regresiva sin deriva, independiente de la interfaz
+
+    El tiempo restante se calcula siempre a partir de una fecha límite en un
+    reloj monótono, así que las llamadas tardías del bucle de Tk no se acumulan.
+    """
+
+    def __init__(self, duration, clock=None):
+        self.clock = clock or _default_clock()
+        self.duration = duration
+        self._deadline = None        # instante de fin mientras corre
+        self._paused_remaining = float(duration)
+
+    @property
+    def running(self):
+        return self._deadline is not None
+
+    def start(self):
+        """Iniciar o reanudar"""
+        if self._deadline is None:
+            self._deadline = self.clock() + self._paused_remaining
+
+    def pause(self):
+        """Pausar conservando el tiempo restante exacto"""
+        if self._deadline is not None:
+            self._paused_remaining = max(0.0, self._deadline - self.clock())
+            self._deadline = None
+
+    def reset(self, duration=None):
+        """Detener y volver a la duración indicada (en segundos)"""
+        if duration is not None:
+            self.duration = duration
+        self._deadline = None
+        self._paused_remaining = float(self.duration)
+
+    def adjust(self, seconds):
+        """Sumar o restar segundos sin bajar de cero"""
+        if self._deadline is not None:
+            self._deadline = max(self.clock(), self._deadline + seconds)
+        else:
+            self._paused_remaining = max(0.0, self._paused_remaining + seconds)
+
+    def remaining_exact(self):
+        """Segundos restantes con fracción"""
+        if self._deadline is None:
+            return self._paused_remaining
+        return max(0.0, self._deadline - self.clock())
+
+    @property
+    def remaining(self):
+        """Segundos enteros a mostrar (25:00 hasta que pasa el primer segundo)"""
+        return math.ceil(self.remaining_exact())
+
+    @property
+    def finished(self):
+        return self.remaining_exact() <= 0
+
+    def next_tick_ms(self):
+        """Milisegundos hasta el próximo cambio de segundo en pantalla"""
+        remaining = self.remaining_exact()
+        if remaining <= 0:
+            return 0
+        fraction = remaining - math.floor(remaining)
+        if fraction == 0:
+            fraction = 1.0
+        # Un milisegundo extra para despertar justo después del cambio
+        return int(fraction * 1000) + 1
@@ -0,0 +1,153 @@
+import math
+import tkinter as tk
+
+
+def format_remaining(seconds):
+    m, s = divmod(seconds, 60)
+    return f"{m:02}:{s:02}"
+
+
+class TimerFace:
+    """Estado de lo que se ve en pantalla: qué glifos y segmentos cambian
+
+    No depende de Tk; TimerDisplay lo usa para tocar solo los elementos del
+    Canvas que cambian, y los benchmarks para contar actualizaciones.
+    """
+
+    def __init__(self, segments=0):
+        self.segments = segments
+        self.text = None
+        self.lit = 0
+
+    def update(self, remaining, fraction):
+        """(glifos cambiados, rango de segmentos cambiados) para el nuevo estado"""
+        text = format_remaining(remaining)
+        if self.text is None or len(text) != len(self.text):
+            glyphs = list(range(len(text)))
+        else:
+            glyphs = [i for i, (old, new) in enumerate(zip(self.text, text)) if old != new]
+        self.text = text
+
+        lit = min(self.segments, max(0, math.floor(fraction * self.segments)))
+        changed = range(min(lit, self.lit), max(lit, self.lit))
+        self.lit = lit
+        return glyphs, changed
+
+
+class TimerDisplay:
+    """Reloj MM:SS (un elemento de texto por glifo) y anillo de progreso opcional
+
+    Todo se dibuja en un Canvas, así que cambiar un dígito no reacomoda la
+    ventana. Mientras la ventana está minimizada u oculta no se dibuja nada;
+    al volver a verse se pinta el último estado pedido.
+    """
+
+    def __init__(self, master, font, foreground, background, track_color=None, ring=False,
+                 ring_size=180, segments=120, on_visibility=None):
+        self.font = font
+        self.foreground = foreground
+        self.background = background
+        self.track_color = track_color or background
+        self.on_visibility = on_visibility
+        self.face = TimerFace(segments if ring else 0)
+        self.visible = True
+        self.renders = 0
+        self.skipped = 0
+        self._pending = None
+
+        cell = max(font.measure(digit) for digit in "0123456789:")
+        self._cell = cell
+        height = font.metrics("linespace")
+        width = max(cell * 6, ring_size if ring else 0)
+        total_height = ring_size if ring else height
+        self.canvas = tk.Canvas(master, width=width, height=total_height, bg=background,
+                                highlightthickness=0, bd=0)
+        self._center = (width / 2, total_height / 2)
+        self._glyphs = []
+        self._segments = []
+        if ring:
+            self._create_ring(ring_size, segments)
+
+        # Los eventos de los hijos también llegan a la ventana: se filtran
+        self._toplevel = master.winfo_toplevel()
+        self._toplevel.bind("<Map>", self._on_map, add="+")
+        self._toplevel.bind("<Unmap>", self._on_unmap, add="+")
+        self.canvas.bind("<Visibility>", self._on_visibility)
+
+    # --------- Dibujo ----------
+    def _create_ring(self, size, segments):
+        pad = 6
+        extent = 360 / segments
+        for index in range(segments):
+            # En sentido horario desde las 12
+            start = 90 - (index + 1) * extent
+            self._segments.append(self.canvas.create_arc(
+                pad, pad, size - pad, size - pad, start=start, extent=extent,
+                style="arc", width=6, outline=self.track_color))
+
+    def _layout(self, count):
+        """Una celda fija por glifo para que ningún dígito desplace a los demás"""
+        for item in self._glyphs:
+            self.canvas.delete(item)
+        x0 = self._center[0] - self._cell * count / 2 + self._cell / 2
+        self._glyphs = [self.canvas.create_text(x0 + i * self._cell, self._center[1], text="",
+                                                font=self.font, fill=self.foreground)
+                        for i in range(count)]
+
+    def render(self, remaining, fraction=0.0):
+        """Mostrar 'remaining' segundos; devuelve False si la ventana no se ve"""
+        if not self.visible:
+            self._pending = (remaining, fraction)
+            self.skipped += 1
+            return False
+        self._pending = None
+        previous = self.face.text
+        glyphs, segments = self.face.update(remaining, fraction)
+        text = self.face.text
+        if previous is None or len(previous) != len(text):
+            self._layout(len(text))
+        for index in glyphs:
+            self.canvas.itemconfigure(self._glyphs[index], text=text[index])
+        lit = self.face.lit
+        for index in segments:
+            color = self.foreground if index < lit else self.track_color
+            self.canvas.itemconfigure(self._segments[index], outline=color)
+        self.renders += 1
+        return True
+
+    # --------- Tema ----------
+    def configure(self, foreground=None, background=None, track_color=None):
+        """Cambiar colores en su lugar (roles de ThemedWidgets)"""
+        self.foreground = foreground or self.foreground
+        self.background = background or self.background
+        self.track_color = track_color or self.track_color
+        self.canvas.configure(bg=self.background)
+        for item in self._glyphs:
+            self.canvas.itemconfigure(item, fill=self.foreground)
+        for index, item in enumerate(self._segments):
+            color = self.foreground if index < self.face.lit else self.track_color
+            self.canvas.itemconfigure(item, outline=color)
+
+    def winfo_exists(self):
+        return self.canvas.winfo_exists()
+
+    # --------- Visibilidad ----------
+    def _on_map(self, event):
+        if event.widget is self._toplevel:
+            self._set_visible(True)
+
+    def _on_unmap(self, event):
+        if event.widget is self._toplevel:
+            self._set_visible(False)
+
+    def _on_visibility(self, event):
+        self._set_visible(event.state != "VisibilityFullyObscured")
+
+    def _set_visible(self, visible):
+        if visible == self.visible:
+            return
+        self.visible = visible
+        if visible and self._pending is not None:
+            self.render(*self._pending)
+        if self.on_visibility is not None:
+            self.on_visibility(visible)
@@ -0,0 +1,113 @@
+import copy
+import json
+import os
+
+from achievement_rules import level_for_experience
+from persistence import FileLock, atomic_write_json
+
+
+# Campos que no se suman entre procesos: gana el último que escribe
+LAST_WRITER_WINS = {"revision", "level", "streak"}
+
+
+def merge_user_data(base, ours, theirs):
+    """Combinar en 'theirs' (lo que hay en disco) los cambios de 'ours' desde 'base'
+
+    Los contadores suman la diferencia, las listas agregan los elementos
+    nuevos y los diccionarios (daily_stats, contadores de logros) se combinan
+    clave por clave.
+    """
+    merged = {}
+    for key in set(theirs) | set(ours):
+        if key not in ours:
+            merged[key] = theirs[key]
+        elif key not in theirs or key in LAST_WRITER_WINS:
+            merged[key] = ours[key]
+        else:
+            merged[key] = _merge_value(base.get(key) if isinstance(base, dict) else None,
+                                       ours[key], theirs[key])
+    if "experience" in merged:
+        merged["level"] = level_for_experience(merged["experience"])
+    return merged
+
+
+def _merge_value(base, ours, theirs):
+    if isinstance(ours, bool) or isinstance(theirs, bool):
+        return theirs if ours == base else ours
+    if isinstance(ours, (int, float)) and isinstance(theirs, (int, float)):
+        if not isinstance(base, (int, float)):
+            base = 0
+        return theirs + (ours - base)
+    if isinstance(ours, dict) and isinstance(theirs, dict):
+        return merge_user_data(base if isinstance(base, dict) else {}, ours, theirs)
+    if isinstance(ours, dict) and isinstance(theirs, (int, float)):
+        # daily_stats de un proceso con el formato antiguo (solo el número de sesiones)
+        return _merge_value(base, ours.get("sessions_completed", 0), theirs)
+    if isinstance(ours, list) and isinstance(theirs, list):
+        return theirs + [item for item in ours if item not in theirs]
+    return theirs if ours == base else ours
+
+
+class UserDataStore:
+    """user_data.json compartido entre procesos con control optimista de versiones
+
+    Cada guardado lleva un número de 'revision'. Si al escribir la revisión
+    en disco no es la que este proceso escribió o leyó por última vez, otro
+    proceso guardó entretanto: sus cambios se conservan y se les suman los
+    nuestros en vez de sobrescribirlos.
+    """
+
+    def __init__(self, data_dir, filename="user_data.json", wal=None):
+        self.path = os.path.join(data_dir, filename)
+        self.wal = wal  # WriteAheadLog opcional: cada versión se registra antes de escribirse
+        self._lock = FileLock(self.path + ".lock")
+        self._base = None        # lo último que este proceso leyó o escribió
+        self._last_saved = None  # nuestra última versión en memoria ya incorporada
+        self.conflicts = 0
+
+    def load(self):
+        """Leer user_data.json; None si no existe o está dañado"""
+        with self._lock:
+            data = self._read()
+        if data is not None and self._base is None:
+            self._base = data
+            self._last_saved = copy.deepcopy(data)
+        return copy.deepcopy(data) if data is not None else None
+
+    def _read(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+        except json.JSONDecodeError:
+            # Conservar el archivo dañado en lugar de sobrescribirlo con valores por defecto
+            os.replace(self.path, self.path + ".corrupt")
+            return None
+
+    def commit(self, path, text, fsync=False):
+        """Guardar comprobando la revisión en disco (lo llama el escritor diferido)"""
+        ours = json.loads(text)
+        with self._lock:
+            disk = self._read()
+            expected = self._base.get("revision", 0) if self._base is not None else None
+            if disk is None:
+                merged = ours
+            elif disk.get("revision", 0) == expected and self._last_saved == self._base:
+                # Nadie más escribió y no hay cambios ajenos pendientes de incorporar
+                merged = ours
+            else:
+                if disk.get("revision", 0) != expected:
+                    self.conflicts += 1
+                merged = merge_user_data(self._last_saved or {}, ours, disk)
+            merged["revision"] = (disk or {}).get("revision", 0) + 1
+            if self.wal is not None:
+                self.wal.commit_user_data(path, merged)
+            else:
+                atomic_write_json(path, merged, fsync=fsync)
+            self._base = merged
+            self._last_saved = ours
+            if merged == dict(ours, revision=merged["revision"]):
+                # Disco y memoria coinciden otra vez
+                self._last_saved = merged
+        return merged
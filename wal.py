@@ -0,0 +1,184 @@
+import json
+import os
+import zlib
+from collections import Counter
+
+from persistence import FileLock, atomic_write_bytes, atomic_write_json
+
+
+def encode_record(record):
+    """Una línea del registro: CRC32 en hexadecimal, espacio y el JSON del cambio"""
+    payload = json.dumps(record, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return b"%08x %s\n" % (zlib.crc32(payload), payload)
+
+
+def decode_record(line):
+    """Registro de una línea completa, o None si está cortada o no cuadra su CRC"""
+    if len(line) < 11 or not line.endswith(b"\n") or line[8:9] != b" ":
+        return None
+    payload = line[9:-1]
+    try:
+        if int(line[:8], 16) != zlib.crc32(payload):
+            return None
+        return json.loads(payload)
+    except ValueError:
+        return None
+
+
+def session_key(session):
+    """Clave comparable de una sesión (mismo contenido, misma clave)"""
+    return json.dumps(session, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+
+
+class WriteAheadLog:
+    """Registro previo con CRC por registro para sesiones y user_data.json
+
+    Cada cambio se anexa primero aquí y después se aplica al almacén de
+    sesiones o a user_data.json. El registro empieza siempre con un punto de
+    control (posición del almacén y última versión de user_data), así que la
+    recuperación solo lee lo escrito desde entonces: comprueba que cada
+    sesión del registro esté en el almacén y que user_data.json sea la última
+    versión confirmada, y repara lo que falte. Al superar 'max_bytes' se
+    compacta a un punto de control nuevo.
+    """
+
+    def __init__(self, data_dir, store, user_filename="user_data.json", filename="wal.log",
+                 fsync=False, max_bytes=256 * 1024):
+        self.path = os.path.join(data_dir, filename)
+        self.user_path = os.path.join(data_dir, user_filename)
+        self.store = store
+        self.fsync = fsync
+        self.max_bytes = max_bytes
+        self.lock = FileLock(self.path + ".lock")
+        self.checkpoints = 0
+
+    # --------- Escritura ----------
+    def _append(self, record):
+        data = encode_record(record)
+        with open(self.path, 'ab') as f:
+            f.write(data)
+            f.flush()
+            if self.fsync:
+                os.fsync(f.fileno())
+            return f.tell()
+
+    def append_sessions(self, sessions):
+        """Registrar sesiones y luego anexarlas al almacén"""
+        sessions = list(sessions)
+        if not sessions:
+            return
+        with self.lock:
+            size = self._append({"op": "sessions", "data": sessions})
+            self.store.extend(sessions)
+            if size > self.max_bytes:
+                self.checkpoint()
+
+    def commit_user_data(self, path, data):
+        """Registrar una versión de user_data y luego escribir el archivo"""
+        with self.lock:
+            size = self._append({"op": "user_data", "data": data})
+            atomic_write_json(path, data, fsync=self.fsync)
+            if size > self.max_bytes:
+                self.checkpoint()
+
+    # --------- Lectura y recuperación ----------
+    def scan(self):
+        """(registros válidos, bytes hasta el último válido, líneas dañadas)"""
+        try:
+            f = open(self.path, 'rb')
+        except FileNotFoundError:
+            return [], 0, 0
+        records, valid_end, damaged, offset = [], 0, 0, 0
+        with f:
+            for line in f:
+                offset += len(line)
+                record = decode_record(line)
+                if record is None:
+                    damaged += 1
+                    continue
+                records.append(record)
+                valid_end = offset
+        return records, valid_end, damaged
+
+    def recover(self):
+        """Reaplicar lo confirmado en el registro que no llegó a sus archivos
+
+        Devuelve un resumen: sesiones reanexadas, si se restauró user_data y
+        cuántas líneas dañadas se descartaron.
+        """
+        return self._recover()[0]
+
+    def _recover(self):
+        with self.lock:
+            records, valid_end, damaged = self.scan()
+            if os.path.exists(self.path) and os.path.getsize(self.path) > valid_end:
+                # Cola cortada por un cierre inesperado: no debe quedar delante de lo nuevo
+                with open(self.path, 'r+b') as f:
+                    f.truncate(valid_end)
+
+            cursor, user_data, sessions = None, None, []
+            for record in records:
+                op = record.get("op")
+                if op == "checkpoint":
+                    # Solo el primero es válido; uno intermedio vendría de otra compactación
+                    if record is records[0] and record.get("source") == self.store.path:
+                        cursor = record.get("cursor")
+                    user_data = record.get("user_data", user_data)
+                elif op == "sessions":
+                    sessions.extend(record["data"])
+                elif op == "user_data":
+                    user_data = record["data"]
+
+            report = {
+                "sessions_restored": self._restore_sessions(sessions, cursor),
+                "user_data_restored": self._restore_user_data(user_data),
+                "damaged_records": damaged,
+            }
+            return report, user_data
+
+    def _restore_sessions(self, sessions, cursor):
+        if not sessions:
+            return 0
+        try:
+            stored = Counter(session_key(s) for s, _ in self.store.iter_from(cursor))
+        except ValueError:
+            # El almacén quedó más corto que el punto de control: comparar con todo
+            stored = Counter(session_key(s) for s, _ in self.store.iter_from(None))
+        missing = []
+        for session in sessions:
+            key = session_key(session)
+            if stored[key]:
+                stored[key] -= 1
+            else:
+                missing.append(session)
+        if missing:
+            self.store.extend(missing)
+        return len(missing)
+
+    def _restore_user_data(self, data):
+        if data is None:
+            return False
+        try:
+            with open(self.user_path, 'r', encoding='utf-8') as f:
+                disk = json.load(f)
+        except FileNotFoundError:
+            disk = None
+        except ValueError:
+            # JSON o UTF-8 dañados: conservar la copia rota, como el resto de la app
+            os.replace(self.user_path, self.user_path + ".corrupt")
+            disk = None
+        if isinstance(disk, dict):
+            revision = disk.get("revision", 0)
+            if revision > data.get("revision", 0) or disk == data:
+                return False
+        atomic_write_json(self.user_path, data, fsync=self.fsync)
+        return True
+
+    def checkpoint(self):
+        """Comprobar que todo está aplicado y reducir el registro a un punto de control"""
+        with self.lock:
+            _, user_data = self._recover()
+            record = {"op": "checkpoint", "source": self.store.path,
+                      "cursor": self.store.end_cursor(), "user_data": user_data}
+            atomic_write_bytes(self.path, encode_record(record), fsync=self.fsync)
+            self.checkpoints += 1